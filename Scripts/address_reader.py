@@ -0,0 +1,269 @@
+'''
+Author: Leili
+Date: 2026-10-19 22:10:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 22:10:00
+FilePath: /GoogleModelProcess/Scripts/address_reader.py
+Description: 流式读取地址输入(JSONL/CSV/纯文本，兼容JSON数组)，可带预先计算的经纬度以跳过地理编码，
+             处理进度以字节偏移保存到检查点文件，中断后从上次的位置继续
+'''
+import os
+import io
+import csv
+import json
+import logging
+
+# 与osm.py共用日志记录器，抓取流程的日志由调用方记录
+logger = logging.getLogger('BuildingProcessor')
+
+INPUT_FORMATS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv', '.txt': 'txt', '.json': 'json'}
+
+# JSONL对象和CSV表头中可识别的列名(不区分大小写)
+ADDRESS_KEYS = ('address', 'addr', '地址')
+LAT_KEYS = ('lat', 'latitude')
+LNG_KEYS = ('lng', 'lon', 'long', 'longitude')
+
+CHECKPOINT_SUFFIX = '.checkpoint'
+
+# 检查点的默认保存间隔(已处理的记录数)
+DEFAULT_CHECKPOINT_EVERY = 100
+
+def find_address_file(directory, name):
+    """ 查找目录中名为name的地址文件，按 .txt/.jsonl/.csv 的顺序，不存在时返回None """
+    for ext in ('.txt', '.jsonl', '.csv'):
+        path = os.path.join(directory, name + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+def _pick(row, keys):
+    """ 按候选列名(不区分大小写)取值 """
+    for key, value in row.items():
+        if key is not None and key.strip().lower() in keys:
+            return value
+    return None
+
+def _parse_coord(value):
+    """ 经纬度列为空或无法解析时返回None """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+class AddressRecord:
+    """
+    一条地址记录
+
+    属性:
+        index: int - 记录序号(从0开始，跳过空行，与原来逐行读取并过滤空行后的下标一致)
+        address: str - 地址
+        lat, lng: float或None - 预先计算的经纬度
+        offset: int - 该记录之后的读取位置(文本格式为字节偏移，JSON数组为下一条记录的下标)
+    """
+    __slots__ = ('index', 'address', 'lat', 'lng', 'offset')
+
+    def __init__(self, index, address, lat=None, lng=None, offset=0):
+        self.index = index
+        self.address = address
+        self.lat = lat
+        self.lng = lng
+        self.offset = offset
+
+    @property
+    def location(self):
+        """ 预先计算的 (纬度, 经度)，经纬度不完整时为None """
+        if self.lat is None or self.lng is None:
+            return None
+        return self.lat, self.lng
+
+    def __repr__(self):
+        return f"AddressRecord({self.index}, {self.address!r}, {self.lat}, {self.lng})"
+
+class AddressReader:
+    """
+    地址输入的流式读取器
+
+    支持的格式(按扩展名):
+        .txt - 每行一个地址
+        .jsonl/.ndjson - 每行一个JSON字符串或对象 {"address": ..., "lat": ..., "lng": ...}
+        .csv - 带表头，地址列为address(无可识别的表头时第一行也作为数据，取第一列)，可选lat/lng列；每条记录占一行
+        .json - JSON地址数组(原有格式，需要整体读入内存)
+
+    迭代时从检查点位置开始逐条返回AddressRecord；调用方处理完一条记录后按顺序调用commit(record)，
+    每commit checkpoint_every条保存一次检查点，close()时保存剩余进度，finish()在全部处理完成后删除检查点
+    """
+
+    def __init__(self, path, checkpoint_path=None, resume=True, checkpoint_every=DEFAULT_CHECKPOINT_EVERY,
+                 on_save=None):
+        """
+        :param path: 输入文件路径
+        :param checkpoint_path: 检查点文件路径，默认为 <输入文件>.checkpoint，为False时不使用检查点
+        :param resume: 是否从已有的检查点继续
+        :param checkpoint_every: 每处理多少条记录保存一次检查点
+        :param on_save: 保存检查点之前调用的函数，用于先写入缓存的处理结果，保证检查点之前的结果都已落盘
+        """
+        ext = os.path.splitext(path)[1].lower()
+        self.path = path
+        self.format = INPUT_FORMATS.get(ext, 'txt')
+        self.checkpoint_path = None if checkpoint_path is False else (checkpoint_path or path + CHECKPOINT_SUFFIX)
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.on_save = on_save
+        self.skipped = 0
+        # 已处理到的位置：(读取位置, 下一条记录的序号)
+        self.offset = 0
+        self.index = 0
+        self._pending = 0
+        if resume and self.checkpoint_path:
+            self._load_checkpoint()
+        # 本次运行的起始位置
+        self.start_index = self.index
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            offset, index = int(state['offset']), int(state['index'])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"检查点文件无法读取，从头开始: {self.checkpoint_path} ({e})")
+            return
+        if self.format != 'json' and offset > os.path.getsize(self.path):
+            # 输入文件已被替换为更短的文件
+            logger.warning(f"检查点位置超出输入文件大小，从头开始: {self.checkpoint_path}")
+            return
+        self.offset, self.index = offset, index
+
+    def __iter__(self):
+        if self.format == 'json':
+            return self._iter_json()
+        return self._iter_lines()
+
+    def _iter_json(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+        if not isinstance(items, list):
+            raise ValueError("JSON文件必须包含地址列表")
+        index = self.index
+        for position in range(self.offset, len(items)):
+            record = self._make_record(items[position], index, position + 1)
+            if record is None:
+                continue
+            yield record
+            index += 1
+
+    def _iter_lines(self):
+        with open(self.path, 'rb') as f:
+            header = None
+            if self.format == 'csv':
+                header, header_end = self._read_header(f)
+                if header is None:
+                    # 没有表头时第一行也是数据
+                    f.seek(0)
+                elif self.offset < header_end:
+                    self.offset = header_end
+            f.seek(self.offset)
+            position = self.offset
+            index = self.index
+            for line in iter(f.readline, b''):
+                position += len(line)
+                if position == len(line) and line.startswith(b'\xef\xbb\xbf'):
+                    line = line[3:]
+                text = line.decode('utf-8').strip()
+                if not text:
+                    continue
+                record = self._parse_line(text, header, index, position)
+                if record is None:
+                    continue
+                yield record
+                index += 1
+
+    def _read_header(self, f):
+        """ 读取CSV表头，返回 (列名列表或None, 表头之后的字节偏移) """
+        f.seek(0)
+        line = f.readline()
+        fields = next(csv.reader([line.decode('utf-8-sig')]), [])
+        known = ADDRESS_KEYS + LAT_KEYS + LNG_KEYS
+        if any(field.strip().lower() in known for field in fields):
+            return fields, len(line)
+        return None, 0
+
+    def _parse_line(self, text, header, index, offset):
+        try:
+            if self.format == 'jsonl':
+                item = json.loads(text)
+            elif self.format == 'csv':
+                values = next(csv.reader(io.StringIO(text)))
+                item = dict(zip(header, values)) if header else values[0]
+            else:
+                item = text
+        except (ValueError, StopIteration, IndexError) as e:
+            self.skipped += 1
+            logger.warning(f"跳过无法解析的输入行(位置 {offset}): {text[:100]} ({e})")
+            return None
+        return self._make_record(item, index, offset)
+
+    def _make_record(self, item, index, offset):
+        """ 由字符串或字典生成记录，没有地址时返回None """
+        if isinstance(item, dict):
+            address = _pick(item, ADDRESS_KEYS)
+            lat, lng = _parse_coord(_pick(item, LAT_KEYS)), _parse_coord(_pick(item, LNG_KEYS))
+        else:
+            address, lat, lng = item, None, None
+        address = str(address).strip() if address is not None else ''
+        if not address:
+            self.skipped += 1
+            return None
+        return AddressRecord(index, address, lat, lng, offset)
+
+    def count(self):
+        """
+        统计输入中的记录总数(包括已处理的)，只按非空行计数，不解析内容
+
+        用于显示进度，百万行的文件耗时约为秒级
+        """
+        if self.format == 'json':
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return len(json.load(f))
+        total = 0
+        with open(self.path, 'rb') as f:
+            if self.format == 'csv' and self._read_header(f)[0] is None:
+                f.seek(0)
+            for line in f:
+                if line.strip():
+                    total += 1
+        return total
+
+    def commit(self, record):
+        """ 记录已处理完成，需要按迭代顺序调用 """
+        self.offset = record.offset
+        self.index = record.index + 1
+        self._pending += 1
+        if self._pending >= self.checkpoint_every:
+            self.save()
+
+    def save(self):
+        """ 保存检查点(先写临时文件再替换，避免中断时留下不完整的文件) """
+        self._pending = 0
+        if not self.checkpoint_path:
+            return
+        if self.on_save is not None:
+            self.on_save()
+        state = {'input': os.path.abspath(self.path), 'offset': self.offset, 'index': self.index}
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def close(self):
+        """ 保存尚未写入检查点的进度(中断或出错时调用) """
+        if self._pending:
+            self.save()
+
+    def finish(self):
+        """ 全部处理完成，删除检查点，下次运行从头开始 """
+        self._pending = 0
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
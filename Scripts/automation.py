@@ -0,0 +1,313 @@
+'''
+Author: Leili
+Date: 2026-10-19 09:45:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 11:50:00
+FilePath: /GoogleModelProcess/Scripts/automation.py
+Description: 自动化驱动接口，包含真实的Windows实现和用于测试/压测的模拟实现
+'''
+import os
+import random
+import time
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+
+from Scripts.config_utils import get_path, get_setting
+from Scripts.log_utils import logD, logW
+from Scripts.utils import get_filename
+from Scripts.rdc_validate import validate_rdc, remove_rdc, FILE_HEADER, SECTION_HEADER, MAGIC_HEADER, FRAME_CAPTURE
+
+class AutomationDriver(ABC):
+    """
+    自动化驱动接口
+
+    抓取流程中所有与外部程序(Chrome、RenderDoc、Blender、Google Maps API)交互的步骤都通过驱动完成，
+    流程编排逻辑(区域遍历、重试、信号等待)因此可以在没有Windows图形环境的机器上运行；
+    子类缺少任何一个步骤的实现时无法实例化
+    """
+    name = "base"
+
+    @abstractmethod
+    def check_chrome_version(self):
+        """ 检查运行环境是否满足要求 """
+
+    @abstractmethod
+    def clear_processes(self):
+        """ 清理所有相关进程和临时文件 """
+
+    @abstractmethod
+    def get_coordinates(self, address):
+        """ 获取地址的经纬度，返回(纬度, 经度) """
+
+    @abstractmethod
+    def launch_chrome_google_map(self, lat, lng):
+        """ 打开指定经纬度的Google地图，返回进程ID集合 """
+
+    @abstractmethod
+    def launch_renderdoc_and_inject(self):
+        """ 启动RenderDoc并注入Chrome GPU进程 """
+
+    @abstractmethod
+    def capture_frame(self, filename):
+        """ 截取当前帧并保存为RDC文件，返回RDC文件路径 """
+
+    @abstractmethod
+    def check_rdc_file(self, rdc_file_path):
+        """ 检查RDC文件是否有效 """
+
+    @abstractmethod
+    def open_blender(self):
+        """ 打开Blender并导入RDC文件 """
+
+    @abstractmethod
+    def match_template(self, template_path):
+        """ 在Blender中匹配模板并框选目标 """
+
+    @abstractmethod
+    def wait_for_blender_save_signal(self):
+        """ 等待Blender保存完成 """
+
+class WindowsDriver(AutomationDriver):
+    """ 真实的Windows驱动，直接调用capture_google_model中的各个步骤 """
+    name = "windows"
+
+    @staticmethod
+    def _pipeline():
+        # 延迟导入，避免与capture_google_model循环导入
+        from Scripts import capture_google_model
+        return capture_google_model
+
+    def check_chrome_version(self):
+        return self._pipeline().check_chrome_version()
+
+    def clear_processes(self):
+        return self._pipeline().clear_processes()
+
+    def get_coordinates(self, address):
+        return self._pipeline().geocode_address(address)
+
+    def launch_chrome_google_map(self, lat, lng):
+        return self._pipeline().launch_chrome_google_map(lat, lng)
+
+    def launch_renderdoc_and_inject(self):
+        return self._pipeline().launch_renderdoc_and_inject()
+
+    def capture_frame(self, filename):
+        return self._pipeline().capture_frame(filename)
+
+    def check_rdc_file(self, rdc_file_path):
+        return self._pipeline().check_rdc_file(rdc_file_path)
+
+    def open_blender(self):
+        return self._pipeline().open_blender()
+
+    def match_template(self, template_path):
+        return self._pipeline().match_template(template_path)
+
+    def wait_for_blender_save_signal(self):
+        return self._pipeline().wait_for_blender_save_signal()
+
+class SimulatedDriver(AutomationDriver):
+    """
+    模拟驱动
+
+    不启动任何外部程序，按配置的耗时等待后生成合成的RDC/.blend文件，
+    并按配置的失败率随机让某些步骤失败，用于在Linux CI上测试和压测流程编排逻辑。
+    同时模拟各程序的窗口和焦点：启动程序时打开窗口并获得焦点，截帧和匹配模板前需要先激活对应的窗口，
+    窗口不存在(程序未启动或已被清理)或按activate_window的失败率模拟焦点被抢占时步骤失败
+    """
+    name = "simulated"
+
+    # 各步骤的默认模拟耗时(秒)
+    DEFAULT_LATENCIES = {
+        'launch_chrome_google_map': 0.0,
+        'launch_renderdoc_and_inject': 0.0,
+        'capture_frame': 0.0,
+        'open_blender': 0.0,
+        'match_template': 0.0,
+        'wait_for_blender_save_signal': 0.0,
+        'activate_window': 0.0,
+    }
+
+    def __init__(self, latencies=None, failure_rates=None, rdc_size=None, seed=None):
+        """
+        参数:
+            latencies: dict - 各步骤的模拟耗时(秒)，键为驱动方法名
+            failure_rates: dict - 各步骤的失败概率(0~1)，键为驱动方法名
+            rdc_size: int - 生成的RDC文件大小(字节)，默认比rdc_file_min_size大1MB
+            seed: int - 随机数种子，便于复现
+        """
+        self.latencies = dict(self.DEFAULT_LATENCIES)
+        self.latencies.update(latencies or {})
+        self.failure_rates = failure_rates or {}
+        self.rdc_size = rdc_size
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        # 统计各步骤调用次数、失败次数和模拟耗时
+        self.calls = {}
+        self.failures = {}
+        self.simulated_time = 0.0
+        # 已打开的窗口标题和当前获得焦点的窗口
+        self.windows = set()
+        self.active_window = None
+
+    def _step(self, name):
+        """ 模拟一个步骤的耗时，并按失败率返回是否成功 """
+        latency = self.latencies.get(name, 0.0)
+        if latency > 0:
+            time.sleep(latency)
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            self.simulated_time += latency
+            failed = self.random.random() < self.failure_rates.get(name, 0.0)
+            if failed:
+                self.failures[name] = self.failures.get(name, 0) + 1
+        if failed:
+            logD(f"[模拟] 步骤失败: {name}")
+        return not failed
+
+    def _open_window(self, title):
+        """ 模拟程序打开窗口，新窗口获得焦点 """
+        with self.lock:
+            self.windows.add(title)
+            self.active_window = title
+
+    def activate_window(self, title):
+        """
+        模拟capture_google_model.activate_window：激活标题包含title的窗口
+
+        返回:
+            bool: 没有该窗口或模拟的激活失败时返回False
+        """
+        with self.lock:
+            window = next((w for w in sorted(self.windows) if title in w), None)
+        if window is None:
+            logD(f"[模拟] 未找到{title}窗口")
+            return False
+        if not self._step('activate_window'):
+            return False
+        with self.lock:
+            self.active_window = window
+        return True
+
+    def check_chrome_version(self):
+        return True
+
+    def clear_processes(self):
+        # 关闭所有程序窗口
+        with self.lock:
+            self.windows.clear()
+            self.active_window = None
+        return True
+
+    def get_coordinates(self, address):
+        # 根据地址生成稳定的伪经纬度
+        digest = hashlib.md5(address.encode('utf-8')).digest()
+        lat = 33.9 + digest[0] / 2550.0
+        lng = -118.3 + digest[1] / 2550.0
+        return lat, lng
+
+    def launch_chrome_google_map(self, lat, lng):
+        if self._step('launch_chrome_google_map'):
+            self._open_window("Google Chrome")
+        return {os.getpid()}
+
+    def launch_renderdoc_and_inject(self):
+        # 需要注入的Chrome GPU进程
+        if "Google Chrome" not in self.windows:
+            logD("[模拟] Chrome未启动，无法注入")
+            return False
+        if not self._step('launch_renderdoc_and_inject'):
+            return False
+        self._open_window("RenderDoc")
+        # 注入成功后RenderDoc中出现Chrome GPU进程的窗口，与真实流程一样激活后确认
+        self._open_window("Google Chrome Gpu")
+        return self.activate_window("Google Chrome Gpu")
+
+    def capture_frame(self, filename):
+        rdc_path = os.path.join(get_path('rdc_dir'), f"{filename}.rdc")
+        # 与真实流程一样先在Chrome中操作地图，再切换到RenderDoc截帧
+        if not self.activate_window("Google Chrome"):
+            return False
+        if not self._step('capture_frame'):
+            return False
+        if not self.activate_window("RenderDoc"):
+            return False
+        rdc_size = self.rdc_size
+        if rdc_size is None:
+            rdc_size = (int(get_setting('rdc_file_min_size', 1)) + 1) * 1024 * 1024
+        write_synthetic_rdc(rdc_path, rdc_size)
+        return rdc_path
+
+    def check_rdc_file(self, rdc_file_path):
+        if not os.path.exists(rdc_file_path):
+            return False
+        min_size = int(get_setting('rdc_file_min_size', 1)) * 1024 * 1024
+        if os.path.getsize(rdc_file_path) < min_size:
+            os.remove(rdc_file_path)
+            return False
+        if not validate_rdc(rdc_file_path)['valid']:
+            remove_rdc(rdc_file_path)
+            return False
+        return True
+
+    def open_blender(self):
+        if not self._step('open_blender'):
+            return False
+        self._open_window("Blender")
+        return True
+
+    def match_template(self, template_path):
+        # 截图和框选都在Blender窗口中进行
+        if not self.activate_window("Blender"):
+            return False
+        return self._step('match_template')
+
+    def wait_for_blender_save_signal(self):
+        if not self._step('wait_for_blender_save_signal'):
+            return False
+        # 与blender_script.save_blender_project保持一致的保存位置
+        filename = get_filename(get_setting("address"))
+        district = ""
+        district_file = get_path("district_file")
+        if os.path.exists(district_file):
+            with open(district_file, "r", encoding="utf-8") as f:
+                district = f.read().strip()
+        blend_path = os.path.join(get_path("result_dir"), district, f"{filename}.blend")
+        os.makedirs(os.path.dirname(blend_path), exist_ok=True)
+        with open(blend_path, 'wb') as f:
+            f.write(b"BLENDER-v300")
+        return True
+
+def write_synthetic_rdc(rdc_path, size):
+    """ 生成指定大小的合成RDC文件，包含有效的文件头和一个未压缩的FrameCapture段 """
+    os.makedirs(os.path.dirname(rdc_path), exist_ok=True)
+    name = b"renderdoc/internal/framecapture\0"
+    data_start = FILE_HEADER.size + SECTION_HEADER.size + len(name)
+    data_length = max(size - data_start, 0)
+    with open(rdc_path, 'wb') as f:
+        f.write(FILE_HEADER.pack(MAGIC_HEADER, 0x102, FILE_HEADER.size, b"simulated"))
+        f.write(SECTION_HEADER.pack(0, b"\0\0\0", FRAME_CAPTURE, data_length, data_length, 0, 0, len(name)))
+        f.write(name)
+        f.truncate(data_start + data_length)
+
+# 当前使用的驱动
+_driver = None
+
+def get_driver():
+    """ 获取当前使用的自动化驱动，默认使用Windows驱动 """
+    global _driver
+    if _driver is None:
+        _driver = WindowsDriver()
+    return _driver
+
+def set_driver(driver):
+    """ 设置自动化驱动 """
+    global _driver
+    if not isinstance(driver, AutomationDriver):
+        logW(f"无效的自动化驱动: {driver}")
+        return False
+    _driver = driver
+    logD(f"已切换自动化驱动: {driver.name}")
+    return True
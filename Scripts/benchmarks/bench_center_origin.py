@@ -0,0 +1,121 @@
+'''
+Author: Leili
+Date: 2026-10-19 22:40:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 22:40:00
+FilePath: /GoogleModelProcess/Scripts/benchmarks/bench_center_origin.py
+Description: 在合成的大网格上对比原逐顶点居中实现与foreach_get/foreach_set + NumPy实现的耗时，需要在Blender中运行
+
+用法:
+    blender -b --factory-startup --python Scripts/benchmarks/bench_center_origin.py -- --vertices 5000000
+'''
+import os
+import sys
+import time
+import argparse
+
+import bpy
+import numpy as np
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(os.path.dirname(current_dir))
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+from Scripts.mesh_tools import center_origin
+
+def make_object(name, count, rng, location=(1200.0, -800.0, 35.0)):
+    """
+    生成只有顶点的合成网格对象，对象带有旋转、缩放和平移，与导入的Google地图场景一样需要经过matrix_world变换
+
+    返回:
+        bpy.types.Object: 网格对象
+    """
+    co = rng.uniform(-500.0, 500.0, (count, 3)).astype(np.float32)
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(count)
+    mesh.vertices.foreach_set('co', co.ravel())
+    mesh.update()
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    obj.location = location
+    obj.rotation_euler = (0.3, -0.2, 1.1)
+    obj.scale = (1.5, 1.5, 0.8)
+    bpy.context.view_layer.update()
+    return obj
+
+def get_coords(obj):
+    co = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+    obj.data.vertices.foreach_get('co', co)
+    return co.reshape(-1, 3)
+
+def world_coords(obj):
+    bpy.context.view_layer.update()
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    return get_coords(obj) @ matrix[:3, :3].T + matrix[:3, 3]
+
+def legacy_center_origin(mesh_object):
+    """ 原center_mesh_origin的实现(逐顶点矩阵乘法，第二轮循环中每个顶点都计算一次matrix_world.inverted()) """
+    from mathutils import Vector
+    mesh_data = mesh_object.data
+    vertex_sum = Vector((0, 0, 0))
+    min_z = float('inf')
+    for vertex in mesh_data.vertices:
+        world_co = mesh_object.matrix_world @ vertex.co
+        vertex_sum += Vector((world_co.x, world_co.y, 0))
+        min_z = min(min_z, world_co.z)
+    geometric_center = vertex_sum / len(mesh_data.vertices)
+    translation_vector = Vector((-geometric_center.x, -geometric_center.y, -min_z))
+    for vertex in mesh_data.vertices:
+        world_co = mesh_object.matrix_world @ vertex.co
+        new_co = world_co + translation_vector
+        vertex.co = mesh_object.matrix_world.inverted() @ new_co
+    mesh_data.update()
+    mesh_object.location = (0.0, 0.0, 0.0)
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="网格居中耗时测试")
+    parser.add_argument("--vertices", type=int, default=5000000, help="顶点数量")
+    parser.add_argument("--legacy-vertices", type=int, default=200000,
+                        help="原实现的测试顶点数，小于--vertices时按顶点数线性外推")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+
+    # 对象位置为原点时与原实现的结果一致(原实现在对象位置不为原点时会重复计入对象的平移)
+    legacy = make_object("CheckLegacy", 10000, np.random.default_rng(args.seed), location=(0.0, 0.0, 0.0))
+    obj = make_object("Check", 10000, np.random.default_rng(args.seed), location=(0.0, 0.0, 0.0))
+    legacy_center_origin(legacy)
+    center_origin(obj)
+    print(f"与原实现的一致性(1万顶点): 最大坐标差 {np.abs(get_coords(obj) - get_coords(legacy)).max():.2e}")
+    # 对象带平移时，居中后世界坐标的XY中心和最低点都应为0
+    obj = make_object("CheckMoved", 10000, rng)
+    center_origin(obj)
+    world = world_coords(obj)
+    print(f"带平移的对象居中后: XY中心 ({world[:, 0].mean():.2e}, {world[:, 1].mean():.2e}), "
+          f"最低点 {world[:, 2].min():.2e}")
+
+    legacy_count = min(args.legacy_vertices, args.vertices)
+    obj = make_object("Legacy", legacy_count, rng)
+    legacy_time = timed(legacy_center_origin, obj)
+    if legacy_count < args.vertices:
+        legacy_time *= args.vertices / legacy_count
+        print(f"原实现(逐顶点循环): {legacy_time:.2f}秒 (由{legacy_count}个顶点的耗时外推)")
+    else:
+        print(f"原实现(逐顶点循环): {legacy_time:.2f}秒")
+
+    obj = make_object("Vectorized", args.vertices, rng)
+    vectorized_time = timed(center_origin, obj)
+    print(f"foreach_get/foreach_set + NumPy: {vectorized_time:.2f}秒")
+    print(f"顶点数: {args.vertices}, 加速 {legacy_time / vectorized_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
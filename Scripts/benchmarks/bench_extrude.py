@@ -0,0 +1,122 @@
+'''
+Author: Leili
+Date: 2026-10-19 18:00:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 11:40:00
+FilePath: /GoogleModelProcess/Scripts/benchmarks/bench_extrude.py
+Description: 在合成的建筑轮廓集合上对比原create_building_obj的逐行写入与NumPy批量拉伸/写入的耗时
+
+用法:
+    python Scripts/benchmarks/bench_extrude.py --buildings 100000
+'''
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+from shapely.geometry import Polygon, MultiPolygon, box
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(os.path.dirname(current_dir))
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+from Scripts import extrude
+
+def make_footprints(count, rng):
+    """
+    生成投影坐标系下的合成建筑轮廓：矩形、L形、带内环的庭院式建筑和MultiPolygon各占一定比例
+
+    返回:
+        tuple: (几何列表, 高度数组)
+    """
+    side = int(np.ceil(np.sqrt(count)))
+    geometries = []
+    for i in range(count):
+        x0 = 370000.0 + (i % side) * 40.0
+        y0 = 3750000.0 + (i // side) * 40.0
+        w, h = rng.uniform(10, 30, 2)
+        kind = i % 10
+        if kind < 6:
+            geometries.append(box(x0, y0, x0 + w, y0 + h))
+        elif kind < 8:
+            geometries.append(Polygon([(x0, y0), (x0 + w, y0), (x0 + w, y0 + h / 2), (x0 + w / 2, y0 + h / 2),
+                                       (x0 + w / 2, y0 + h), (x0, y0 + h)]))
+        elif kind < 9:
+            geometries.append(Polygon(box(x0, y0, x0 + w, y0 + h).exterior.coords,
+                                      [box(x0 + w / 3, y0 + h / 3, x0 + 2 * w / 3, y0 + 2 * h / 3).exterior.coords]))
+        else:
+            geometries.append(MultiPolygon([box(x0, y0, x0 + w / 3, y0 + h), box(x0 + w / 2, y0, x0 + w, y0 + h)]))
+    return geometries, rng.uniform(5, 60, count)
+
+def legacy_write_obj(f, geometry, height, offset):
+    """ 原create_building_obj的实现(只处理Polygon外环，n边形顶底面，逐行写入) """
+    coords = list(geometry.exterior.coords)
+    vertices = []
+    for x, y in coords[:-1]:
+        vertices.append((x, y, 0))
+    for x, y in coords[:-1]:
+        vertices.append((x, y, height))
+    faces = []
+    n = len(coords) - 1
+    faces.append(list(range(1, n + 1)))
+    faces.append(list(range(n + 1, 2 * n + 1))[::-1])
+    for i in range(n):
+        v1 = i + 1
+        v2 = (i + 1) % n + 1
+        faces.append([v1, v2, v2 + n, v1 + n])
+    for x, y, z in vertices:
+        f.write(f'v {x} {y} {z}\n')
+    for face in faces:
+        f.write('f ' + ' '.join(str(i + offset) for i in face) + '\n')
+    return len(vertices)
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed:.2f}秒")
+    return result, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="建筑拉伸与网格写入耗时测试")
+    parser.add_argument("--buildings", type=int, default=100000, help="建筑数量")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    geometries, heights = make_footprints(args.buildings, rng)
+    print(f"建筑数量: {len(geometries)}, 三角化: {'mapbox_earcut' if extrude.mapbox_earcut else 'shapely'}")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory(prefix="gmp_extrude_") as root:
+        def legacy():
+            offset = 0
+            skipped = 0
+            with open(os.path.join(root, "legacy.obj"), 'w') as f:
+                for geometry, height in zip(geometries, heights):
+                    if isinstance(geometry, Polygon):
+                        offset += legacy_write_obj(f, geometry, height, offset)
+                    else:
+                        skipped += 1
+            return skipped
+
+        skipped, legacy_time = timed("原实现(逐行写入OBJ)", legacy)
+        print(f"  原实现跳过的MultiPolygon: {skipped} 个，内环被忽略: {sum(1 for g in geometries if isinstance(g, Polygon) and g.interiors)} 个")
+
+        (vertices, faces, _), extrude_time = timed("NumPy拉伸", extrude.extrude_geometries, np.array(geometries), heights)
+        print(f"  顶点: {len(vertices)}, 三角面: {len(faces)}")
+        total = extrude_time
+        for ext, writer in (("obj", extrude.write_obj), ("ply", extrude.write_ply), ("glb", extrude.write_glb)):
+            path = os.path.join(root, f"buildings.{ext}")
+            _, elapsed = timed(f"写入{ext.upper()}", writer, path, vertices, faces)
+            print(f"  文件大小: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+            if ext == "obj":
+                total += elapsed
+        print(f"拉伸+OBJ合计: {total:.2f}秒, 相比原实现加速 {legacy_time / total:.1f}x")
+
+if __name__ == "__main__":
+    main()
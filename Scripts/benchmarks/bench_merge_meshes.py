@@ -0,0 +1,120 @@
+'''
+Author: Leili
+Date: 2026-10-19 23:10:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 23:10:00
+FilePath: /GoogleModelProcess/Scripts/benchmarks/bench_merge_meshes.py
+Description: 在合成的多对象场景上对比bpy.ops.object.join与基于网格数据的merge_meshes的合并耗时，需要在Blender中运行
+
+用法:
+    blender -b --factory-startup --python Scripts/benchmarks/bench_merge_meshes.py -- --objects 1000 5000 20000
+'''
+import os
+import sys
+import time
+import argparse
+
+import bpy
+import numpy as np
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(os.path.dirname(current_dir))
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+from Scripts.mesh_tools import merge_meshes
+
+def make_scene(count, subdivisions, rng):
+    """
+    清空场景并生成count个网格对象，模拟RDC导入后每个draw call一个对象的场景：
+    每个对象是一块带UV的网格，有两个材质槽(共3种材质)，面交替使用两个槽，对象带有随机的平移、旋转和缩放
+    """
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    materials = [bpy.data.materials.new(f"Material_{i}") for i in range(3)]
+
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=subdivisions, y_subdivisions=subdivisions, size=10)
+    template_object = bpy.context.active_object
+    template = template_object.data
+    bpy.data.objects.remove(template_object)
+    indices = (np.arange(len(template.polygons)) % 2).astype(np.int32)
+    template.polygons.foreach_set('material_index', indices)
+
+    collection = bpy.context.scene.collection
+    locations = rng.uniform(-2000.0, 2000.0, (count, 3))
+    rotations = rng.uniform(-np.pi, np.pi, (count, 3))
+    scales = rng.uniform(0.5, 2.0, count)
+    for i in range(count):
+        mesh = template.copy()
+        mesh.materials.append(materials[i % 3])
+        mesh.materials.append(materials[(i + 1) % 3])
+        obj = bpy.data.objects.new(f"Draw_{i}", mesh)
+        collection.objects.link(obj)
+        obj.location = locations[i]
+        obj.rotation_euler = rotations[i]
+        obj.scale = (scales[i],) * 3
+    bpy.data.meshes.remove(template)
+    bpy.context.view_layer.update()
+    return [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
+
+def join_meshes(objects):
+    """ 原merge_all_meshes的实现 """
+    bpy.ops.object.select_all(action='DESELECT')
+    for obj in objects:
+        obj.select_set(True)
+    bpy.context.view_layer.objects.active = objects[0]
+    bpy.ops.object.join()
+    bpy.context.view_layer.objects.active.name = "Combined_Mesh"
+    return bpy.context.view_layer.objects.active
+
+def summarize(obj):
+    """
+    合并结果的比较数据：每个坐标轴分别排序的世界坐标、每个面的材质名称计数和UV之和
+    """
+    mesh = obj.data
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', co)
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    world = co.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+    world = np.sort(world, axis=0)
+    indices = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get('material_index', indices)
+    names = np.array([material.name for material in mesh.materials])[indices]
+    uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    mesh.uv_layers[0].data.foreach_get('uv', uv)
+    return world, dict(zip(*np.unique(names, return_counts=True))), float(uv.sum(dtype=np.float64))
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="网格合并耗时测试")
+    parser.add_argument("--objects", type=int, nargs="+", default=[1000, 5000, 20000], help="对象数量")
+    parser.add_argument("--subdivisions", type=int, default=10, help="每个对象的网格细分数(顶点数为其平方)")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    args = parser.parse_args(argv)
+
+    # 在小场景上验证两种实现的结果一致
+    joined = summarize(join_meshes(make_scene(200, args.subdivisions, np.random.default_rng(args.seed))))
+    merged = summarize(merge_meshes(make_scene(200, args.subdivisions, np.random.default_rng(args.seed))))
+    print(f"结果一致性检查(200个对象): 世界坐标{'一致' if np.allclose(joined[0], merged[0], atol=0.01) else '不一致'}，"
+          f"材质面数{'一致' if joined[1] == merged[1] else '不一致'}，"
+          f"UV之和 {joined[2]:.1f} / {merged[2]:.1f}")
+    print("=" * 60)
+
+    for count in args.objects:
+        objects = make_scene(count, args.subdivisions, np.random.default_rng(args.seed))
+        vertex_count = sum(len(obj.data.vertices) for obj in objects)
+        result, join_time = timed(join_meshes, objects)
+        print(f"对象数 {count} (顶点 {vertex_count}): join {join_time:.2f}秒", end="", flush=True)
+
+        objects = make_scene(count, args.subdivisions, np.random.default_rng(args.seed))
+        result, merge_time = timed(merge_meshes, objects)
+        print(f", merge_meshes {merge_time:.2f}秒, 加速 {join_time / merge_time:.1f}x, "
+              f"合并后顶点 {len(result.data.vertices)}")
+
+if __name__ == "__main__":
+    main()
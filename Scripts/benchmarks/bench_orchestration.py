@@ -0,0 +1,104 @@
+'''
+Author: Leili
+Date: 2026-10-19 10:10:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 05:23:44
+FilePath: /GoogleModelProcess/Scripts/benchmarks/bench_orchestration.py
+Description: 使用模拟驱动压测抓取流程的编排逻辑，统计每小时处理地址数和编排开销
+
+用法:
+    python Scripts/benchmarks/bench_orchestration.py --districts 2 --addresses 50 --latency 0.01 --failure-rate 0.05
+'''
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(os.path.dirname(current_dir))
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+def create_synthetic_workspace(root, district_count, address_count):
+    """
+    生成合成的区域目录和配置文件
+
+    返回:
+        str: 配置文件路径
+    """
+    request_dir = os.path.join(root, "request")
+    for d in range(district_count):
+        district = f"D{d + 1}"
+        district_dir = os.path.join(request_dir, district)
+        os.makedirs(district_dir, exist_ok=True)
+        with open(os.path.join(district_dir, f"{district}.txt"), 'w', encoding='utf-8') as f:
+            for i in range(address_count):
+                f.write(f"{i + 1} Synthetic St, District {district}, CA 9{d:04d}\n")
+        for i in range(address_count):
+            with open(os.path.join(district_dir, f"{district} ({i + 1}).png"), 'wb') as f:
+                f.write(b"\x89PNG\r\n\x1a\n")
+
+    config_path = os.path.join(root, "config.ini")
+    with open(config_path, 'w', encoding='utf-8') as f:
+        f.write("[API]\ngoogle_maps_api_key = simulated\n\n")
+        f.write("[Paths]\n")
+        f.write(f"request_dir = {request_dir}\n")
+        f.write(f"rdc_dir = {os.path.join(root, 'rdc')}\n")
+        f.write(f"result_dir = {os.path.join(root, 'results')}\n")
+        f.write(f"district_file = {os.path.join(root, 'district.txt')}\n")
+        f.write(f"chrome_path = {os.path.join(root, 'chrome.exe')}\n")
+        f.write(f"renderdoc_path = {os.path.join(root, 'qrenderdoc.exe')}\n")
+        f.write(f"blender_path = {os.path.join(root, 'blender.exe')}\n\n")
+        f.write("[Settings]\nrdc_file_min_size = 1\nmin_match_count = 10\naddress = \n")
+        f.write(f"metrics_textfile = {os.path.join(root, 'logs', 'gmp.prom')}\n\n")
+        f.write(f"[Logging]\nlog_level = warning\nlog_dir = {os.path.join(root, 'logs')}\n")
+    os.makedirs(os.path.join(root, 'rdc'), exist_ok=True)
+    return config_path
+
+def main():
+    parser = argparse.ArgumentParser(description="抓取流程编排压测(模拟驱动)")
+    parser.add_argument("--districts", type=int, default=2, help="区域数量")
+    parser.add_argument("--addresses", type=int, default=50, help="每个区域的地址数量")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个模拟步骤的耗时(秒)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="每个模拟步骤的失败概率")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument("--show-metrics", action="store_true", help="输出运行结束时的指标")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="gmp_bench_") as root:
+        os.environ['GOOGLE_MODEL_PROCESS_CONFIG'] = create_synthetic_workspace(
+            root, args.districts, args.addresses)
+
+        # 配置文件准备好之后再导入流程模块
+        from Scripts.automation import SimulatedDriver, set_driver
+        from Scripts import capture_google_model
+
+        steps = SimulatedDriver.DEFAULT_LATENCIES.keys()
+        driver = SimulatedDriver(
+            latencies={step: args.latency for step in steps},
+            failure_rates={step: args.failure_rate for step in steps},
+            rdc_size=2 * 1024 * 1024,
+            seed=args.seed,
+        )
+        set_driver(driver)
+
+        start = time.perf_counter()
+        capture_google_model.main()
+        elapsed = time.perf_counter() - start
+
+        total = args.districts * args.addresses
+        overhead = elapsed - driver.simulated_time
+        print("=" * 50)
+        print(f"区域数: {args.districts}, 地址总数: {total}")
+        print(f"总耗时: {elapsed:.2f}秒, 模拟步骤耗时: {driver.simulated_time:.2f}秒")
+        print(f"编排开销: {overhead:.2f}秒 ({overhead / total * 1000:.1f}毫秒/地址)")
+        print(f"吞吐量: {total / elapsed * 3600:.0f} 地址/小时")
+        print(f"步骤调用次数: {driver.calls}")
+        print(f"步骤失败次数: {driver.failures}")
+        if args.show_metrics:
+            print(capture_google_model.metrics.REGISTRY.render())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+'''
+Author: Leili
+Date: 2026-10-19 19:10:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 22:10:00
+FilePath: /GoogleModelProcess/Scripts/benchmarks/bench_osm_concurrent.py
+Description: 使用本地模拟的Google地理编码和Overpass服务，测试osm.main在不同并发线程数下的吞吐量
+
+用法:
+    python Scripts/benchmarks/bench_osm_concurrent.py --addresses 40 --workers 1 4 8 --latency 0.2
+'''
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from urllib.parse import urlparse, parse_qs, unquote_plus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(os.path.dirname(current_dir))
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+import osmnx as ox
+
+from Scripts import osm
+
+# 模拟地址的中心位置(洛杉矶)
+CENTER_LON, CENTER_LAT = -118.35, 33.96
+STEP_DEG = 0.001
+
+def address_location(address):
+    """ 模拟地址按编号排列在网格上 """
+    number = int(address.split()[0])
+    return CENTER_LAT + (number // 100) * STEP_DEG, CENTER_LON + (number % 100) * STEP_DEG
+
+def overpass_response(lat, lon):
+    """ 在坐标处返回一个边长约10米的建筑 """
+    d = 0.00005
+    corners = [(lat - d, lon - d), (lat - d, lon + d), (lat + d, lon + d), (lat + d, lon - d)]
+    base = int(abs(lat * 1e5)) * 1000 + int(abs(lon * 1e5)) % 1000 * 10
+    nodes = [{'type': 'node', 'id': base + i, 'lat': y, 'lon': x} for i, (y, x) in enumerate(corners)]
+    way = {'type': 'way', 'id': base, 'nodes': [n['id'] for n in nodes] + [base],
+           'tags': {'building': 'yes', 'height': '12'}}
+    return {'version': 0.6, 'elements': nodes + [way]}
+
+class StubHandler(BaseHTTPRequestHandler):
+    """ 模拟Google地理编码和Overpass接口，每个请求固定延迟 """
+    latency = 0.2
+    lock = threading.Lock()
+    requests = {'geocode': 0, 'overpass': 0}
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        if url.path.endswith('/geocode/json'):
+            with self.lock:
+                self.requests['geocode'] += 1
+            lat, lng = address_location(parse_qs(url.query)['address'][0])
+            self.reply({'status': 'OK', 'results': [{'geometry': {'location': {'lat': lat, 'lng': lng}}}]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        time.sleep(self.latency)
+        query = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+        with self.lock:
+            self.requests['overpass'] += 1
+        # 查询范围为多边形，取其坐标的中心作为建筑位置
+        values = [float(v) for v in re.search(r"poly:['\"]([^'\"]+)", unquote_plus(query)).group(1).split()]
+        lats, lons = values[0::2], values[1::2]
+        self.reply(overpass_response(sum(lats) / len(lats), sum(lons) / len(lons)))
+
+def main():
+    parser = argparse.ArgumentParser(description="osm.main并发吞吐量测试")
+    parser.add_argument("--addresses", type=int, default=40, help="地址数量")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8], help="并发线程数")
+    parser.add_argument("--latency", type=float, default=0.2, help="模拟服务的响应延迟(秒)")
+    parser.add_argument("--map-mode", default="per_address", help="地图输出方式(per_address/run/tile/none)")
+    parser.add_argument("--result-format", default="geojson", help="匹配结果格式(geojson/gpkg/parquet)")
+    parser.add_argument("--overpass-rate", type=float, default=0, help="Overpass限速(次/秒)，0表示不限速")
+    args = parser.parse_args()
+
+    StubHandler.latency = args.latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    # 关闭osmnx的缓存、瓦片缓存和Overpass状态查询，每个地址都实际请求模拟服务
+    ox.settings.use_cache = False
+    ox.settings.overpass_rate_limit = False
+
+    addresses = [f"{i} Stub Street, Los Angeles, CA" for i in range(args.addresses)]
+    print(f"地址数量: {len(addresses)}, 模拟延迟: {args.latency}秒")
+    print("=" * 60)
+    cwd = os.getcwd()
+    baseline = None
+    for workers in args.workers:
+        root = tempfile.mkdtemp(prefix="gmp_osm_concurrent_")
+        try:
+            os.chdir(root)
+            with open('addresses.json', 'w', encoding='utf-8') as f:
+                json.dump(addresses, f)
+            start = time.perf_counter()
+            osm.main('AIzaStubKey', 'addresses.json', workers=workers, google_rate=None,
+                     overpass_rate=args.overpass_rate or None, google_base_url=base_url,
+                     overpass_url=f"{base_url}/api", map_mode=args.map_mode,
+                     result_format=args.result_format, cache_dir=None)
+            elapsed = time.perf_counter() - start
+            written = len(os.listdir('osm/result/obj'))
+            maps = len(os.listdir('osm/result/html'))
+            results = [name for name in os.listdir('osm/result') if name.startswith('buildings_')]
+            if results:
+                import geopandas as gpd
+                path = os.path.join('osm/result', results[0])
+                frame = gpd.read_parquet(path) if path.endswith('.parquet') else gpd.read_file(path)
+                print(f"  {results[0]}: {len(frame)} 行, 列 {list(frame.columns)}")
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(root, ignore_errors=True)
+        baseline = baseline or elapsed
+        print(f"线程数 {workers}: {elapsed:.2f}秒, {len(addresses) / elapsed:.1f} 地址/秒, "
+              f"生成OBJ {written} 个, HTML {maps} 个, 相比第一组加速 {baseline / elapsed:.1f}x")
+    print(f"模拟服务请求数: {StubHandler.requests}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
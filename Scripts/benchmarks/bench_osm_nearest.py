@@ -0,0 +1,107 @@
+'''
+Author: Leili
+Date: 2026-10-19 17:20:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 17:20:00
+FilePath: /GoogleModelProcess/Scripts/benchmarks/bench_osm_nearest.py
+Description: 对比逐地址查找最近建筑(原osm.py的实现)与按UTM分带批量sjoin_nearest的耗时
+
+用法:
+    python Scripts/benchmarks/bench_osm_nearest.py --sizes 1000 10000 --buildings 50000
+'''
+import os
+import sys
+import math
+import time
+import argparse
+
+import numpy as np
+import geopandas as gpd
+from shapely.geometry import Point, box
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(os.path.dirname(current_dir))
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+from Scripts.osm_nearest import assign_nearest
+
+# 合成数据的中心位置(洛杉矶)
+CENTER_LON, CENTER_LAT = -118.35, 33.96
+
+def make_footprints(count, rng):
+    """ 在中心位置周边网格上生成边长10~30米的矩形建筑 """
+    side = int(math.ceil(math.sqrt(count)))
+    spacing = 40.0 / 111000.0
+    ix, iy = np.divmod(np.arange(count), side)
+    lons = CENTER_LON + (ix - side / 2) * spacing / math.cos(math.radians(CENTER_LAT))
+    lats = CENTER_LAT + (iy - side / 2) * spacing
+    half = rng.uniform(5, 15, count) / 111000.0
+    geometries = [box(x - h, y - h, x + h, y + h) for x, y, h in zip(lons, lats, half)]
+    return gpd.GeoDataFrame({'building': ['yes'] * count}, geometry=geometries, crs="EPSG:4326")
+
+def make_addresses(footprints, count, rng):
+    """ 在随机建筑附近(0~20米)生成地址坐标 """
+    picks = rng.integers(0, len(footprints), count)
+    centroids = footprints.geometry.values[picks]
+    offset = rng.uniform(-20, 20, (count, 2)) / 111000.0
+    return (np.array([c.centroid.x for c in centroids]) + offset[:, 0],
+            np.array([c.centroid.y for c in centroids]) + offset[:, 1])
+
+def per_address_nearest(footprints, lons, lats, dist=50):
+    """ 原osm.py的实现：每个地址构造UTM坐标系、投影、计算到所有候选建筑的距离并排序 """
+    pad = dist / 111000.0
+    results = []
+    for lon, lat in zip(lons, lats):
+        # 模拟features_from_point(dist=50)返回的周边建筑
+        gdf = footprints.cx[lon - pad * 1.3:lon + pad * 1.3, lat - pad:lat + pad]
+        if gdf.empty:
+            results.append(None)
+            continue
+        utm_zone = int(math.floor((lon + 180) / 6) + 1)
+        utm_crs = f'EPSG:326{utm_zone:02d}' if lat >= 0 else f'EPSG:327{utm_zone:02d}'
+        gdf_proj = gdf.to_crs(utm_crs)
+        center_proj = gpd.GeoSeries([Point(lon, lat)], crs=gdf.crs).to_crs(utm_crs)[0]
+        gdf_proj['distance'] = gdf_proj.geometry.distance(center_proj)
+        nearest_building = gdf_proj.sort_values('distance').iloc[0]
+        gpd.GeoDataFrame([nearest_building], geometry='geometry', crs=utm_crs).to_crs(gdf.crs)
+        results.append(nearest_building.name)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="最近建筑查找耗时对比")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="地址数量")
+    parser.add_argument("--buildings", type=int, default=50000, help="建筑数量")
+    parser.add_argument("--max-distance", type=float, default=50, help="最大距离(米)")
+    parser.add_argument("--skip-per-address-above", type=int, default=0,
+                        help="地址数量超过该值时不运行逐地址实现，0表示都运行")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    footprints = make_footprints(args.buildings, rng)
+    print(f"建筑数量: {len(footprints)}")
+    print("=" * 60)
+    for size in args.sizes:
+        lons, lats = make_addresses(footprints, size, rng)
+
+        start = time.perf_counter()
+        batch = assign_nearest(footprints, lons, lats, args.max_distance)
+        batch_time = time.perf_counter() - start
+        matched = int(batch['footprint'].notna().sum())
+        print(f"{size} 个地址 - 批量sjoin_nearest: {batch_time:.2f}秒 "
+              f"({batch_time / size * 1000:.3f}毫秒/地址), 匹配 {matched} 个")
+
+        if args.skip_per_address_above and size > args.skip_per_address_above:
+            continue
+        start = time.perf_counter()
+        legacy = per_address_nearest(footprints, lons, lats, args.max_distance)
+        legacy_time = time.perf_counter() - start
+        same = sum(1 for a, b in zip(legacy, batch['footprint']) if a == b)
+        print(f"{size} 个地址 - 逐地址实现: {legacy_time:.2f}秒 "
+              f"({legacy_time / size * 1000:.3f}毫秒/地址), 加速 {legacy_time / batch_time:.1f}x, "
+              f"结果一致 {same}/{size}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+'''
+Author: Leili
+Date: 2026-10-19 23:40:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 23:40:00
+FilePath: /GoogleModelProcess/Scripts/benchmarks/bench_remove_unselected.py
+Description: 在合成的大网格上对比bmesh.ops.delete与基于选择掩码的remove_unselected删除未选中顶点的耗时，需要在Blender中运行
+
+用法:
+    blender -b --factory-startup --python Scripts/benchmarks/bench_remove_unselected.py -- --subdivisions 2000 --fraction 0.01
+'''
+import os
+import sys
+import time
+import argparse
+
+import bpy
+import bmesh
+import numpy as np
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(os.path.dirname(current_dir))
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+from Scripts.mesh_tools import remove_unselected, read_field, write_field
+
+def make_object(subdivisions, fraction):
+    """
+    清空场景并生成一块subdivisions x subdivisions个顶点的网格，模拟合并后的整个场景：
+    带UV，有两个材质槽，面交替使用两个槽，部分面为平滑着色；
+    选中中间约fraction比例的顶点(模板匹配选出的目标建筑)，并进入编辑模式
+
+    返回:
+        bpy.types.Object: 处于编辑模式的网格对象
+    """
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=subdivisions, y_subdivisions=subdivisions, size=1000)
+    obj = bpy.context.active_object
+    bpy.ops.object.mode_set(mode='OBJECT')
+    mesh = obj.data
+    for i in range(2):
+        mesh.materials.append(bpy.data.materials.new(f"Material_{i}"))
+    faces = np.arange(len(mesh.polygons))
+    write_field(mesh, 'material_index', faces % 2)
+    write_field(mesh, 'sharp_face', faces % 3 == 0)
+
+    co = read_field(mesh, 'position')
+    half = 500.0 * np.sqrt(fraction)
+    selected = (np.abs(co[:, 0]) <= half) & (np.abs(co[:, 1]) <= half)
+    write_field(mesh, 'select_vert', selected)
+    write_field(mesh, 'select_edge', np.zeros(len(mesh.edges), dtype=bool))
+    write_field(mesh, 'select_poly', np.zeros(len(mesh.polygons), dtype=bool))
+    bpy.ops.object.mode_set(mode='EDIT')
+    return obj
+
+def bmesh_remove_unselected(obj):
+    """ 原remove_unselected_vertices的实现 """
+    bm = bmesh.from_edit_mesh(obj.data)
+    bm.verts.ensure_lookup_table()
+    verts_to_remove = [v for v in bm.verts if not v.select]
+    bmesh.ops.delete(bm, geom=verts_to_remove, context='VERTS')
+    bmesh.update_edit_mesh(obj.data)
+    return len(verts_to_remove)
+
+def summarize(obj):
+    """
+    删除结果的比较数据：顶点/边/面数、每个坐标轴分别排序的坐标、材质索引计数、平滑面数和UV之和
+    """
+    bpy.ops.object.mode_set(mode='OBJECT')
+    mesh = obj.data
+    counts = (len(mesh.vertices), len(mesh.edges), len(mesh.polygons))
+    co = np.sort(read_field(mesh, 'position'), axis=0)
+    materials = np.bincount(read_field(mesh, 'material_index'), minlength=2).tolist()
+    sharp = int(read_field(mesh, 'sharp_face').sum())
+    uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    mesh.uv_layers[0].data.foreach_get('uv', uv)
+    return counts, co, materials, sharp, float(uv.sum(dtype=np.float64))
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description="删除未选中顶点耗时测试")
+    parser.add_argument("--subdivisions", type=int, default=2000, help="网格每边的顶点数(顶点数为其平方)")
+    parser.add_argument("--fraction", type=float, default=0.01, help="选中顶点的比例")
+    args = parser.parse_args(argv)
+
+    # 在小网格上验证两种实现的结果一致
+    obj = make_object(200, args.fraction)
+    bmesh_remove_unselected(obj)
+    expected = summarize(obj)
+    obj = make_object(200, args.fraction)
+    remove_unselected(obj)
+    actual = summarize(obj)
+    same = (expected[0] == actual[0] and np.array_equal(expected[1], actual[1])
+            and expected[2:4] == actual[2:4] and np.isclose(expected[4], actual[4]))
+    print(f"结果一致性检查(4万顶点): {'一致' if same else '不一致'}，顶点/边/面 {expected[0]} / {actual[0]}，"
+          f"材质面数 {expected[2]} / {actual[2]}，平滑面数 {expected[3]} / {actual[3]}")
+    print("=" * 60)
+
+    # 两种实现都计到网格数据写回对象模式为止(保存.blend时同样需要写回)：
+    # bmesh路径在编辑模式中删除后写回删除后的小网格，掩码路径先写回整个网格的选择状态再删除
+    obj = make_object(args.subdivisions, args.fraction)
+    vertex_count = len(obj.data.vertices)
+    removed, delete_time = timed(bmesh_remove_unselected, obj)
+    _, flush_time = timed(bpy.ops.object.mode_set, mode='OBJECT')
+    bmesh_time = delete_time + flush_time
+    print(f"bmesh.ops.delete: {bmesh_time:.2f}秒 (删除 {delete_time:.2f}秒 + 写回网格 {flush_time:.2f}秒)", flush=True)
+
+    obj = make_object(args.subdivisions, args.fraction)
+    _, flush_time = timed(bpy.ops.object.mode_set, mode='OBJECT')
+    removed, cull_time = timed(remove_unselected, obj)
+    mask_time = flush_time + cull_time
+    print(f"remove_unselected(选择掩码): {mask_time:.2f}秒 (写回网格 {flush_time:.2f}秒 + 删除 {cull_time:.2f}秒)")
+    print(f"顶点数: {vertex_count}, 删除 {removed}, 删除步骤加速 {delete_time / cull_time:.1f}x, 总加速 {bmesh_time / mask_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+'''
+Author: Leili
+Date: 2026-10-19 16:15:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 16:15:00
+FilePath: /GoogleModelProcess/Scripts/benchmarks/bench_startup.py
+Description: 测量抓取流程模块的导入耗时、导入时加载的重量级依赖，以及运行前检查缓存前后的耗时
+
+用法:
+    python Scripts/benchmarks/bench_startup.py --runs 10
+'''
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(os.path.dirname(current_dir))
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+# 在子进程中导入流程模块，输出导入耗时和已加载的重量级依赖
+IMPORT_PROBE = """
+import sys, time, json
+sys.path.insert(0, {project_dir!r})
+start = time.perf_counter()
+import Scripts.capture_google_model
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{'import_seconds': elapsed, 'loaded': heavy}}))
+"""
+
+HEAVY_MODULES = ['googlemaps', 'psutil', 'cv2', 'numpy', 'pyautogui', 'win32com', 'requests']
+
+def write_config(root):
+    """ 生成不指向任何真实工具的配置文件，避免在项目目录下创建日志 """
+    config_path = os.path.join(root, "config.ini")
+    with open(config_path, 'w', encoding='utf-8') as f:
+        f.write("[API]\ngoogle_maps_api_key = simulated\n\n[Paths]\n")
+        for name in ('chrome', 'renderdoc', 'blender'):
+            f.write(f"{name}_path = {os.path.join(root, name + '.exe')}\n")
+        f.write(f"rdc_dir = {os.path.join(root, 'rdc')}\nresult_dir = {os.path.join(root, 'results')}\n\n")
+        f.write(f"[Logging]\nlog_level = warning\nlog_dir = {os.path.join(root, 'logs')}\n")
+    return config_path
+
+def measure_import(runs):
+    """ 多次在新进程中导入流程模块，返回(导入耗时列表, 进程总耗时列表, 已加载的重量级依赖) """
+    code = IMPORT_PROBE.format(project_dir=project_dir, heavy=HEAVY_MODULES)
+    import_times, process_times, loaded = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, check=True).stdout
+        process_times.append(time.perf_counter() - start)
+        result = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+        import_times.append(result['import_seconds'])
+        loaded = result['loaded']
+    return import_times, process_times, loaded
+
+def main():
+    parser = argparse.ArgumentParser(description="流程模块导入和启动耗时测试")
+    parser.add_argument("--runs", type=int, default=10, help="导入测试的次数")
+    parser.add_argument("--checks", type=int, default=100, help="check_chrome_version调用次数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="gmp_startup_") as root:
+        os.environ['GOOGLE_MODEL_PROCESS_CONFIG'] = write_config(root)
+
+        import_times, process_times, loaded = measure_import(args.runs)
+        print("=" * 50)
+        print(f"导入capture_google_model: 中位数 {statistics.median(import_times) * 1000:.1f}毫秒, "
+              f"最小 {min(import_times) * 1000:.1f}毫秒 ({args.runs}次)")
+        print(f"进程启动+导入: 中位数 {statistics.median(process_times) * 1000:.1f}毫秒")
+        print(f"导入时加载的重量级依赖: {', '.join(loaded) or '无'}")
+
+        from Scripts.preflight import run_preflight
+        from Scripts import capture_google_model
+
+        start = time.perf_counter()
+        run_preflight()
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(args.checks):
+            capture_google_model.get_chrome_version()
+        cached = (time.perf_counter() - start) / args.checks
+        print(f"运行前检查: 首次 {first * 1000:.1f}毫秒, 缓存后 {cached * 1e6:.2f}微秒/次")
+
+if __name__ == "__main__":
+    main()
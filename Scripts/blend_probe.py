@@ -0,0 +1,29 @@
+'''
+Author: Leili
+Date: 2026-10-19 15:40:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 15:40:00
+FilePath: /GoogleModelProcess/Scripts/blend_probe.py
+Description: 在无界面Blender中打开已有的.blend文件并写入网格统计旁路文件，供结果目录补录使用
+
+用法:
+    blender -b <文件>.blend --python Scripts/blend_probe.py
+'''
+import os
+import sys
+
+import bpy
+
+# 添加项目根目录到Python路径
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(script_dir)
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+from Scripts.blender_script import write_mesh_stats
+
+if __name__ == "__main__":
+    if bpy.data.filepath:
+        write_mesh_stats(bpy.data.filepath)
+    else:
+        print("未打开.blend文件")
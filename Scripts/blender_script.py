@@ -2,13 +2,14 @@
 Author: Leili
 Date: 2025-04-29 16:30:00
 LastEditors: Leili
-LastEditTime: 2025-06-11 11:49:39
+LastEditTime: 2026-10-19 23:40:00
 FilePath: /GoogleModelProcess/Scripts/blender_script.py
 Description: Blender内部操作脚本
 '''
 import bpy
 import os
 import sys
+import json
 import time
 from datetime import datetime
 
@@ -160,6 +161,7 @@ def save_blender_project():
         # 保存Blender项目
         bpy.ops.wm.save_as_mainfile(filepath=blend_file_path, compress=True, relative_remap=True)
         logD(f"已将Blender项目保存至: {blend_file_path}")
+        write_mesh_stats(blend_file_path)
         
         # 延迟一小段时间确保文件保存完成
         time.sleep(2)
@@ -215,10 +217,68 @@ def count_meshes():
 
     return mesh_count, mesh_objects
 
+def collect_mesh_stats():
+    """
+    统计场景中网格的数量、顶点数、面数、世界坐标包围盒和纹理大小，用于写入结果目录
+
+    返回:
+        dict: 网格统计信息
+    """
+    from mathutils import Vector
+
+    mesh_count, _ = count_meshes()
+    vertex_count = 0
+    face_count = 0
+    bbox_min = None
+    bbox_max = None
+    for obj in bpy.context.scene.objects:
+        if obj.type != 'MESH':
+            continue
+        vertex_count += len(obj.data.vertices)
+        face_count += len(obj.data.polygons)
+        for corner in obj.bound_box:
+            world = obj.matrix_world @ Vector(corner)
+            if bbox_min is None:
+                bbox_min = list(world)
+                bbox_max = list(world)
+            else:
+                bbox_min = [min(a, b) for a, b in zip(bbox_min, world)]
+                bbox_max = [max(a, b) for a, b in zip(bbox_max, world)]
+
+    # 已打包的纹理按打包数据大小统计，未打包的按外部文件大小统计
+    texture_bytes = 0
+    for img in bpy.data.images:
+        if img.packed_file:
+            texture_bytes += img.packed_file.size
+        elif img.filepath:
+            image_path = bpy.path.abspath(img.filepath)
+            if os.path.exists(image_path):
+                texture_bytes += os.path.getsize(image_path)
+
+    return {
+        'mesh_count': mesh_count,
+        'vertex_count': vertex_count,
+        'face_count': face_count,
+        'bbox_min': bbox_min,
+        'bbox_max': bbox_max,
+        'texture_bytes': texture_bytes,
+    }
+
+def write_mesh_stats(blend_file_path):
+    """ 将网格统计写入.blend文件的旁路文件，供结果目录读取 """
+    from Scripts.catalog import stats_path
+    try:
+        with open(stats_path(blend_file_path), 'w', encoding='utf-8') as f:
+            json.dump(collect_mesh_stats(), f, ensure_ascii=False, indent=2)
+        logD(f"已写入网格统计: {stats_path(blend_file_path)}")
+    except Exception as e:
+        logW(f"写入网格统计时发生错误: {str(e)}")
+
 def merge_all_meshes(merged_name="Combined_Mesh"):
     """
     合并场景中所有的Mesh对象
     """
+    from Scripts.mesh_tools import merge_meshes
     # 获取所有网格对象
     mesh_objects = []
     for obj in bpy.context.scene.objects:
@@ -229,42 +289,14 @@ def merge_all_meshes(merged_name="Combined_Mesh"):
         logW("场景中没有网格物体可合并")
         return None
     
-    # 统计合并前的网格数量
-    # print("合并前:")
-    # initial_count, initial_meshes = count_meshes()
-    
-    # 确保所有对象都被选中
-    bpy.ops.object.select_all(action='DESELECT')
-    
-    # 选择要合并的对象
-    for obj in mesh_objects:
-        obj.select_set(True)
-    
-    # 设置活动对象
-    bpy.context.view_layer.objects.active = mesh_objects[0]
-    
-    # 合并对象
-    bpy.ops.object.join()
-    
-    # 重命名合并后的对象
-    bpy.context.view_layer.objects.active.name = merged_name
-    
-    # 统计合并后的网格数量
-    # print("\n合并后:")
-    # final_count, final_meshes = count_meshes()
-    
-    # # 输出统计结果
-    # print(f"\n合并统计:")
-    # print(f"初始网格数量: {initial_count}")
-    # print(f"最终网格数量: {final_count}")
-    
-    return bpy.context.view_layer.objects.active
+    # 通过网格数据批量合并，不依赖选择状态和bpy.ops.object.join的上下文
+    return merge_meshes(mesh_objects, merged_name)
 
 def center_mesh_origin(mesh_object=None):
     """
     将指定网格对象的XY中心移动到原点，Z轴保持最低点在0
     """
-    from mathutils import Vector
+    from Scripts.mesh_tools import center_origin
     if mesh_object is None:
         if bpy.context.selected_objects:
             mesh_object = bpy.context.selected_objects[0]
@@ -279,48 +311,16 @@ def center_mesh_origin(mesh_object=None):
     # 确保在对象模式下
     bpy.ops.object.mode_set(mode='OBJECT')
 
-    # 计算几何中心和最低点（所有顶点的平均位置）
-    mesh_data = mesh_object.data
-    vertex_sum = Vector((0, 0, 0))
-    min_z = float('inf')
-    
-    # 计算XY中心和Z轴最低点
-    for vertex in mesh_data.vertices:
-        # 将顶点坐标从局部空间转换到世界空间
-        world_co = mesh_object.matrix_world @ vertex.co
-        vertex_sum += Vector((world_co.x, world_co.y, 0))  # 只考虑XY坐标
-        min_z = min(min_z, world_co.z)  # 记录最低Z坐标
-    
-    # 计算平均位置（几何中心）
-    vertex_count = len(mesh_data.vertices)
-    if vertex_count > 0:
-        geometric_center = vertex_sum / vertex_count
-        # 只使用XY平移，Z设置为-最低点（这样最低点会在0）
-        translation_vector = Vector((-geometric_center.x, -geometric_center.y, -min_z))
-    else:
-        print("网格没有顶点")
+    # 使用NumPy批量计算几何中心和最低点并平移所有顶点
+    if not center_origin(mesh_object):
+        logW(f"网格 '{mesh_object.name}' 没有顶点")
         return
 
-    # 应用移动到所有顶点
-    for vertex in mesh_data.vertices:
-        # 先转换到世界空间
-        world_co = mesh_object.matrix_world @ vertex.co
-        # 应用平移
-        new_co = world_co + translation_vector
-        # 转换回局部空间
-        vertex.co = mesh_object.matrix_world.inverted() @ new_co
-
-    # 更新网格数据
-    mesh_data.update()
-
-    # 将对象自身的位置重置到原点（因为顶点已经移动了）
-    mesh_object.location = (0.0, 0.0, 0.0)
-
     logD(f"网格 '{mesh_object.name}' 已完成居中")
 
 def remove_unselected_vertices():
     """删除当前网格中所有未被选中的顶点"""
-    import bmesh
+    from Scripts.mesh_tools import remove_unselected
 
     # 获取当前活动对象
     obj = bpy.context.active_object
@@ -333,24 +333,14 @@ def remove_unselected_vertices():
         print("请在编辑模式下使用此功能")
         return
     
-    # 创建bmesh对象
-    bm = bmesh.from_edit_mesh(obj.data)
-    bm.verts.ensure_lookup_table()
-    
-    # 收集未选中的顶点
-    verts_to_remove = [v for v in bm.verts if not v.select]
-    
-    if not verts_to_remove:
+    # 按选择状态的掩码批量删除，保留的顶点、边和面重新编号后一次写回网格
+    removed = remove_unselected(obj)
+
+    if not removed:
         print("没有找到未选中的顶点")
         return
-    
-    # 删除未选中的顶点
-    bmesh.ops.delete(bm, geom=verts_to_remove, context='VERTS')
-    
-    # 更新网格
-    bmesh.update_edit_mesh(obj.data)
-    
-    print(f"已删除 {len(verts_to_remove)} 个未选中的顶点")
+
+    print(f"已删除 {removed} 个未选中的顶点")
 
 def check_save_signal():
     """
@@ -2,15 +2,13 @@
 Author: Leili
 Date: 2025-04-27 15:27:27
 LastEditors: Leili
-LastEditTime: 2025-06-11 15:45:09
+LastEditTime: 2026-10-20 13:50:00
 FilePath: /GoogleModelProcess/Scripts/capture_google_model.py
 Description: 抓取Google地图模型全流程
 '''
 import os
 import subprocess
 import time
-import psutil
-import googlemaps
 import sys
 
 # 添加项目根目录到Python路径
@@ -20,15 +18,35 @@ if project_dir not in sys.path:
     sys.path.append(project_dir)
 
 # 导入配置工具和日志工具
-from Scripts.config_utils import get_api_key, get_path, get_setting, get_log_level, get_log_dir, set_setting
-from Scripts.log_utils import setup_logger, logD, logI, logW, logE, logEX
+from Scripts.config_utils import get_api_key, get_path, get_setting, get_log_dir, set_setting
+from Scripts.log_utils import logD, logI, logW, logE, logEX
 from Scripts.utils import get_filename
-
-# 初始化日志系统
-logger = setup_logger(log_level=get_log_level(), log_dir=get_log_dir())
-
-# 从配置文件获取 Google Maps API 密钥
-API_KEY = get_api_key()
+from Scripts.dir_index import DirectoryIndex, copy_if_changed
+from Scripts.automation import get_driver
+from Scripts.stage_watchdog import StageTimeout, start_watchdog, stop_watchdog, stage, check_stage, kill_processes
+from Scripts.telemetry import start_sampler, stop_sampler
+from Scripts import metrics
+from Scripts.rdc_validate import (validate_rdc, scan_rdc_dir, remove_rdc, quarantine_rdc, DEFAULT_BYTES_PER_DRAWCALL,
+                                  QUARANTINE_SUFFIX)
+from Scripts.rdc_retention import get_retention_manager, stop_retention_manager
+from Scripts.cas_store import get_content_store
+from Scripts.catalog import get_catalog, close_catalog, build_record
+from Scripts.geocoder import get_offline_geocoder
+from Scripts.address_reader import AddressReader, find_address_file
+from Scripts.preflight import run_preflight
+
+def geocode_address(address):
+    """
+    获取地址的经纬度，优先查找离线地理编码索引(配置项geocoder_index)，未命中时调用Google Maps API
+    :return: (纬度, 经度)元组
+    """
+    geocoder = get_offline_geocoder()
+    if geocoder is not None:
+        location = geocoder.lookup(address)
+        if location is not None:
+            logD(f"离线地理编码命中: {address}")
+            return location
+    return get_coordinates_from_google(address)
 
 def get_coordinates_from_google(address, api_key=None):
     """
@@ -37,9 +55,11 @@ def get_coordinates_from_google(address, api_key=None):
     :param api_key: Google Maps API密钥，如果为None则使用配置文件中的密钥
     :return: (纬度, 经度)元组
     """
+    import googlemaps
+
     # 如果未提供API密钥，则使用配置文件中的密钥
     if api_key is None:
-        api_key = API_KEY
+        api_key = get_api_key()
     
     # 创建Google Maps客户端
     gmaps = googlemaps.Client(key=api_key)
@@ -65,6 +85,8 @@ def launch_chrome_google_map(lat=None, lng=None, zoom=None):
     :param lng: 经度
     :param zoom: 缩放级别
     """
+    import psutil
+
     # 如果未提供缩放级别，则从配置文件获取
     if zoom is None:
         zoom = int(get_setting('map_zoom', 21))
@@ -393,13 +415,18 @@ def capture_frame(filename=None):
 
 def check_rdc_file(rdc_file_path=None):
     """
-    检查RDC文件是否存在
+    检查RDC文件是否存在且有效
+    
+    功能:
+        1. 检查文件大小是否达到rdc_file_min_size
+        2. 配置rdc_deep_validation=1时(默认)校验RDC文件头和段表，并写入旁路文件
+        3. 无效的RDC文件会被删除，以便下次重新抓取
     
     参数:
         rdc_file_path: RDC文件的完整路径
     
     返回:
-        bool: 文件是否存在
+        bool: 文件是否有效
     """
     # 检查文件是否存在
     if os.path.exists(rdc_file_path):
@@ -412,16 +439,60 @@ def check_rdc_file(rdc_file_path=None):
         if rdc_size < min_size:
             logW(f"RDC文件大小过小 ({rdc_size / 1024 / 1024:.2f} MB < {int(get_setting('rdc_file_min_size', 1)):.2f} MB)，可能捕获失败")
             # 删除过小的RDC文件
-            os.remove(rdc_file_path)
-            clear_processes()
+            remove_rdc(rdc_file_path)
             return False
         
+        if int(get_setting('rdc_deep_validation', 1)):
+            result = validate_rdc(rdc_file_path,
+                                  bytes_per_drawcall=int(get_setting('rdc_bytes_per_drawcall', DEFAULT_BYTES_PER_DRAWCALL)))
+            if not result['valid']:
+                logW(f"RDC文件校验失败: {result['error']}，可能捕获失败")
+                remove_rdc(rdc_file_path)
+                return False
+            logD(f"RDC文件校验通过: {result['section_count']} 个段, 估算 {result['estimated_draw_calls']} 个draw call")
+        
         logD(f"RDC文件大小正常: {rdc_size / 1024 / 1024:.2f} MB")
         return True
     else:
         logE(f"未找到RDC文件: {rdc_file_path}")
         return False
 
+def prerun_rdc_scan():
+    """
+    运行前并行校验rdc_dir中已有的所有RDC文件，无效文件移出rdc_dir以便重新抓取
+
+    配置项:
+        rdc_prerun_scan: 是否在运行前扫描
+        rdc_prerun_action: 发现无效文件时的处理方式，quarantine(默认)移动到隔离目录，report只记录日志
+        rdc_quarantine_dir: 隔离目录，默认为rdc_dir同级的"<rdc_dir>_quarantine"
+                            (不能放在rdc_dir下，clear_processes会删除rdc_dir的子目录)
+
+    返回:
+        int: 无效RDC文件数量
+    """
+    if not int(get_setting('rdc_prerun_scan', 1)):
+        return 0
+    action = get_setting('rdc_prerun_action', 'quarantine')
+    rdc_dir = get_path('rdc_dir')
+    quarantine_dir = get_setting('rdc_quarantine_dir', '') or os.path.normpath(rdc_dir) + QUARANTINE_SUFFIX
+    results = scan_rdc_dir(rdc_dir,
+                           workers=int(get_setting('rdc_scan_workers', 4)),
+                           bytes_per_drawcall=int(get_setting('rdc_bytes_per_drawcall', DEFAULT_BYTES_PER_DRAWCALL)))
+    invalid = 0
+    for result in results:
+        if result['valid']:
+            continue
+        invalid += 1
+        if action == 'quarantine':
+            try:
+                target = quarantine_rdc(result['path'], quarantine_dir)
+                logW(f"隔离无效的RDC文件: {result['path']} -> {target}, 原因: {result['error']}")
+            except OSError as e:
+                logW(f"隔离无效的RDC文件失败: {result['path']}, {str(e)}")
+        else:
+            logW(f"发现无效的RDC文件: {result['path']}, 原因: {result['error']}")
+    return invalid
+
 def open_blender():
     """
     打开Blender并执行内部脚本
@@ -477,6 +548,7 @@ def open_blender():
                     
                 print("等待Blender脚本执行完成...")
                 time.sleep(5)
+                check_stage()
             
             # 删除信号文件
             os.remove(signal_file)
@@ -484,60 +556,168 @@ def open_blender():
             
             return True
 
+        except StageTimeout:
+            # 阶段超时交给process_district处理(记录超时并清理进程)
+            raise
         except Exception as e:
             logEX(f"启动Blender时发生错误: {str(e)}")
             return False
 
+    except StageTimeout:
+        raise
     except Exception as e:
         logEX(f"运行Blender时发生错误: {str(e)}")
         return False
 
+def capture_blender_screenshot():
+    """
+    切换到Blender窗口，按Home键后截取当前屏幕
+    
+    返回:
+        tuple: (截图路径, 时间戳, 截图保存目录)
+    """
+    # 切换到Blender窗口
+    if not activate_window("Blender"):
+        raise Exception("无法切换到Blender窗口")
+    time.sleep(1)
+    
+    import pyautogui
+    from datetime import datetime
+    from pywinauto import Application
+    
+    # 将鼠标移动到屏幕中心，然后按下Home键，确保目标在视野中的缩放比例正常
+    pyautogui.moveTo(pyautogui.size()[0] // 2, pyautogui.size()[1] // 2, duration=0.3)
+    # 连接到目标窗口（例如 "Blender"）
+    app = Application(backend="uia").connect(title_re=".*Blender.*")
+    window = app.window(title_re=".*Blender.*")
+    # 发送 Home 键
+    window.type_keys("{HOME}")
+    time.sleep(2)
+        
+    # 截取当前屏幕
+    logD("正在截取当前屏幕...")
+    screenshot = pyautogui.screenshot()
+    
+    # 创建保存截图的目录
+    save_dir = os.path.join(os.getcwd(), "screenshots")
+    if not os.path.exists(save_dir):
+        os.makedirs(save_dir)
+        
+    # 生成时间戳文件名
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    screenshot_path = os.path.join(save_dir, f"screenshot_{timestamp}.png")
+    
+    # 保存截图
+    screenshot.save(screenshot_path)
+    print(f"截图已保存至: {screenshot_path}")
+    return screenshot_path, timestamp, save_dir
+
+def describe_screenshot(screenshot_gray):
+    """
+    计算截图的SIFT特征并建立FLANN索引
+    
+    截图的特征点和索引只需计算一次，之后可以用于匹配任意多个模板
+    
+    参数:
+        screenshot_gray: 灰度截图
+    
+    返回:
+        tuple: (SIFT检测器, 截图关键点, 已训练的FLANN匹配器)
+    """
+    import cv2
+    
+    logD("使用SIFT特征匹配")
+    sift = cv2.SIFT_create()
+    kp2, des2 = sift.detectAndCompute(screenshot_gray, None)
+    
+    # 使用FLANN匹配器进行特征匹配，截图描述符作为训练集只建立一次索引
+    FLANN_INDEX_KDTREE = 1
+    index_params = dict(algorithm=FLANN_INDEX_KDTREE, trees=5)
+    search_params = dict(checks=50)
+    flann = cv2.FlannBasedMatcher(index_params, search_params)
+    if des2 is not None:
+        flann.add([des2])
+        flann.train()
+    return sift, kp2, flann
+
+def find_good_matches(template_gray, sift, flann):
+    """
+    在已建立索引的截图中查找模板的良好匹配点
+    
+    参数:
+        template_gray: 灰度模板图像
+        sift: SIFT检测器
+        flann: 已训练的FLANN匹配器(训练集为截图描述符)
+    
+    返回:
+        tuple: (模板关键点, 良好匹配点列表)
+    """
+    kp1, des1 = sift.detectAndCompute(template_gray, None)
+    if des1 is None or flann.empty():
+        return kp1, []
+    
+    # 获取匹配结果
+    matches = flann.knnMatch(des1, k=2)
+    
+    # 应用Lowe's比率测试筛选好的匹配
+    good_matches = []
+    for pair in matches:
+        if len(pair) == 2 and pair[0].distance < 0.7 * pair[1].distance:
+            good_matches.append(pair[0])
+    return kp1, good_matches
+
+def compute_target_box(good_matches, kp1, kp2, template_shape):
+    """
+    根据匹配点计算单应性矩阵以及目标在截图中的位置
+    
+    参数:
+        good_matches: 良好的特征匹配点列表
+        kp1: 模板图像的关键点
+        kp2: 截图的关键点
+        template_shape: 模板图像的尺寸
+    
+    返回:
+        tuple: (单应性矩阵, 内点掩码, 目标边界框角点, 目标中心坐标)，无法计算时返回None
+    """
+    import cv2
+    import numpy as np
+    
+    # 提取匹配点的坐标
+    src_pts = np.float32([kp1[m.queryIdx].pt for m in good_matches]).reshape(-1, 1, 2)
+    dst_pts = np.float32([kp2[m.trainIdx].pt for m in good_matches]).reshape(-1, 1, 2)
+    
+    # 计算单应性矩阵
+    M, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
+    if M is None:
+        return None
+    
+    # 定义模板图像的四个角点
+    h, w = template_shape[:2]
+    pts = np.float32([[0, 0], [0, h-1], [w-1, h-1], [w-1, 0]]).reshape(-1, 1, 2)
+    
+    # 使用单应性矩阵转换角点坐标
+    dst = cv2.perspectiveTransform(pts, M)
+    
+    # 计算目标中心点
+    center_x = int(np.mean(dst[:, 0, 0]))
+    center_y = int(np.mean(dst[:, 0, 1]))
+    return M, mask, dst, (center_x, center_y)
+
 def match_template(template_path:str):
     """
     使用特征点匹配方法查找图像中的目标
     """
     try:
-        # 切换到Blender窗口
-        if not activate_window("Blender"):
-            raise Exception("无法切换到Blender窗口")
-        time.sleep(1)
-        
         # 导入必要的库
         import cv2
-        import pyautogui
         import os
-        from datetime import datetime
         
         if not os.path.exists(template_path):
             print(f"未找到模板图片: {template_path}")
             return False
         
-        # 将鼠标移动到屏幕中心，然后按下Home键，确保目标在视野中的缩放比例正常
-        pyautogui.moveTo(pyautogui.size()[0] // 2, pyautogui.size()[1] // 2, duration=0.3)
-        from pywinauto import Application
-        # 连接到目标窗口（例如 "Blender"）
-        app = Application(backend="uia").connect(title_re=".*Blender.*")
-        window = app.window(title_re=".*Blender.*")
-        # 发送 Home 键
-        window.type_keys("{HOME}")
-        time.sleep(2)
-            
-        # 截取当前屏幕
-        logD("正在截取当前屏幕...")
-        screenshot = pyautogui.screenshot()
-        
-        # 创建保存截图的目录
-        save_dir = os.path.join(os.getcwd(), "screenshots")
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir)
-            
-        # 生成时间戳文件名
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        screenshot_path = os.path.join(save_dir, f"screenshot_{timestamp}.png")
-        
-        # 保存截图
-        screenshot.save(screenshot_path)
-        print(f"截图已保存至: {screenshot_path}")
+        # 切换到Blender窗口并截图
+        screenshot_path, timestamp, save_dir = capture_blender_screenshot()
         
         # 读取模板图片和截图
         template = cv2.imread(template_path)
@@ -554,27 +734,8 @@ def match_template(template_path:str):
         
         # 尝试使用SIFT特征检测器
         # try:
-        logD("使用SIFT特征匹配")
-        sift = cv2.SIFT_create()
-        
-        # 在模板和截图中检测关键点和描述符
-        kp1, des1 = sift.detectAndCompute(template_gray, None)
-        kp2, des2 = sift.detectAndCompute(screenshot_gray, None)
-        
-        # 使用FLANN匹配器进行特征匹配
-        FLANN_INDEX_KDTREE = 1
-        index_params = dict(algorithm=FLANN_INDEX_KDTREE, trees=5)
-        search_params = dict(checks=50)
-        flann = cv2.FlannBasedMatcher(index_params, search_params)
-        
-        # 获取匹配结果
-        matches = flann.knnMatch(des1, des2, k=2)
-        
-        # 应用Lowe's比率测试筛选好的匹配
-        good_matches = []
-        for m, n in matches:
-            if m.distance < 0.7 * n.distance:
-                good_matches.append(m)
+        sift, kp2, flann = describe_screenshot(screenshot_gray)
+        kp1, good_matches = find_good_matches(template_gray, sift, flann)
         
         print(f"SIFT找到 {len(good_matches)} 个良好匹配点")
         
@@ -637,6 +798,81 @@ def match_template(template_path:str):
         logEX(f"模板匹配过程中发生错误: {str(e)}")
         return False
 
+def match_templates_in_image(screenshot_gray, templates, min_match_count=None):
+    """
+    在同一张截图中批量匹配多个模板
+    
+    截图的SIFT特征和FLANN索引只计算一次，每个模板分别查找良好匹配点并计算单应性矩阵和外接矩形
+    
+    参数:
+        screenshot_gray: 灰度截图
+        templates: dict - {模板名称: 灰度模板图像}
+        min_match_count: int - 最少良好匹配点数，为None时使用配置项min_match_count
+    
+    返回:
+        dict: {模板名称: (单应性矩阵, 外接矩形(min_x, min_y, max_x, max_y))}，未找到目标的模板对应None
+    """
+    import numpy as np
+    
+    if min_match_count is None:
+        min_match_count = int(get_setting("min_match_count"))
+    sift, kp2, flann = describe_screenshot(screenshot_gray)
+    
+    results = {}
+    for name, template_gray in templates.items():
+        results[name] = None
+        kp1, good_matches = find_good_matches(template_gray, sift, flann)
+        logD(f"模板 {name}: SIFT找到 {len(good_matches)} 个良好匹配点")
+        if len(good_matches) < min_match_count:
+            continue
+        box = compute_target_box(good_matches, kp1, kp2, template_gray.shape)
+        if box is None:
+            continue
+        M, _, dst, _ = box
+        points = dst.reshape(4, 2)
+        min_x, min_y = np.floor(points.min(axis=0)).astype(int)
+        max_x, max_y = np.ceil(points.max(axis=0)).astype(int)
+        results[name] = (M, (int(min_x), int(min_y), int(max_x), int(max_y)))
+    return results
+
+def match_templates(template_paths):
+    """
+    切换到Blender窗口截图一次，在截图中批量匹配多个模板
+    
+    参数:
+        template_paths: list - 模板图片路径列表
+    
+    返回:
+        dict: {模板路径: (单应性矩阵, 外接矩形)}，未找到目标或无法加载的模板对应None；截图失败时返回空字典
+    """
+    try:
+        import cv2
+        
+        templates = {}
+        for template_path in template_paths:
+            template_gray = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE) if os.path.exists(template_path) else None
+            if template_gray is None:
+                logW(f"无法加载模板图片: {template_path}")
+            templates[template_path] = template_gray
+        if all(template is None for template in templates.values()):
+            return {path: None for path in template_paths}
+        
+        screenshot_path, _, _ = capture_blender_screenshot()
+        screenshot_gray = cv2.imread(screenshot_path, cv2.IMREAD_GRAYSCALE)
+        if screenshot_gray is None:
+            logE(f"无法加载截图: {screenshot_path}")
+            return {}
+        
+        results = match_templates_in_image(screenshot_gray, {path: template for path, template in templates.items()
+                                                              if template is not None})
+        found = sum(1 for result in results.values() if result)
+        logI(f"批量模板匹配完成: {found}/{len(template_paths)} 个模板找到目标")
+        return {path: results.get(path) for path in template_paths}
+    
+    except Exception as e:
+        logEX(f"批量模板匹配过程中发生错误: {str(e)}")
+        return {}
+
 def process_matches(good_matches, kp1, kp2, template_gray, screenshot_cv, template, 
                    template_path, screenshot_path, timestamp, save_dir, method_name):
     """
@@ -665,31 +901,14 @@ def process_matches(good_matches, kp1, kp2, template_gray, screenshot_cv, templa
     try:
         print(f"正在处理{method_name}特征匹配结果...")
         
-        # 提取匹配点的坐标
-        if method_name == "SIFT":
-            src_pts = np.float32([kp1[m.queryIdx].pt for m in good_matches]).reshape(-1, 1, 2)
-            dst_pts = np.float32([kp2[m.trainIdx].pt for m in good_matches]).reshape(-1, 1, 2)
-        else:  # ORB
-            src_pts = np.float32([kp1[m.queryIdx].pt for m in good_matches]).reshape(-1, 1, 2)
-            dst_pts = np.float32([kp2[m.trainIdx].pt for m in good_matches]).reshape(-1, 1, 2)
-        
-        # 计算单应性矩阵
-        M, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
+        # 计算单应性矩阵和目标位置
+        box = compute_target_box(good_matches, kp1, kp2, template_gray.shape)
+        if box is None:
+            print(f"{method_name}匹配结果无法计算单应性矩阵")
+            return False
+        M, mask, dst, (center_x, center_y) = box
         matchesMask = mask.ravel().tolist()
         
-        # 获取模板图像的尺寸
-        h, w = template_gray.shape
-        
-        # 定义模板图像的四个角点
-        pts = np.float32([[0, 0], [0, h-1], [w-1, h-1], [w-1, 0]]).reshape(-1, 1, 2)
-        
-        # 使用单应性矩阵转换角点坐标
-        dst = cv2.perspectiveTransform(pts, M)
-        
-        # 计算目标中心点
-        center_x = int(np.mean(dst[:, 0, 0]))
-        center_y = int(np.mean(dst[:, 0, 1]))
-        
         # 在结果图上绘制边界框
         result_image = screenshot_cv.copy()
         cv2.polylines(result_image, [np.int32(dst)], True, (0, 255, 0), 3)
@@ -794,37 +1013,6 @@ def process_matches(good_matches, kp1, kp2, template_gray, screenshot_cv, templa
         print(f"处理{method_name}匹配结果时发生错误: {str(e)}")
         return False
 
-def terminate_processes(process_names):
-    """
-    终止指定名称的进程
-    
-    参数:
-        process_names (dict): 进程名称和匹配方式的字典，格式为 {进程名: 是否使用部分匹配}
-                             例如: {'chrome.exe': False, 'renderdoc': True}
-                             False表示精确匹配，True表示部分匹配
-    
-    返回:
-        bool: 是否成功终止所有指定进程
-    """
-    try:
-        for proc in psutil.process_iter(['pid', 'name']):
-            for proc_name, partial_match in process_names.items():
-                try:
-                    if (partial_match and proc_name.lower() in proc.name().lower()) or \
-                       (not partial_match and proc.name().lower() == proc_name.lower()):
-                        proc.terminate()
-                        logD(f"已终止{proc.name()}进程: {proc.pid}")
-                except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
-                    logW(f"无法终止进程 {proc.name()} (PID: {proc.pid}): {str(e)}")
-                    continue
-                    
-        # 等待进程完全关闭
-        time.sleep(2)
-        return True
-    except Exception as e:
-        logW(f"关闭进程时发生错误: {str(e)}")
-        return False
-
 def remove_dir(directory):
     """ 移除整个目录 """
     import shutil
@@ -880,7 +1068,7 @@ def clear_processes():
             'renderdoc': True,      # 部分匹配
             'Blender': True         # 部分匹配
         }
-        terminate_processes(process_names)
+        kill_processes(process_names)
 
         # 清除缓存文件
         remove_subdirs_keep_files(get_path("rdc_dir"))
@@ -907,6 +1095,7 @@ def wait_for_blender_save_signal():
             logW("等待Blender保存信号超时")
             return False
         time.sleep(5)
+        check_stage()
     
     # 删除信号文件
     os.remove(signal_file)
@@ -914,112 +1103,109 @@ def wait_for_blender_save_signal():
     return True
 
 def get_chrome_version():
-    """获取Chrome浏览器版本号"""
-    chrome_path = get_path('chrome_path')
-    if os.path.exists(chrome_path):
-        try:
-            from win32com.client import Dispatch
-            parser = Dispatch("Scripting.FileSystemObject")
-            version = parser.GetFileVersion(chrome_path)
-            return version
-        except Exception as e:
-            logW(f"获取Chrome版本失败: {str(e)}")
-            return ""
-    else:
-        return ""
+    """获取Chrome浏览器版本号(运行前检查的缓存结果)"""
+    return run_preflight()['chrome_version']
 
 def check_chrome_version():
-    """ 检查chrome版本是否符合要求 """
-    chrome_version = get_chrome_version()
-    if int(chrome_version.split(".")[0]) > 135:
-        logE(f"Chrome版本过高: {chrome_version}，请使用低于136.0.0.0的版本。")
+    """ 检查chrome版本是否符合要求，Chrome版本只在第一次调用时读取 """
+    preflight = run_preflight()
+    if not preflight['chrome_ok']:
+        logE(preflight['chrome_error'])
         return False
-    else:
-        return True
-        
-def get_addresses(address_file):
-    """
-    从配置文件中指定的地址文件逐行读取地址列表
-    
-    返回:
-        list: 包含所有地址的列表，如果文件不存在或读取失败则返回空列表
-    
-    异常:
-        IOError: 当文件读取失败时抛出
-    """
-    try:
-        # address_file = get_path('address_path')
-        if not os.path.exists(address_file):
-            logE(f"地址文件不存在: {address_file}")
-            return []
-            
-        with open(address_file, 'r', encoding='utf-8') as f:
-            addresses = [line.strip() for line in f if line.strip()]
-            logI(f"从文件 '{address_file}' 成功读取 {len(addresses)} 个地址")
-            return addresses
-            
-    except Exception as e:
-        logEX(f"读取地址文件时发生错误: {str(e)}")
-        return []
+    return True
 
-def process_single_address(address, district_name, template_path) -> int:
+def process_single_address(address, district_name, template_path, rdc_index=None, result_index=None,
+                           location=None) -> int:
     """
     抓取单个地址的模型, 内部不处理异常，请在外部try
     
     参数:
         address: 要处理的地址字符串
+        rdc_index: DirectoryIndex - rdc_dir的目录索引，为None时直接访问文件系统
+        result_index: DirectoryIndex - 区域结果目录的索引，为None时直接访问文件系统
+        location: 地址文件中预先计算的 (纬度, 经度)，为None时进行地理编码
     返回:
         1表示运行成功，0表示运行失败，2表示结果已存在
     """
 
+    driver = get_driver()
     filename = get_filename(address)
     rdc_fname = os.path.join(get_path('rdc_dir'), f"{filename}.rdc")
     result_fname = os.path.join(get_path('result_dir'), district_name, f"{filename}.blend")
+    result_exists = result_index.exists(result_fname) if result_index is not None else os.path.exists(result_fname)
+    rdc_exists = rdc_index.exists(rdc_fname) if rdc_index is not None else os.path.exists(rdc_fname)
 
-    if os.path.exists(result_fname):
+    if result_exists:
         logD(f"已存在结果文件: {result_fname}")
         return 2
+
+    # 同一建筑的不同地址写法已有结果时，直接从内容存储链接到结果目录
+    store = get_content_store()
+    if store and store.materialize(address, 'blend', result_fname):
+        if result_index is not None:
+            result_index.add(result_fname)
+        return 2
     
-    if not check_chrome_version():
+    # 更新RDC文件的最近使用时间；若RDC只存在于归档目录中则解压还原
+    retention = get_retention_manager()
+    if rdc_exists:
+        if retention.budget_bytes:
+            retention.mark_used(rdc_fname)
+    elif retention.archive_dir and retention.ensure_rdc(rdc_fname):
+        rdc_exists = True
+    
+    if not driver.check_chrome_version():
         return
 
     logI("-"*20)
-    clear_processes()
+    driver.clear_processes()
     logI(f"开始处理地址: '{address}'")
     start_time = time.time()
-    if not os.path.exists(rdc_fname):
+    # 清除该地址之前失败时残留的阶段耗时
+    catalog = get_catalog()
+    if catalog:
+        catalog.pop_stage_timings(address)
+    lat = lng = None
+    if not rdc_exists:
         ## 不存在之前的结果，则执行抓取
-        # 获取经纬度
-        lat, lng = get_coordinates_from_google(address, API_KEY)
+        # 获取经纬度，地址文件中已有经纬度时跳过地理编码
+        if location is not None:
+            lat, lng = location
+        else:
+            with stage('geocode', address):
+                lat, lng = driver.get_coordinates(address)
         logD(f"经纬度: ({lat}, {lng})")
 
         def capture_rdc():
             # 执行启动并获取进程ID
-            chrome_pids = launch_chrome_google_map(lat, lng)
+            chrome_pids = driver.launch_chrome_google_map(lat, lng)
             # 启动RenderDoc
-            if not launch_renderdoc_and_inject():
+            if not driver.launch_renderdoc_and_inject():
                 logE("启动RenderDoc或注入失败")
                 return 0
             # 截取帧
-            if os.path.exists(rdc_fname):
-                os.remove(rdc_fname)
-            capture_frame(filename)
+            remove_rdc(rdc_fname)
+            driver.capture_frame(filename)
 
-        capture_rdc()
+        with stage('capture', address):
+            capture_rdc()
         time.sleep(1)
         
-        if not check_rdc_file(rdc_fname):
-            clear_processes()
+        if not driver.check_rdc_file(rdc_fname):
+            driver.clear_processes()
             logI("尝试再次抓取...")
-            capture_rdc()
+            metrics.RETRIES_TOTAL.inc(stage='capture')
+            with stage('capture', address):
+                capture_rdc()
             time.sleep(1)
-            if not check_rdc_file(rdc_fname):  
+            if not driver.check_rdc_file(rdc_fname):  
                 logE("再次抓取失败，终止处理")
                 return 0
+        metrics.RDC_BYTES_WRITTEN.inc(os.path.getsize(rdc_fname))
             # logE("RDC文件存在问题，无法继续处理")
-    elif not check_rdc_file(rdc_fname):
+    elif not driver.check_rdc_file(rdc_fname):
         # 已存在的rdc结果不符合要求，TODO:重新抓取
-        clear_processes()
+        driver.clear_processes()
         # logE("RDC文件存在问题，无法继续处理")
         return 0
     else:
@@ -1028,47 +1214,94 @@ def process_single_address(address, district_name, template_path) -> int:
     # 检查匹配的模板(顶视图)是否存在
     if not os.path.exists(template_path):
         logE(f"未找到模板图片: {template_path}")
-        clear_processes()
+        driver.clear_processes()
         return 0
     
     set_setting("address", address)
     # 打开Blender, 导入rdc文件
-    open_blender()
+    with stage('blender_import', address):
+        driver.open_blender()
 
     # 匹配模板
-    if not match_template(template_path):
-        return 0
+    with stage('match_template', address):
+        if not driver.match_template(template_path):
+            return 0
 
     # 等待Blender保存完成
-    if not wait_for_blender_save_signal():
-        logE("等待Blender保存信号超时")
-        clear_processes()
-        return 0
+    with stage('blender_save', address):
+        if not driver.wait_for_blender_save_signal():
+            logE("等待Blender保存信号超时")
+            driver.clear_processes()
+            return 0
     
     total_time = time.time() - start_time
     minutes, seconds = divmod(total_time, 60)
     
     logI(f"抓取模型完成, 耗时: {int(minutes)}分{int(seconds)}秒")
+
+    # RDC文件的校验结果(大小、校验和、段数量)，内容存储和结果目录共用
+    rdc_info = None
+    if store or catalog:
+        rdc_info = validate_rdc(rdc_fname,
+                                bytes_per_drawcall=int(get_setting('rdc_bytes_per_drawcall', DEFAULT_BYTES_PER_DRAWCALL)))
+
+    # 结果存入内容存储，相同内容只保存一份；RDC文件只记录校验和，
+    # 不放入存储(硬链接会使rdc_dir的淘汰和归档无法释放空间)，由RdcRetentionManager管理
+    if store and os.path.exists(result_fname):
+        blend_digest, _ = store.put(result_fname)
+        store.record(address, blend=blend_digest, rdc_sha256=rdc_info.get('sha256'),
+                     district=district_name, filename=filename)
+
+    # 写入结果目录，便于不打开Blender查询网格统计和输出大小
+    if catalog:
+        catalog.upsert(build_record(district_name, filename, result_fname, address=address, lat=lat, lng=lng,
+                                    rdc_info=rdc_info,
+                                    stage_timings=catalog.pop_stage_timings(address)))
+
+    # 结果已生成，RDC文件可以归档，并检查rdc_dir容量
+    retention.schedule_archive(rdc_fname)
+    retention.enforce_budget()
+
+    # 同一区域中重复出现的地址直接从索引得知结果已存在
+    if result_index is not None and os.path.exists(result_fname):
+        result_index.add(result_fname)
     return 1
 
 def process_district(district_name):
     """ 抓取一个区域的建筑模型 """
-    if not check_chrome_version():
+    driver = get_driver()
+    if not driver.check_chrome_version():
         return
 
     district_dir = os.path.join(get_path("request_dir"), district_name)
-    address_file = os.path.join(district_dir, f"{district_name}.txt")
-    if not os.path.exists(address_file):
-        logE(f"地址文件不存在: {address_file}")
+    address_file = find_address_file(district_dir, district_name)
+    if not address_file:
+        logE(f"地址文件不存在: {os.path.join(district_dir, district_name + '.txt')}")
         return False
-    addresses = get_addresses(address_file)
+    # 逐条读取地址，处理进度保存在 <地址文件>.checkpoint，中断后从上次的位置继续；
+    # 检查点只是一个读取位置，只在第一个失败的地址之前推进，下次运行从该地址重试(之后已有结果的地址直接跳过)
+    reader = AddressReader(address_file, resume=get_setting('address_resume', True), checkpoint_every=1)
+    total_count = reader.count()
+    if reader.start_index:
+        logI(f"从检查点继续，跳过已处理的 {reader.start_index}/{total_count} 个地址")
 
     ## 挨个处理地址
-    import shutil
     template_dir = os.path.join(district_dir, "templates")
     os.makedirs(template_dir, exist_ok=True)
+
+    # 一次性建立区域目录(含templates)、rdc目录和结果目录的索引，后续查询都在内存中完成
+    district_index = DirectoryIndex(district_dir, depth=1)
+    rdc_index = DirectoryIndex(get_path('rdc_dir'))
+    result_index = DirectoryIndex(os.path.join(get_path('result_dir'), district_name))
+    logD(f"目录索引建立完成: 区域目录 {len(district_index)} 个文件, "
+         f"RDC目录 {len(rdc_index)} 个文件, 结果目录 {len(result_index)} 个文件")
     result_count = [0] * 3
-    for index, address in enumerate(addresses):
+    result_names = {0: "failed", 1: "success", 2: "existing"}
+    # 本次运行中是否已有地址失败，之后不再推进检查点
+    has_failed = False
+    for record in reader:
+        index, address = record.index, record.address
+        metrics.QUEUE_DEPTH.set(total_count - index, queue="addresses")
         ## 先处理地址对应的顶视图
         filename = get_filename(address)
         source_path_potential = [
@@ -1077,23 +1310,42 @@ def process_district(district_name):
             os.path.join(district_dir, f"{district_name}({index+1}).jpg"),
             os.path.join(district_dir, f"{district_name}({index+1}).png")
         ]
-        source_path = ""
-        for temp_path in source_path_potential:
-            if os.path.exists(temp_path):
-                source_path = temp_path
-                break
+        source_path = district_index.find_first(source_path_potential)
         if not source_path:
             logE(f"地址对应的图片文件不存在: {address}")
             result_count[0] += 1
+            metrics.record_address_result("failed")
+            has_failed = True
             continue
         target_path = os.path.join(template_dir, f"{filename}.png")
-        shutil.copy2(source_path, target_path)
+        copy_if_changed(source_path, target_path, district_index, district_index)
 
+        ret = 0
         try: 
-            ret = process_single_address(address, district_name, target_path)
+            ret = process_single_address(address, district_name, target_path, rdc_index, result_index,
+                                         record.location) or 0
             result_count[ret] += 1
+            metrics.record_address_result(result_names[ret])
+        except StageTimeout as e:
+            # 看门狗已经结束了卡住的进程，清理后继续处理下一个地址
+            logE(f"处理地址{address}时{str(e)}，跳过该地址")
+            result_count[0] += 1
+            metrics.STAGE_TIMEOUTS.inc(stage=e.stage)
+            metrics.record_address_result("timeout")
+            driver.clear_processes()
         except Exception as e:
             logEX(f"处理地址{address}时发生错误: {str(e)}")
+            metrics.record_address_result("error")
+        if ret in (1, 2) and not has_failed:
+            reader.commit(record)
+        else:
+            has_failed = True
+    metrics.QUEUE_DEPTH.set(0, queue="addresses")
+    if has_failed:
+        logW(f"区域 {district_name} 有地址处理失败，下次运行从第一个失败的地址继续")
+    else:
+        # 区域全部处理完成，下次运行从头开始(已有结果的地址会直接跳过)
+        reader.finish()
 
     return result_count
 
@@ -1126,12 +1378,40 @@ def write_district_to_file(district, filename):
     with open(filename, 'w', encoding='utf-8') as f:
         f.write(district)
 
+def get_report_dir():
+    """ 获取运行报告和采样数据的保存目录(日志目录) """
+    log_dir = get_log_dir() or os.path.join(project_dir, 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+    return log_dir
+
+def write_run_report(report):
+    """
+    将本次运行的统计结果写入日志目录下的JSON文件
+    
+    参数:
+        report: dict - 运行统计结果
+    
+    返回:
+        str: 报告文件路径，写入失败时返回空字符串
+    """
+    import json
+    try:
+        report_path = os.path.join(get_report_dir(), f"run_report_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logI(f"运行报告已保存至: {report_path}")
+        return report_path
+    except Exception as e:
+        logW(f"保存运行报告失败: {str(e)}")
+        return ""
+
 def main():
     """
     主函数 - 执行完整的Google地图模型抓取流程
     """
 
-    if not check_chrome_version():
+    driver = get_driver()
+    if not driver.check_chrome_version():
         return
 
     # district_list = ["9"]
@@ -1139,23 +1419,57 @@ def main():
 
     district_file = get_path('district_file')
     result_count = [0] * 3
-    for district in district_list:
-        logI("="*40)
-        logI(f"开始处理区域: {district}")
-        write_district_to_file(district, district_file)
-        ret = process_district(district)
-        logI(f"-"*20)
-        logI(f"区域 {district} 处理完成, 结果已存在: {ret[2]}, 成功: {ret[1]}, 失败: {ret[0]}")
-        for i in range(3):
-            result_count[i] += ret[i]
+    run_start = time.strftime('%Y-%m-%d %H:%M:%S')
+    try:
+        # 运行前校验已有的RDC文件，并检查rdc_dir容量
+        prerun_rdc_scan()
+        get_retention_manager().enforce_budget()
+
+        start_watchdog()
+        start_sampler(get_report_dir())
+        metrics.start_metrics()
+        for district_no, district in enumerate(district_list):
+            metrics.QUEUE_DEPTH.set(len(district_list) - district_no, queue="districts")
+            logI("="*40)
+            logI(f"开始处理区域: {district}")
+            write_district_to_file(district, district_file)
+            ret = process_district(district)
+            logI(f"-"*20)
+            logI(f"区域 {district} 处理完成, 结果已存在: {ret[2]}, 成功: {ret[1]}, 失败: {ret[0]}")
+            for i in range(3):
+                result_count[i] += ret[i]
+    finally:
+        # 出错或被中断时同样停止后台线程和指标服务，并写入资源峰值文件和最终的指标
+        timeouts = stop_watchdog()
+        telemetry = stop_sampler()
+        metrics.QUEUE_DEPTH.set(0, queue="districts")
+        metrics.stop_metrics()
+        stop_retention_manager()
+        close_catalog()
     building_count = sum(result_count)
 
     logI("所有区域处理完成")
+    if get_offline_geocoder() is not None:
+        logI(get_offline_geocoder().format_summary())
     logI(f"共处理 {len(district_list)} 个区域, {building_count} 个建筑")
     logI(f"结果已存在: {result_count[2]} 个, 运行成功: {result_count[1]} 个, 运行失败: {result_count[0]} 个")
+    if timeouts:
+        logW(f"共有 {len(timeouts)} 个阶段超时:")
+        for timeout in timeouts:
+            logW(f"  [{timeout['stage']}] {timeout['address']}: {timeout['reason']}")
+    write_run_report({
+        'start_time': run_start,
+        'end_time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'districts': district_list,
+        'existing': result_count[2],
+        'success': result_count[1],
+        'failed': result_count[0],
+        'timeouts': timeouts,
+        'telemetry': telemetry,
+    })
     
     # 执行清理操作
-    if not clear_processes():
+    if not driver.clear_processes():
         logE("清理进程时发生错误")
         return False
 
@@ -0,0 +1,219 @@
+'''
+Author: Leili
+Date: 2026-10-19 14:50:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 10:30:00
+FilePath: /GoogleModelProcess/Scripts/cas_store.py
+Description: 内容寻址存储，结果文件按内容哈希只保存一份，原有的result_dir/<区域>/<文件名>.blend目录结构通过硬链接保留
+
+用法:
+    python Scripts/cas_store.py view <输出目录>    # 根据目录文件重新生成 <区域>/<文件名>.blend 视图
+'''
+import os
+import sys
+import json
+import shutil
+import hashlib
+import threading
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(current_dir)
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+from Scripts.config_utils import get_path, get_setting
+from Scripts.log_utils import logD, logI, logW
+from Scripts.utils import normalize_address
+
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+def file_sha256(path):
+    """ 流式计算文件的SHA-256 """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def link_or_copy(source, target):
+    """
+    将source以硬链接的方式放到target位置(覆盖已有文件)，不支持硬链接时复制
+
+    返回:
+        bool: 是否使用了硬链接
+    """
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    tmp_path = target + ".link.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(source, tmp_path)
+        linked = True
+    except OSError:
+        shutil.copy2(source, tmp_path)
+        linked = False
+    os.replace(tmp_path, target)
+    return linked
+
+class ContentStore:
+    """
+    内容寻址存储
+
+    目录结构:
+        <root>/objects/<哈希前两位>/<哈希><扩展名>  - 按内容哈希命名的数据块
+        <root>/catalog.jsonl                     - 地址到数据块的目录(追加写入，后写入的记录覆盖先前的记录)
+
+    目录以规范化后的地址为键，同一建筑的不同地址写法会对应到同一条记录
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.catalog_path = os.path.join(root, "catalog.jsonl")
+        self.lock = threading.Lock()
+        self.catalog = {}
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._load_catalog()
+
+    def _load_catalog(self):
+        if not os.path.exists(self.catalog_path):
+            return
+        with open(self.catalog_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logW(f"跳过无法解析的目录记录: {line[:80]}")
+                    continue
+                entry = self.catalog.setdefault(record['key'], {})
+                entry.update(record)
+
+    def blob_path(self, digest, ext):
+        """ 获取数据块路径 """
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}{ext}")
+
+    def put(self, path, digest=None):
+        """
+        将文件存入内容存储，并将原文件替换为指向数据块的硬链接
+
+        参数:
+            path: str - 要存储的文件
+            digest: str - 已知的SHA-256，为None时计算
+
+        返回:
+            tuple: (哈希, 是否为新数据块)
+        """
+        if digest is None:
+            digest = file_sha256(path)
+        ext = os.path.splitext(path)[1].lower()
+        blob = self.blob_path(digest, ext)
+        is_new = not os.path.exists(blob)
+        if is_new:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            tmp_path = blob + ".tmp"
+            shutil.copy2(path, tmp_path)
+            os.replace(tmp_path, blob)
+        else:
+            logD(f"内容已存在，复用数据块: {digest[:12]} ({os.path.basename(path)})")
+        try:
+            if not os.path.samefile(path, blob):
+                link_or_copy(blob, path)
+        except OSError as e:
+            logW(f"替换为硬链接失败: {path}, {str(e)}")
+        return digest, is_new
+
+    def record(self, address, **fields):
+        """
+        记录地址对应的数据块等信息
+
+        参数:
+            address: str - 原始地址
+            fields: 要记录的字段，如 blend=哈希, rdc_sha256=RDC文件的校验和, district=区域, filename=文件名
+        """
+        key = normalize_address(address)
+        record = {'key': key, 'address': address}
+        record.update(fields)
+        with self.lock:
+            entry = self.catalog.setdefault(key, {})
+            entry.update(record)
+            with open(self.catalog_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def lookup(self, address):
+        """ 按规范化地址查询目录记录，不存在时返回None """
+        return self.catalog.get(normalize_address(address))
+
+    def materialize(self, address, kind, target_path):
+        """
+        若目录中已有该地址(或其不同写法)的数据块，则在target_path处创建硬链接
+
+        参数:
+            address: str - 原始地址
+            kind: str - 数据类型，如 blend 或 rdc
+            target_path: str - 目标路径
+
+        返回:
+            bool: 是否已生成目标文件
+        """
+        entry = self.lookup(address)
+        if not entry or not entry.get(kind):
+            return False
+        blob = self.blob_path(entry[kind], os.path.splitext(target_path)[1].lower())
+        if not os.path.exists(blob):
+            return False
+        link_or_copy(blob, target_path)
+        logI(f"地址 '{address}' 与已存储的地址 '{entry.get('address')}' 相同，复用已有的{kind}文件")
+        return True
+
+    def generate_view(self, view_root, kind='blend'):
+        """
+        根据目录重新生成 <view_root>/<区域>/<文件名>.<kind> 的硬链接视图
+
+        返回:
+            int: 生成的文件数量
+        """
+        count = 0
+        for entry in self.catalog.values():
+            digest = entry.get(kind)
+            if not digest or not entry.get('filename'):
+                continue
+            blob = self.blob_path(digest, f".{kind}")
+            if not os.path.exists(blob):
+                logW(f"数据块不存在: {blob}")
+                continue
+            target = os.path.join(view_root, entry.get('district', ''), f"{entry['filename']}.{kind}")
+            link_or_copy(blob, target)
+            count += 1
+        logI(f"已生成 {count} 个{kind}文件视图: {view_root}")
+        return count
+
+# 当前使用的存储
+_store = None
+
+def get_content_store():
+    """
+    根据配置获取内容存储，配置cas_enabled=0(默认)时返回None
+
+    配置项:
+        cas_enabled: 是否启用内容寻址存储
+        cas_dir: 存储目录，默认为result_dir同级的"<result_dir>_store"
+    """
+    global _store
+    if _store is None and int(get_setting('cas_enabled', 0)):
+        root = get_setting('cas_dir', '') or os.path.normpath(get_path('result_dir')) + "_store"
+        _store = ContentStore(root)
+    return _store
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "view":
+        store = get_content_store()
+        if store is None:
+            print("未启用内容寻址存储(cas_enabled=0)")
+        else:
+            store.generate_view(sys.argv[2])
+    else:
+        print(__doc__)
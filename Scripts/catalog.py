@@ -0,0 +1,385 @@
+'''
+Author: Leili
+Date: 2026-10-19 15:20:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 22:10:00
+FilePath: /GoogleModelProcess/Scripts/catalog.py
+Description: 结果目录(SQLite)，记录每个建筑的地址、坐标、RDC、网格统计和各阶段耗时，无需打开Blender即可查询
+
+用法:
+    python Scripts/catalog.py query --min-vertices 1000000            # 顶点数超过100万的建筑
+    python Scripts/catalog.py query --district 9 --order-by blend_size # 区域9的建筑，按.blend大小排序
+    python Scripts/catalog.py summary                                 # 按区域汇总建筑数量和输出大小
+    python Scripts/catalog.py sql "SELECT district, SUM(face_count) FROM artifacts GROUP BY district"
+    python Scripts/catalog.py backfill --workers 4                      # 用无界面Blender为已有结果补录目录
+'''
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(current_dir)
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+from Scripts.config_utils import get_path, get_setting
+from Scripts.log_utils import logD, logI, logW
+from Scripts.utils import get_filename
+from Scripts.address_reader import AddressReader, find_address_file
+
+# Blender保存.blend时写入的网格统计旁路文件
+STATS_SUFFIX = ".stats.json"
+
+# 表结构: 列名 -> 类型
+COLUMNS = {
+    'district': 'TEXT NOT NULL',
+    'filename': 'TEXT NOT NULL',
+    'address': 'TEXT',
+    'lat': 'REAL',
+    'lng': 'REAL',
+    'rdc_size': 'INTEGER',
+    'rdc_sha256': 'TEXT',
+    'mesh_count': 'INTEGER',
+    'vertex_count': 'INTEGER',
+    'face_count': 'INTEGER',
+    'bbox_min_x': 'REAL',
+    'bbox_min_y': 'REAL',
+    'bbox_min_z': 'REAL',
+    'bbox_max_x': 'REAL',
+    'bbox_max_y': 'REAL',
+    'bbox_max_z': 'REAL',
+    'texture_bytes': 'INTEGER',
+    'blend_size': 'INTEGER',
+    'stage_timings': 'TEXT',
+    'total_seconds': 'REAL',
+    'updated_at': 'TEXT',
+}
+
+def stats_path(blend_path):
+    """ 获取.blend文件对应的网格统计旁路文件路径 """
+    return blend_path + STATS_SUFFIX
+
+def read_stats(blend_path):
+    """ 读取网格统计旁路文件，不存在或无法解析时返回空字典 """
+    path = stats_path(blend_path)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logW(f"读取网格统计文件失败: {path}, {str(e)}")
+        return {}
+
+def build_record(district, filename, blend_path, address=None, lat=None, lng=None,
+                 rdc_info=None, stage_timings=None):
+    """
+    根据.blend文件、网格统计旁路文件和RDC校验结果生成一条目录记录
+
+    参数:
+        district: str - 区域名称
+        filename: str - 规范化后的文件名(不含扩展名)
+        blend_path: str - .blend文件路径
+        address: str - 原始地址
+        lat, lng: float - 经纬度
+        rdc_info: dict - validate_rdc的返回结果
+        stage_timings: dict - 各阶段耗时(秒)
+
+    返回:
+        dict: 目录记录
+    """
+    stats = read_stats(blend_path)
+    bbox_min = stats.get('bbox_min') or [None] * 3
+    bbox_max = stats.get('bbox_max') or [None] * 3
+    rdc_info = rdc_info or {}
+    stage_timings = stage_timings or {}
+    return {
+        'district': district,
+        'filename': filename,
+        'address': address,
+        'lat': lat,
+        'lng': lng,
+        'rdc_size': rdc_info.get('size'),
+        'rdc_sha256': rdc_info.get('sha256'),
+        'mesh_count': stats.get('mesh_count'),
+        'vertex_count': stats.get('vertex_count'),
+        'face_count': stats.get('face_count'),
+        'bbox_min_x': bbox_min[0],
+        'bbox_min_y': bbox_min[1],
+        'bbox_min_z': bbox_min[2],
+        'bbox_max_x': bbox_max[0],
+        'bbox_max_y': bbox_max[1],
+        'bbox_max_z': bbox_max[2],
+        'texture_bytes': stats.get('texture_bytes'),
+        'blend_size': os.path.getsize(blend_path) if os.path.exists(blend_path) else None,
+        'stage_timings': json.dumps(stage_timings, ensure_ascii=False) if stage_timings else None,
+        'total_seconds': round(sum(stage_timings.values()), 3) if stage_timings else None,
+        'updated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+class ArtifactCatalog:
+    """
+    结果目录
+
+    每个建筑一条记录，以(区域, 文件名)为主键，重复写入时覆盖
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        # 各地址当前的阶段耗时，由阶段监听器累加
+        self.stage_timings = {}
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._create_table()
+
+    def _create_table(self):
+        columns = ", ".join(f"{name} {column_type}" for name, column_type in COLUMNS.items())
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS artifacts ({columns}, PRIMARY KEY (district, filename))")
+            # 旧版本的目录文件缺少的列自动补齐
+            existing = {row['name'] for row in self.conn.execute("PRAGMA table_info(artifacts)")}
+            for name, column_type in COLUMNS.items():
+                if name not in existing:
+                    self.conn.execute(f"ALTER TABLE artifacts ADD COLUMN {name} {column_type.replace(' NOT NULL', '')}")
+
+    def upsert(self, record):
+        """ 写入一条记录，已存在时覆盖 """
+        names = [name for name in COLUMNS if name in record]
+        placeholders = ", ".join("?" for _ in names)
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO artifacts ({', '.join(names)}) VALUES ({placeholders})",
+                [record[name] for name in names])
+
+    def known_files(self):
+        """ 获取目录中已有的(区域, 文件名)集合 """
+        with self.lock:
+            return {(row['district'], row['filename'])
+                    for row in self.conn.execute("SELECT district, filename FROM artifacts")}
+
+    def query(self, sql, params=()):
+        """ 执行只读查询，返回字典列表 """
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def on_stage(self, event, stage_name, address, elapsed):
+        """ 阶段监听器，累加每个地址各阶段的耗时 """
+        if event != 'exit':
+            return
+        with self.lock:
+            timings = self.stage_timings.setdefault(address, {})
+            timings[stage_name] = round(timings.get(stage_name, 0.0) + elapsed, 3)
+
+    def pop_stage_timings(self, address):
+        """ 取出并清除地址的阶段耗时 """
+        with self.lock:
+            return self.stage_timings.pop(address, {})
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+# 当前使用的目录
+_catalog = None
+
+def get_catalog():
+    """
+    根据配置获取结果目录，并注册阶段耗时监听器
+
+    配置项:
+        catalog_enabled: 是否在每个地址成功后写入结果目录，默认开启
+        catalog_path: 目录文件路径，默认为result_dir下的catalog.sqlite
+    """
+    global _catalog
+    if _catalog is None and int(get_setting('catalog_enabled', 1)):
+        from Scripts.stage_watchdog import add_stage_listener
+        db_path = get_setting('catalog_path', '') or os.path.join(get_path('result_dir'), "catalog.sqlite")
+        _catalog = ArtifactCatalog(db_path)
+        add_stage_listener(_catalog.on_stage)
+        logD(f"结果目录: {db_path}")
+    return _catalog
+
+def close_catalog():
+    """ 关闭结果目录并移除阶段耗时监听器 """
+    global _catalog
+    if _catalog is not None:
+        from Scripts.stage_watchdog import remove_stage_listener
+        remove_stage_listener(_catalog.on_stage)
+        _catalog.close()
+        _catalog = None
+
+def find_results(result_dir):
+    """ 获取结果目录下的所有.blend文件: [(区域, 文件名, 路径)] """
+    results = []
+    if not os.path.isdir(result_dir):
+        return results
+    for root, dirs, files in os.walk(result_dir):
+        district = os.path.relpath(root, result_dir)
+        district = "" if district == "." else district
+        for name in files:
+            if name.lower().endswith('.blend'):
+                results.append((district, name[:-len('.blend')], os.path.join(root, name)))
+        # 结果目录下只有一层区域目录
+        if root != result_dir:
+            dirs[:] = []
+    return results
+
+def load_district_addresses(district):
+    """ 读取区域地址文件，返回 文件名 -> 原始地址 的映射 """
+    address_file = find_address_file(os.path.join(get_path('request_dir'), district), district) if district else None
+    if not address_file:
+        return {}
+    return {get_filename(record.address): record.address
+            for record in AddressReader(address_file, checkpoint_path=False)}
+
+def probe_blend(blend_path, blender_path, timeout=600):
+    """
+    在无界面Blender中打开.blend文件并写入网格统计旁路文件
+
+    返回:
+        bool: 是否成功生成统计文件
+    """
+    cmd = [blender_path, '-b', blend_path, '--python', os.path.join(current_dir, "blend_probe.py")]
+    try:
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout, check=False)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logW(f"读取.blend文件失败: {blend_path}, {str(e)}")
+        return False
+    return os.path.exists(stats_path(blend_path))
+
+def backfill(catalog, workers=4, force=False, timeout=600):
+    """
+    为已有的结果补录目录记录，缺少网格统计旁路文件的.blend文件使用多个无界面Blender并行读取
+
+    参数:
+        catalog: ArtifactCatalog - 结果目录
+        workers: int - 并行的Blender进程数
+        force: bool - 是否重新读取已有统计文件或已在目录中的结果
+        timeout: int - 单个Blender进程的超时时间(秒)
+
+    返回:
+        int: 补录的记录数
+    """
+    from Scripts.rdc_validate import validate_rdc, sidecar_path
+
+    known = set() if force else catalog.known_files()
+    pending = [result for result in find_results(get_path('result_dir')) if (result[0], result[1]) not in known]
+    if not pending:
+        logI("没有需要补录的结果")
+        return 0
+
+    to_probe = [path for _, _, path in pending if force or not os.path.exists(stats_path(path))]
+    if to_probe:
+        blender_path = get_path('blender_path')
+        logI(f"使用 {workers} 个Blender进程读取 {len(to_probe)} 个.blend文件...")
+        with ThreadPoolExecutor(max_workers=max(int(workers), 1)) as executor:
+            probed = list(executor.map(lambda path: probe_blend(path, blender_path, timeout), to_probe))
+        logI(f"读取完成: 成功 {sum(probed)} 个, 失败 {len(probed) - sum(probed)} 个")
+
+    addresses = {}
+    rdc_dir = get_path('rdc_dir')
+    for district, filename, blend_path in pending:
+        if district not in addresses:
+            addresses[district] = load_district_addresses(district)
+        # 只读取已有的RDC校验结果，不为补录重新计算校验和
+        rdc_path = os.path.join(rdc_dir, f"{filename}.rdc")
+        rdc_info = validate_rdc(rdc_path) if os.path.exists(sidecar_path(rdc_path)) else None
+        catalog.upsert(build_record(district, filename, blend_path,
+                                    address=addresses[district].get(filename), rdc_info=rdc_info))
+    logI(f"已补录 {len(pending)} 条目录记录")
+    return len(pending)
+
+def print_rows(rows):
+    """ 以表格形式输出查询结果 """
+    if not rows:
+        print("没有符合条件的记录")
+        return
+    names = list(rows[0].keys())
+    widths = [max(len(str(name)), *(len(str(row[name])) for row in rows)) for name in names]
+    print("  ".join(str(name).ljust(width) for name, width in zip(names, widths)))
+    for row in rows:
+        print("  ".join(str(row[name]).ljust(width) for name, width in zip(names, widths)))
+    print(f"共 {len(rows)} 条记录")
+
+def main():
+    parser = argparse.ArgumentParser(description="查询结果目录")
+    parser.add_argument("--catalog", default="", help="目录文件路径，默认读取配置")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    query_parser = subparsers.add_parser("query", help="按条件查询建筑")
+    query_parser.add_argument("--district", help="区域名称")
+    query_parser.add_argument("--address", help="地址包含的文本")
+    query_parser.add_argument("--min-vertices", type=int, help="最少顶点数")
+    query_parser.add_argument("--max-vertices", type=int, help="最多顶点数")
+    query_parser.add_argument("--min-faces", type=int, help="最少面数")
+    query_parser.add_argument("--order-by", default="district, filename", choices=list(COLUMNS) + ["district, filename"],
+                              help="排序字段")
+    query_parser.add_argument("--desc", action="store_true", help="降序排列")
+    query_parser.add_argument("--limit", type=int, default=0, help="最多输出的记录数")
+
+    subparsers.add_parser("summary", help="按区域汇总")
+
+    sql_parser = subparsers.add_parser("sql", help="执行自定义SQL查询")
+    sql_parser.add_argument("statement", help="SQL语句，表名为artifacts")
+
+    backfill_parser = subparsers.add_parser("backfill", help="用无界面Blender为已有结果补录目录")
+    backfill_parser.add_argument("--workers", type=int, default=4, help="并行的Blender进程数")
+    backfill_parser.add_argument("--force", action="store_true", help="重新读取所有结果")
+    backfill_parser.add_argument("--timeout", type=int, default=600, help="单个Blender进程的超时时间(秒)")
+    args = parser.parse_args()
+
+    db_path = args.catalog or get_setting('catalog_path', '') or os.path.join(get_path('result_dir'), "catalog.sqlite")
+    if args.command != "backfill" and not os.path.exists(db_path):
+        print(f"目录文件不存在: {db_path}")
+        return
+    catalog = ArtifactCatalog(db_path)
+
+    if args.command == "query":
+        conditions, params = [], []
+        if args.district:
+            conditions.append("district = ?")
+            params.append(args.district)
+        if args.address:
+            conditions.append("address LIKE ?")
+            params.append(f"%{args.address}%")
+        if args.min_vertices is not None:
+            conditions.append("vertex_count >= ?")
+            params.append(args.min_vertices)
+        if args.max_vertices is not None:
+            conditions.append("vertex_count <= ?")
+            params.append(args.max_vertices)
+        if args.min_faces is not None:
+            conditions.append("face_count >= ?")
+            params.append(args.min_faces)
+        sql = ("SELECT district, filename, address, vertex_count, face_count, texture_bytes, blend_size, "
+               "rdc_size, total_seconds FROM artifacts")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {args.order_by}{' DESC' if args.desc else ''}"
+        if args.limit:
+            sql += f" LIMIT {int(args.limit)}"
+        print_rows(catalog.query(sql, params))
+    elif args.command == "summary":
+        print_rows(catalog.query(
+            "SELECT district, COUNT(*) AS buildings, SUM(vertex_count) AS vertices, SUM(face_count) AS faces, "
+            "ROUND(SUM(blend_size) / 1048576.0, 1) AS blend_mb, ROUND(SUM(rdc_size) / 1048576.0, 1) AS rdc_mb, "
+            "ROUND(SUM(texture_bytes) / 1048576.0, 1) AS texture_mb "
+            "FROM artifacts GROUP BY district ORDER BY district"))
+    elif args.command == "backfill":
+        backfill(catalog, workers=args.workers, force=args.force, timeout=args.timeout)
+    else:
+        print_rows(catalog.query(args.statement))
+    catalog.close()
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 Author: Leili
 Date: 2025-05-06
 LastEditors: Leili
-LastEditTime: 2025-05-19 16:25:09
+LastEditTime: 2026-10-19 05:20:06
 FilePath: /GoogleModelProcess/Scripts/config_utils.py
 Description: 配置文件读取工具
 '''
@@ -11,7 +11,10 @@ import configparser
 from pathlib import Path
 
 def get_config_path():
-    """获取配置文件路径"""
+    """获取配置文件路径，可通过环境变量GOOGLE_MODEL_PROCESS_CONFIG指定其他配置文件"""
+    env_path = os.environ.get('GOOGLE_MODEL_PROCESS_CONFIG')
+    if env_path:
+        return Path(env_path)
     # 获取当前脚本所在目录
     current_dir = Path(os.path.dirname(os.path.abspath(__file__)))
     # 配置文件在项目根目录
@@ -0,0 +1,116 @@
+'''
+Author: Leili
+Date: 2026-10-19 09:20:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 09:20:00
+FilePath: /GoogleModelProcess/Scripts/dir_index.py
+Description: 目录索引工具，一次性扫描目录，之后的文件查询都在内存中完成
+'''
+import os
+import shutil
+
+class DirectoryIndex:
+    """
+    目录索引
+
+    使用os.scandir一次性读取目录中的文件名、大小和修改时间，
+    之后的存在性检查和文件信息查询都直接从内存中返回，避免在网络盘上反复访问文件元数据
+    """
+
+    def __init__(self, directory, depth=0):
+        """
+        参数:
+            directory: str - 要建立索引的目录
+            depth: int - 递归扫描子目录的层数，0表示只扫描当前目录
+        """
+        self.directory = directory
+        self.depth = depth
+        self.entries = {}
+        self.refresh()
+
+    @staticmethod
+    def _key(name):
+        """ 统一文件名的大小写和分隔符，与Windows下os.path.exists的行为保持一致 """
+        return os.path.normcase(os.path.normpath(name))
+
+    def refresh(self):
+        """ 重新扫描目录 """
+        self.entries = {}
+        if os.path.isdir(self.directory):
+            self._scan(self.directory, "", self.depth)
+        return self
+
+    def _scan(self, directory, prefix, depth):
+        with os.scandir(directory) as it:
+            for entry in it:
+                rel_name = os.path.join(prefix, entry.name) if prefix else entry.name
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        self.entries[self._key(rel_name)] = (stat.st_size, stat.st_mtime)
+                    elif entry.is_dir() and depth > 0:
+                        self._scan(entry.path, rel_name, depth - 1)
+                except OSError:
+                    continue
+
+    def _relative(self, path):
+        """ 将绝对路径或相对路径转换为相对于索引目录的路径 """
+        if os.path.isabs(path):
+            return os.path.relpath(path, self.directory)
+        return path
+
+    def exists(self, path):
+        """ 文件是否存在 """
+        return self._key(self._relative(path)) in self.entries
+
+    def stat(self, path):
+        """
+        获取文件信息
+
+        返回:
+            tuple: (文件大小, 修改时间)，文件不存在时返回None
+        """
+        return self.entries.get(self._key(self._relative(path)))
+
+    def find_first(self, paths):
+        """ 返回候选路径中第一个存在的文件，都不存在时返回空字符串 """
+        for path in paths:
+            if self.exists(path):
+                return path
+        return ""
+
+    def add(self, path):
+        """ 将新写入的文件加入索引 """
+        if not os.path.isabs(path):
+            path = os.path.join(self.directory, path)
+        stat = os.stat(path)
+        self.entries[self._key(self._relative(path))] = (stat.st_size, stat.st_mtime)
+
+    def __len__(self):
+        return len(self.entries)
+
+def copy_if_changed(source_path, target_path, source_index, target_index, mtime_tolerance=1.0):
+    """
+    复制文件，若目标文件的大小和修改时间与源文件一致则跳过
+
+    参数:
+        source_path: str - 源文件路径
+        target_path: str - 目标文件路径
+        source_index: DirectoryIndex - 源文件所在目录的索引
+        target_index: DirectoryIndex - 目标文件所在目录的索引
+        mtime_tolerance: float - 修改时间允许的误差(秒)，兼容不同文件系统的时间精度
+
+    返回:
+        bool: 是否执行了复制
+    """
+    source_stat = source_index.stat(source_path)
+    target_stat = target_index.stat(target_path)
+    if source_stat and target_stat \
+            and source_stat[0] == target_stat[0] \
+            and abs(source_stat[1] - target_stat[1]) <= mtime_tolerance:
+        return False
+
+    # copy2会保留修改时间，下次运行时可以直接跳过
+    shutil.copy2(source_path, target_path)
+    target_index.add(target_path)
+    return True
@@ -0,0 +1,303 @@
+'''
+Author: Leili
+Date: 2026-10-19 17:40:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 11:40:00
+FilePath: /GoogleModelProcess/Scripts/extrude.py
+Description: 基于NumPy的建筑轮廓拉伸，支持Polygon/MultiPolygon及内环(洞)，输出三角网格的OBJ、二进制PLY和GLB文件
+
+顶底面三角化优先使用mapbox_earcut(pip install mapbox-earcut)，未安装时使用shapely的约束Delaunay三角化
+'''
+import re
+import json
+import math
+import struct
+
+import numpy as np
+import shapely
+
+try:
+    import mapbox_earcut
+except ImportError:
+    mapbox_earcut = None
+
+# 没有高度信息时使用的默认高度(米)
+DEFAULT_HEIGHT = 10.0
+
+def parse_height(value, default=DEFAULT_HEIGHT):
+    """ 解析OSM的height标签，支持"12"、"12.5 m"等写法，无法解析时返回默认值 """
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return default if math.isnan(value) or value <= 0 else float(value)
+    match = re.match(r"\s*([0-9]+(?:\.[0-9]+)?)", str(value))
+    return float(match.group(1)) if match else default
+
+def building_height(building, default=DEFAULT_HEIGHT):
+    """ 获取建筑高度，依次尝试height和building:height标签 """
+    for key in ('height', 'building:height'):
+        height = parse_height(building.get(key), None)
+        if height is not None:
+            return height
+    return default
+
+def _orient(polygons):
+    """ 统一多边形方向：外环逆时针，内环顺时针 """
+    if hasattr(shapely, 'orient_polygons'):
+        return shapely.orient_polygons(polygons)
+    from shapely.geometry.polygon import orient
+    return np.array([orient(polygon, 1.0) for polygon in polygons], dtype=object)
+
+def _triangulate_cap(coords, ring_ends):
+    """
+    三角化单个多边形的顶面
+
+    参数:
+        coords: ndarray (n, 2) - 多边形各环的顶点(不含闭合点)，外环在前
+        ring_ends: list - 每个环结束位置的索引
+
+    返回:
+        ndarray (m, 3): 局部顶点索引
+    """
+    if mapbox_earcut is not None:
+        triangles = mapbox_earcut.triangulate_float64(coords, np.asarray(ring_ends, dtype=np.uint32))
+        return triangles.reshape(-1, 3)
+
+    # 约束Delaunay三角化，按坐标查找顶点索引
+    rings = np.split(coords, ring_ends[:-1])
+    polygon = shapely.Polygon(np.vstack([rings[0], rings[0][:1]]),
+                              [np.vstack([ring, ring[:1]]) for ring in rings[1:]])
+    if hasattr(shapely, 'constrained_delaunay_triangles'):
+        triangles = shapely.get_parts(shapely.constrained_delaunay_triangles(polygon))
+    else:
+        triangles = [t for t in shapely.ops.triangulate(polygon) if polygon.contains(t.representative_point())]
+    lookup = {(x, y): i for i, (x, y) in enumerate(coords.tolist())}
+    faces = []
+    for triangle in triangles:
+        corners = [lookup.get((x, y)) for x, y in np.asarray(triangle.exterior.coords)[:3].tolist()]
+        if None not in corners:
+            faces.append(corners)
+    return np.array(faces, dtype=np.int64).reshape(-1, 3)
+
+def extrude_geometries(geometries, heights, base=0.0):
+    """
+    批量拉伸建筑轮廓为三角网格
+
+    所有环的顶点一次性提取，侧面和凸多边形顶面的索引通过数组运算生成，只有凹多边形和带内环的多边形逐个三角化
+
+    参数:
+        geometries: 几何数组(Polygon或MultiPolygon，其他类型忽略)
+        heights: 每个几何的高度(米)
+        base: float - 底面高度
+
+    返回:
+        tuple: (vertices (n, 3) float64, faces (m, 3) int64, face_features (m,) int64)，
+               face_features为每个三角面所属几何在输入中的位置
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    heights = np.asarray(heights, dtype=float)
+    polygons, polygon_feature = shapely.get_parts(geometries, return_index=True)
+    # 只保留非空的Polygon(OSM数据中有空几何，没有环时会使后面按环索引的数组错位)
+    keep = (shapely.get_type_id(polygons) == 3) & ~shapely.is_empty(polygons)
+    polygons, polygon_feature = _orient(polygons[keep]), polygon_feature[keep]
+    if not len(polygons):
+        return np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    rings, ring_polygon = shapely.get_rings(polygons, return_index=True)
+    coords, coord_ring = shapely.get_coordinates(rings, return_index=True)
+    # 去掉每个环的闭合点
+    ring_sizes = np.bincount(coord_ring, minlength=len(rings))
+    is_last = np.zeros(len(coords), dtype=bool)
+    is_last[np.cumsum(ring_sizes) - 1] = True
+    coords, coord_ring = coords[~is_last], coord_ring[~is_last]
+    ring_sizes = ring_sizes - 1
+    ring_starts = np.concatenate([[0], np.cumsum(ring_sizes)[:-1]])
+
+    n = len(coords)
+    vertex_feature = polygon_feature[ring_polygon[coord_ring]]
+    vertices = np.empty((2 * n, 3))
+    vertices[:n, :2] = coords
+    vertices[n:, :2] = coords
+    vertices[:n, 2] = base
+    vertices[n:, 2] = base + heights[vertex_feature]
+
+    # 侧面：每条边两个三角形，外环逆时针、内环顺时针时法向朝外
+    current = np.arange(n)
+    following = current + 1
+    ring_ends = ring_starts + ring_sizes - 1
+    following[ring_ends] = ring_starts
+    walls = np.concatenate([
+        np.column_stack([current, following, following + n]),
+        np.column_stack([current, following + n, current + n]),
+    ])
+    wall_features = np.concatenate([vertex_feature, vertex_feature])
+
+    # 顶面和底面：没有内环的凸多边形(大部分建筑)直接按扇形三角化，其余多边形逐个三角化
+    polygon_ring_counts = np.bincount(ring_polygon, minlength=len(polygons))
+    previous = current - 1
+    previous[ring_starts] = ring_ends
+    incoming = coords - coords[previous]
+    outgoing = coords[following] - coords
+    turn = incoming[:, 0] * outgoing[:, 1] - incoming[:, 1] * outgoing[:, 0]
+    ring_convex = np.minimum.reduceat(turn, ring_starts) >= 0 if n else np.zeros(0, dtype=bool)
+    fan_rings = ring_convex & (polygon_ring_counts[ring_polygon] == 1) & (ring_sizes >= 3)
+    position = current - ring_starts[coord_ring]
+    fan = fan_rings[coord_ring] & (position >= 1) & (position <= ring_sizes[coord_ring] - 2)
+    caps = [np.column_stack([ring_starts[coord_ring[fan]], current[fan], current[fan] + 1])]
+    cap_features = [vertex_feature[fan]]
+
+    polygon_first_ring = np.concatenate([[0], np.cumsum(polygon_ring_counts)[:-1]])
+    ring_starts_list = ring_starts.tolist()
+    ring_sizes_list = ring_sizes.tolist()
+    for p in np.flatnonzero(~fan_rings[polygon_first_ring]).tolist():
+        first = int(polygon_first_ring[p])
+        last = first + int(polygon_ring_counts[p])
+        start = ring_starts_list[first]
+        ends = [ring_starts_list[r] + ring_sizes_list[r] - start for r in range(first, last)]
+        if ends[0] < 3:
+            continue
+        triangles = _triangulate_cap(coords[start:start + ends[-1]], ends)
+        if len(triangles):
+            caps.append(triangles + start)
+            cap_features.append(np.full(len(triangles), polygon_feature[p]))
+    caps = np.concatenate(caps)
+    if len(caps):
+        cap_features = np.concatenate(cap_features)
+        # 统一顶面三角形为逆时针(法向朝上)
+        a, b, c = coords[caps[:, 0]], coords[caps[:, 1]], coords[caps[:, 2]]
+        clockwise = ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])) < 0
+        caps[clockwise] = caps[clockwise][:, ::-1]
+        top = caps + n
+        bottom = caps[:, ::-1]
+        faces = np.concatenate([bottom, top, walls])
+        face_features = np.concatenate([cap_features, cap_features, wall_features])
+    else:
+        faces = walls
+        face_features = wall_features
+
+    # 按几何排序，同一建筑的三角面连续存放
+    order = np.argsort(face_features, kind='stable')
+    return vertices, faces[order].astype(np.int64), face_features[order]
+
+def write_obj(output_file, vertices, faces, precision=6, face_groups=None, group_names=None):
+    """
+    一次性格式化并写入OBJ文件(索引从1开始)
+
+    参数:
+        face_groups: ndarray (m,) - 每个三角面所属的分组，需要已按分组排序，为None时不分组
+        group_names: dict - 分组 -> 组名(g)，未提供时使用分组编号
+    """
+    vertex_format = f"v %.{precision}f %.{precision}f %.{precision}f\n"
+    parts = [(vertex_format * len(vertices)) % tuple(vertices.ravel().tolist())]
+    indices = faces + 1
+    if face_groups is None or not len(faces):
+        parts.append(("f %d %d %d\n" * len(faces)) % tuple(indices.ravel().tolist()))
+    else:
+        boundaries = np.flatnonzero(np.diff(face_groups)) + 1
+        starts = np.concatenate([[0], boundaries]).tolist()
+        ends = np.concatenate([boundaries, [len(faces)]]).tolist()
+        for start, end in zip(starts, ends):
+            group = face_groups[start].item()
+            name = group_names.get(group, group) if group_names else group
+            parts.append(f"g {name}\n")
+            parts.append(("f %d %d %d\n" * (end - start)) % tuple(indices[start:end].ravel().tolist()))
+    with open(output_file, 'w') as f:
+        f.write("".join(parts))
+
+def write_ply(output_file, vertices, faces):
+    """ 写入二进制PLY文件，顶点坐标为double以保留投影坐标的精度 """
+    header = (
+        "ply\nformat binary_little_endian 1.0\n"
+        f"element vertex {len(vertices)}\n"
+        "property double x\nproperty double y\nproperty double z\n"
+        f"element face {len(faces)}\n"
+        "property list uchar int vertex_indices\n"
+        "end_header\n"
+    ).encode('ascii')
+    face_records = np.empty(len(faces), dtype=[('count', 'u1'), ('indices', '<i4', (3,))])
+    face_records['count'] = 3
+    face_records['indices'] = faces
+    with open(output_file, 'wb') as f:
+        f.write(header)
+        f.write(np.ascontiguousarray(vertices, dtype='<f8').tobytes())
+        f.write(face_records.tobytes())
+
+def _pad4(data, fill=b'\0'):
+    return data + fill * (-len(data) % 4)
+
+def write_glb(output_file, vertices, faces, vertex_attributes=None, feature_ids=None):
+    """
+    写入GLB(glTF 2.0二进制)文件
+
+    glTF的顶点坐标只支持float32，投影坐标先减去原点再写入，原点写入节点的平移量(Z轴朝上转换为Y轴朝上)
+
+    参数:
+        vertices: ndarray (n, 3)
+        faces: ndarray (m, 3)
+        vertex_attributes: dict - 额外的float32顶点属性 {属性名: ndarray (n,)}
+        feature_ids: ndarray (n,) - 每个顶点所属的要素编号，按EXT_mesh_features写入_FEATURE_ID_0属性
+    """
+    origin = np.floor(vertices.min(axis=0)) if len(vertices) else np.zeros(3)
+    local = (vertices - origin).astype('<f4')
+    # Z轴朝上 -> glTF的Y轴朝上
+    positions = np.ascontiguousarray(local[:, [0, 2, 1]] * np.array([1, 1, -1], dtype='<f4'))
+    indices = np.ascontiguousarray(faces, dtype='<u4')
+
+    blobs = [positions.tobytes(), indices.tobytes()]
+    accessors = [
+        {'bufferView': 0, 'componentType': 5126, 'count': len(positions), 'type': 'VEC3',
+         'min': positions.min(axis=0).tolist() if len(positions) else [0, 0, 0],
+         'max': positions.max(axis=0).tolist() if len(positions) else [0, 0, 0]},
+        {'bufferView': 1, 'componentType': 5125, 'count': int(indices.size), 'type': 'SCALAR'},
+    ]
+    buffer_views = [{'target': 34962}, {'target': 34963}]
+    attributes = {'POSITION': 0}
+    vertex_attributes = dict(vertex_attributes or {})
+    if feature_ids is not None:
+        vertex_attributes['_FEATURE_ID_0'] = feature_ids
+    for name, values in vertex_attributes.items():
+        attributes[name] = len(accessors)
+        accessors.append({'bufferView': len(blobs), 'componentType': 5126, 'count': len(values), 'type': 'SCALAR'})
+        blobs.append(np.ascontiguousarray(values, dtype='<f4').tobytes())
+        buffer_views.append({'target': 34962})
+
+    binary = b''
+    for view, blob in zip(buffer_views, blobs):
+        view.update({'buffer': 0, 'byteOffset': len(binary), 'byteLength': len(blob)})
+        binary += _pad4(blob)
+
+    primitive = {'attributes': attributes, 'indices': 1, 'mode': 4}
+    gltf = {
+        'asset': {'version': '2.0', 'generator': 'GoogleModelProcess extrude.py'},
+        'scene': 0,
+        'scenes': [{'nodes': [0]}],
+        'nodes': [{'mesh': 0, 'translation': [float(origin[0]), float(origin[2]), -float(origin[1])]}],
+        'meshes': [{'primitives': [primitive]}],
+        'accessors': accessors,
+        'bufferViews': buffer_views,
+        'buffers': [{'byteLength': len(binary)}],
+    }
+    if feature_ids is not None:
+        primitive['extensions'] = {'EXT_mesh_features': {'featureIds': [
+            {'featureCount': int(len(np.unique(feature_ids))), 'attribute': 0}]}}
+        gltf['extensionsUsed'] = ['EXT_mesh_features']
+    json_chunk = _pad4(json.dumps(gltf, separators=(',', ':')).encode('utf-8'), b' ')
+    total = 12 + 8 + len(json_chunk) + 8 + len(binary)
+    with open(output_file, 'wb') as f:
+        f.write(struct.pack('<III', 0x46546C67, 2, total))
+        f.write(struct.pack('<II', len(json_chunk), 0x4E4F534A))
+        f.write(json_chunk)
+        f.write(struct.pack('<II', len(binary), 0x004E4942))
+        f.write(binary)
+
+def write_mesh(output_file, vertices, faces):
+    """ 根据扩展名(.obj/.ply/.glb)写入网格文件 """
+    ext = output_file.lower().rsplit('.', 1)[-1]
+    if ext == 'obj':
+        write_obj(output_file, vertices, faces)
+    elif ext == 'ply':
+        write_ply(output_file, vertices, faces)
+    elif ext == 'glb':
+        write_glb(output_file, vertices, faces)
+    else:
+        raise ValueError(f"不支持的网格格式: {output_file}")
@@ -0,0 +1,225 @@
+'''
+Author: Leili
+Date: 2026-10-19 21:40:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 10:00:00
+FilePath: /GoogleModelProcess/Scripts/geocoder.py
+Description: 离线地理编码：从OSM提取文件的addr:*标签构建地址索引，按规范化的门牌号+街道查找坐标，未命中时由调用方回退到Google
+
+用法:
+    python Scripts/geocoder.py build california.osm.pbf california.geocoder.sqlite   # 构建索引
+    python Scripts/geocoder.py lookup california.geocoder.sqlite "110 N La Brea Ave, Inglewood, CA 90301"
+'''
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import threading
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(current_dir)
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+from Scripts.utils import normalize_address
+
+# 同一门牌号+街道存在多个候选且无法用城市/邮编区分时，候选之间的最大允许跨度(度，约500m)
+MAX_CANDIDATE_SPREAD = 0.005
+
+# 构建索引时每批写入SQLite的记录数
+INSERT_BATCH_SIZE = 100000
+
+def address_key(housenumber, street):
+    """ 索引键：规范化的"门牌号 街道" """
+    return normalize_address(f"{housenumber} {street}")
+
+def build_index(pbf_path, index_path, index_type='flex_mem'):
+    """
+    流式解析OSM提取文件中带addr:housenumber和addr:street标签的节点和way，写入SQLite索引
+
+    way的坐标取其节点坐标的平均值
+
+    参数:
+        pbf_path: str - .osm.pbf文件路径
+        index_path: str - 输出的SQLite索引路径
+        index_type: str - osmium的节点坐标索引类型
+
+    返回:
+        int: 地址数量
+    """
+    import osmium
+
+    tmp_path = index_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("CREATE TABLE addresses (key TEXT, city TEXT, postcode TEXT, lat REAL, lon REAL)")
+
+    class AddressHandler(osmium.SimpleHandler):
+        def __init__(self):
+            super().__init__()
+            self.rows = []
+            self.count = 0
+
+        def add(self, tags, lat, lon):
+            housenumber = tags.get('addr:housenumber')
+            street = tags.get('addr:street')
+            if not housenumber or not street:
+                return
+            self.rows.append((address_key(housenumber, street), normalize_address(tags.get('addr:city', '')),
+                              tags.get('addr:postcode', '').split('-')[0].strip(), lat, lon))
+            if len(self.rows) >= INSERT_BATCH_SIZE:
+                self.flush()
+
+        def node(self, n):
+            if 'addr:housenumber' in n.tags:
+                self.add(n.tags, n.location.lat, n.location.lon)
+
+        def way(self, w):
+            if 'addr:housenumber' not in w.tags:
+                return
+            locations = [node.location for node in w.nodes if node.location.valid()]
+            if w.is_closed():
+                locations = locations[:-1]
+            if locations:
+                self.add(w.tags, sum(l.lat for l in locations) / len(locations),
+                         sum(l.lon for l in locations) / len(locations))
+
+        def flush(self):
+            conn.executemany("INSERT INTO addresses VALUES (?, ?, ?, ?, ?)", self.rows)
+            self.count += len(self.rows)
+            self.rows = []
+
+    handler = AddressHandler()
+    handler.apply_file(pbf_path, locations=True, idx=index_type)
+    handler.flush()
+    conn.execute("CREATE INDEX idx_addresses_key ON addresses (key)")
+    conn.commit()
+    conn.close()
+    os.replace(tmp_path, index_path)
+    return handler.count
+
+class OfflineGeocoder:
+    """
+    离线地理编码器
+
+    索引一次性加载为 {规范化的"门牌号 街道": [(城市, 邮编, 纬度, 经度)]} 字典，
+    查找时从地址开头取最长的能命中的前缀作为门牌号+街道，剩余部分用于按城市/邮编区分同名街道；
+    剩余部分不为空但没有候选的城市/邮编与之一致时视为未命中
+    """
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.index = {}
+        self.lock = threading.Lock()
+        self.stats = {'lookups': 0, 'hits': 0, 'ambiguous': 0}
+        conn = sqlite3.connect(index_path)
+        try:
+            for key, city, postcode, lat, lon in conn.execute("SELECT key, city, postcode, lat, lon FROM addresses"):
+                self.index.setdefault(key, []).append((city, postcode, lat, lon))
+        finally:
+            conn.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def resolve(self, address):
+        """
+        查找地址的坐标，不修改统计
+
+        返回:
+            tuple: ((纬度, 经度)或None, 是否因多个候选相距过远而无法确定)
+        """
+        tokens = normalize_address(address).split()
+        if len(tokens) < 2 or not any(c.isdigit() for c in tokens[0]):
+            return None, False
+        for end in range(len(tokens), 1, -1):
+            candidates = self.index.get(" ".join(tokens[:end]))
+            if not candidates:
+                continue
+            rest = tokens[end:]
+            if rest:
+                # 地址带有城市/邮编时候选必须与之一致，否则视为未命中(同名街道可能在其他城市)，由调用方回退到Google
+                rest_text = " " + " ".join(rest) + " "
+                candidates = [c for c in candidates
+                              if (c[1] and c[1] in rest) or (c[0] and f" {c[0]} " in rest_text)]
+                if not candidates:
+                    return None, False
+            lats = [c[2] for c in candidates]
+            lons = [c[3] for c in candidates]
+            if max(lats) - min(lats) > MAX_CANDIDATE_SPREAD or max(lons) - min(lons) > MAX_CANDIDATE_SPREAD:
+                return None, True
+            return (candidates[0][2], candidates[0][3]), False
+        return None, False
+
+    def lookup(self, address):
+        """ 查找地址的坐标 (纬度, 经度)，未命中时返回None """
+        location, ambiguous = self.resolve(address)
+        with self.lock:
+            self.stats['lookups'] += 1
+            self.stats['hits'] += location is not None
+            self.stats['ambiguous'] += ambiguous
+        return location
+
+    def summary(self):
+        """ 本次运行的命中统计 """
+        with self.lock:
+            stats = dict(self.stats)
+        stats['hit_rate'] = stats['hits'] / stats['lookups'] if stats['lookups'] else 0.0
+        return stats
+
+    def format_summary(self):
+        stats = self.summary()
+        return (f"离线地理编码: 查询 {stats['lookups']} 次，命中 {stats['hits']} 次，"
+                f"命中率 {stats['hit_rate'] * 100:.2f}%，多个候选无法确定 {stats['ambiguous']} 次")
+
+# 当前使用的离线地理编码器
+_geocoder = None
+
+def get_offline_geocoder():
+    """
+    根据配置获取离线地理编码器
+
+    配置项:
+        geocoder_index: 由build命令生成的SQLite索引路径，为空时不使用离线地理编码
+    """
+    global _geocoder
+    if _geocoder is None:
+        from Scripts.config_utils import get_setting
+        index_path = get_setting('geocoder_index', '')
+        if index_path:
+            from Scripts.log_utils import logI
+            start = time.time()
+            _geocoder = OfflineGeocoder(index_path)
+            logI(f"已加载离线地理编码索引: {index_path}，{len(_geocoder)} 个地址，耗时 {time.time() - start:.1f}秒")
+    return _geocoder
+
+def main():
+    parser = argparse.ArgumentParser(description="离线地理编码索引")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="从OSM提取文件构建地址索引")
+    build_parser.add_argument("pbf", help=".osm.pbf文件路径")
+    build_parser.add_argument("index", help="输出的SQLite索引路径")
+    build_parser.add_argument("--index-type", default="flex_mem", help="osmium节点坐标索引类型")
+
+    lookup_parser = subparsers.add_parser("lookup", help="查找地址")
+    lookup_parser.add_argument("index", help="SQLite索引路径")
+    lookup_parser.add_argument("addresses", nargs="+", help="地址")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        start = time.time()
+        count = build_index(args.pbf, args.index, args.index_type)
+        print(f"共索引 {count} 个地址，耗时 {time.time() - start:.1f}秒: {args.index}")
+    else:
+        geocoder = OfflineGeocoder(args.index)
+        for address in args.addresses:
+            start = time.perf_counter()
+            location = geocoder.lookup(address)
+            print(f"{address}: {location} ({(time.perf_counter() - start) * 1e6:.1f}微秒)")
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 Author: Leili
 Date: 2025-05-06
 LastEditors: Leili
-LastEditTime: 2025-05-19 16:56:09
+LastEditTime: 2026-10-19 05:31:59
 FilePath: /GoogleModelProcess/Scripts/log_utils.py
 Description: 日志工具模块，提供统一的日志记录功能
 '''
@@ -100,7 +100,9 @@ def get_logger():
     """
     global logger
     if logger is None:
-        logger = setup_logger()
+        # 首次使用时按配置文件中的日志级别和目录初始化
+        from Scripts.config_utils import get_log_level, get_log_dir
+        logger = setup_logger(log_level=get_log_level(), log_dir=get_log_dir())
     return logger
 
 # 便捷日志记录函数
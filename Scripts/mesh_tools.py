@@ -1,17 +1,440 @@
 bl_info = {
     "name": "网格工具",
     "author": "Leili",
-    "version": (1, 0, 1),
+    "version": (1, 0, 4),
     "blender": (2, 80, 0),
     "location": "视图3D > 工具栏",
     "description": "网格处理工具集：合并、优化、居中等",
     "category": "Mesh",
 }
 
+import logging
+
 import bpy
-import bmesh
+import numpy as np
 from bpy.types import Operator, Panel
-from mathutils import Vector
+
+# 在流程中运行时写入流程日志，单独作为插件使用时输出到控制台
+logger = logging.getLogger('google_model_process')
+
+# Blender 4.0起顶点坐标、面角顶点、材质索引和平滑标记都以属性层保存，
+# 通过属性层批量读写比逐元素的RNA属性快一到两个数量级；旧版本使用RNA属性
+USE_ATTRIBUTES = bpy.app.version >= (4, 0, 0)
+
+# 网格字段: 名称 -> (元素集合, RNA属性, 属性层名称, 属性层类型, 分量数, dtype)
+# sharp_face的RNA属性为use_smooth，取值相反
+MESH_FIELDS = {
+    'position': ('vertices', 'co', 'position', 'FLOAT_VECTOR', 3, np.float32),
+    'corner_vert': ('loops', 'vertex_index', '.corner_vert', 'INT', 1, np.int32),
+    'material_index': ('polygons', 'material_index', 'material_index', 'INT', 1, np.int32),
+    'sharp_face': ('polygons', 'use_smooth', 'sharp_face', 'BOOLEAN', 1, bool),
+    'edge_verts': ('edges', 'vertices', '.edge_verts', 'INT32_2D', 2, np.int32),
+    'select_vert': ('vertices', 'select', '.select_vert', 'BOOLEAN', 1, bool),
+    'select_edge': ('edges', 'select', '.select_edge', 'BOOLEAN', 1, bool),
+    'select_poly': ('polygons', 'select', '.select_poly', 'BOOLEAN', 1, bool),
+}
+ATTRIBUTE_DOMAINS = {'vertices': 'POINT', 'edges': 'EDGE', 'loops': 'CORNER', 'polygons': 'FACE'}
+# 属性层类型 -> (foreach_get/foreach_set的属性名, 分量数, dtype)，字符串类型不支持批量读写
+ATTRIBUTE_TYPES = {
+    'FLOAT': ('value', 1, np.float32),
+    'INT': ('value', 1, np.int32),
+    'INT8': ('value', 1, np.int8),
+    'BOOLEAN': ('value', 1, bool),
+    'FLOAT2': ('vector', 2, np.float32),
+    'FLOAT_VECTOR': ('vector', 3, np.float32),
+    'INT16_2D': ('value', 2, np.int16),
+    'INT32_2D': ('value', 2, np.int32),
+    'FLOAT_COLOR': ('color', 4, np.float32),
+    'BYTE_COLOR': ('color', 4, np.float32),
+    'QUATERNION': ('value', 4, np.float32),
+    'FLOAT4X4': ('value', 16, np.float32),
+}
+
+def read_field(mesh, field):
+    """ 读取网格字段为NumPy数组，多分量字段形状为(元素数, 分量数)；属性层不存在时为默认值0/False """
+    collection, rna_prop, name, data_type, width, dtype = MESH_FIELDS[field]
+    items = getattr(mesh, collection)
+    values = np.empty(len(items) * width, dtype=dtype)
+    if USE_ATTRIBUTES:
+        layer = mesh.attributes.get(name)
+        if layer is not None:
+            layer.data.foreach_get(ATTRIBUTE_TYPES[data_type][0], values)
+        else:
+            values[:] = 0
+    else:
+        items.foreach_get(rna_prop, values)
+        if field == 'sharp_face':
+            values = ~values
+    return values.reshape(-1, width) if width > 1 else values
+
+def write_field(mesh, field, values):
+    """ 写入网格字段，属性层不存在时创建 """
+    collection, rna_prop, name, data_type, width, dtype = MESH_FIELDS[field]
+    values = np.ascontiguousarray(values, dtype=dtype).ravel()
+    if USE_ATTRIBUTES:
+        layer = mesh.attributes.get(name)
+        if layer is None:
+            layer = mesh.attributes.new(name, data_type, ATTRIBUTE_DOMAINS[collection])
+        layer.data.foreach_set(ATTRIBUTE_TYPES[data_type][0], values)
+    else:
+        getattr(mesh, collection).foreach_set(rna_prop, ~values if field == 'sharp_face' else values)
+
+def read_uv(mesh, name):
+    """ 读取UV层为(面角数, 2)的数组 """
+    values = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    if USE_ATTRIBUTES:
+        mesh.attributes[name].data.foreach_get('vector', values)
+    else:
+        mesh.uv_layers[name].data.foreach_get('uv', values)
+    return values.reshape(-1, 2)
+
+def write_uv(mesh, name, values):
+    """ 新建UV层并写入 """
+    layer = mesh.uv_layers.new(name=name)
+    values = np.ascontiguousarray(values, dtype=np.float32).ravel()
+    if USE_ATTRIBUTES:
+        mesh.attributes[layer.name].data.foreach_set('vector', values)
+    else:
+        layer.data.foreach_set('uv', values)
+
+def read_attributes(mesh, skip=()):
+    """
+    读取MESH_FIELDS以外的属性层(顶点色、缝合线、锐边、折痕、自定义法线等)，
+    跳过.开头的内部属性层、skip中的属性层(如单独处理的UV层)和不支持批量读写的类型；Blender 4.0以前不读取
+
+    返回:
+        dict: {名称: (域, 类型, 数组)}，数组形状为(元素数, 分量数)
+    """
+    attributes = {}
+    if not USE_ATTRIBUTES:
+        return attributes
+    skip = set(skip) | {field[2] for field in MESH_FIELDS.values()}
+    for layer in mesh.attributes:
+        if layer.name.startswith('.') or layer.name in skip or layer.data_type not in ATTRIBUTE_TYPES:
+            continue
+        key, width, dtype = ATTRIBUTE_TYPES[layer.data_type]
+        values = np.empty(len(layer.data) * width, dtype=dtype)
+        layer.data.foreach_get(key, values)
+        attributes[layer.name] = (layer.domain, layer.data_type, values.reshape(-1, width))
+    return attributes
+
+def write_attributes(mesh, attributes):
+    """ 写入read_attributes读取的属性层，属性层不存在(或域、类型不同)时重新创建 """
+    for name, (domain, data_type, values) in attributes.items():
+        layer = mesh.attributes.get(name)
+        if layer is not None and (layer.domain != domain or layer.data_type != data_type):
+            mesh.attributes.remove(layer)
+            layer = None
+        if layer is None:
+            layer = mesh.attributes.new(name, data_type, domain)
+        layer.data.foreach_set(ATTRIBUTE_TYPES[data_type][0], np.ascontiguousarray(values).ravel())
+
+def warn_unsupported_data(obj, action):
+    """ 顶点组和形态键不在属性层中，批量重建网格时不保留，存在时输出警告 """
+    lost = []
+    if len(obj.vertex_groups):
+        lost.append(f"{len(obj.vertex_groups)}个顶点组")
+    if obj.type == 'MESH' and obj.data.shape_keys is not None:
+        lost.append("形态键")
+    if lost:
+        logger.warning(f"{obj.name}: {action}后不保留{'和'.join(lost)}")
+
+def read_loop_starts(mesh):
+    starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get('loop_start', starts)
+    return starts
+
+def write_polygons(mesh, loop_starts):
+    """ 按每个面的起始面角添加面 """
+    mesh.polygons.add(len(loop_starts))
+    mesh.polygons.foreach_set('loop_start', loop_starts)
+    if not bpy.types.MeshPolygon.bl_rna.properties['loop_total'].is_readonly:
+        # 旧版本Blender需要同时写入每个面的面角数
+        mesh.polygons.foreach_set('loop_total', np.diff(np.append(loop_starts, len(mesh.loops))).astype(np.int32))
+
+def center_origin(obj):
+    """
+    将网格对象的XY中心(所有顶点世界坐标的平均值)移动到原点，Z轴最低点移动到0，并将对象位置重置为原点
+
+    顶点坐标一次读入NumPy数组，计算中心和最低点后统一平移，再一次写回。
+    对象位置重置后世界坐标为L·v(L为matrix_world的3x3部分)，要使其等于原世界坐标L·v + T加上平移量t，
+    局部坐标只需统一加上偏移量L⁻¹·(T + t)
+
+    返回:
+        bool: 网格没有顶点时返回False
+    """
+    mesh_data = obj.data
+    if len(mesh_data.vertices) == 0:
+        return False
+
+    co = read_field(mesh_data, 'position')
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    linear, offset = matrix[:3, :3], matrix[:3, 3]
+    # 世界坐标的平均值等于局部坐标平均值的变换；最低点只需计算世界坐标的Z分量
+    center = co.mean(axis=0, dtype=np.float64) @ linear.T + offset
+    min_z = (co @ linear[2]).min() + offset[2]
+    translation = np.array([-center[0], -center[1], -min_z])
+    co += np.linalg.solve(linear, offset + translation).astype(np.float32)
+
+    write_field(mesh_data, 'position', co)
+    mesh_data.update()
+    obj.location = (0.0, 0.0, 0.0)
+    return True
+
+def merge_meshes(objects, name="Combined_Mesh"):
+    """
+    将多个网格对象合并为一个新的网格对象，并删除原对象，替代依赖上下文的bpy.ops.object.join
+
+    每个对象的顶点、边、面、UV、材质索引和平滑标记读入NumPy数组，顶点按对象的matrix_world变换到世界坐标，
+    边和面角的顶点索引、面的起始面角加上偏移量后拼接，最后一次写入新网格。
+    材质按原对象的材质槽重新映射到合并后的材质列表(相同的材质只保留一个槽)，同名UV层合并为一层，缺少该层的对象UV为0；
+    其余的属性层(顶点色、缝合线、锐边、折痕、自定义法线等)同样按名称合并，缺少该属性层(或域、类型不同)的对象填充0。
+    matrix_world的行列式为负(镜像)时反转该对象每个面的面角顺序，保持法线朝外，
+    这时自定义法线的编码(相对于面角的局部坐标系)不再适用，改为将面角法线变换到世界坐标后重新设置。
+    合并后的对象变换为单位矩阵；顶点组和形态键不保留，存在时输出警告
+
+    参数:
+        objects: 要合并的网格对象列表
+        name: 合并后的对象名称
+
+    返回:
+        bpy.types.Object: 合并后的对象，没有可合并的网格时返回None
+    """
+    objects = [obj for obj in objects if obj.type == 'MESH']
+    if not objects:
+        return None
+
+    identity = np.identity(4)
+    coords, edges, corner_verts, loop_starts, material_indices, sharp = [], [], [], [], [], []
+    uv_names = []
+    uv_parts = []
+    attribute_types = {}
+    attribute_parts = []
+    materials = []
+    material_slots = {}
+    vertex_offset = edge_offset = loop_offset = 0
+    color_names = None
+    had_custom_normals = False
+    # 镜像对象的世界坐标面角法线 [(起始面角, 法线)]
+    mirrored_normals = []
+    for obj in objects:
+        mesh = obj.data
+        warn_unsupported_data(obj, "合并网格")
+
+        co = read_field(mesh, 'position')
+        matrix = np.array(obj.matrix_world, dtype=np.float64)
+        transformed = not np.array_equal(matrix, identity)
+        if transformed:
+            co = (co @ matrix[:3, :3].T + matrix[:3, 3]).astype(np.float32)
+        coords.append(co)
+        edges.append(read_field(mesh, 'edge_verts') + vertex_offset)
+        starts = read_loop_starts(mesh)
+        # 镜像变换后面的朝向相反，反转每个面的面角顺序(面角n个的面中第k个面角与第n-1-k个交换)
+        corner_order = None
+        if transformed and np.linalg.det(matrix[:3, :3]) < 0:
+            totals = np.diff(np.append(starts, len(mesh.loops)))
+            first = np.repeat(starts, totals)
+            corner_order = 2 * first + np.repeat(totals, totals) - 1 - np.arange(len(mesh.loops))
+        corners = read_field(mesh, 'corner_vert')
+        corner_verts.append((corners if corner_order is None else corners[corner_order]) + vertex_offset)
+        had_custom_normals |= mesh.has_custom_normals
+        if corner_order is not None and mesh.has_custom_normals and hasattr(mesh, 'corner_normals'):
+            normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+            mesh.corner_normals.foreach_get('vector', normals)
+            # 法线按线性变换的逆转置变换
+            normals = normals.reshape(-1, 3)[corner_order] @ np.linalg.inv(matrix[:3, :3])
+            normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+            mirrored_normals.append((loop_offset, normals.astype(np.float32)))
+        loop_starts.append(starts + loop_offset)
+        sharp.append(read_field(mesh, 'sharp_face'))
+
+        # 材质槽映射到合并后的材质列表，没有材质槽的对象使用空槽
+        lookup = []
+        for slot in (obj.material_slots if len(obj.material_slots) else [None]):
+            material = slot.material if slot is not None else None
+            if material not in material_slots:
+                material_slots[material] = len(materials)
+                materials.append(material)
+            lookup.append(material_slots[material])
+        indices = read_field(mesh, 'material_index')
+        material_indices.append(np.asarray(lookup, dtype=np.int32)[np.clip(indices, 0, len(lookup) - 1)])
+
+        layers = {}
+        for layer in mesh.uv_layers:
+            uv = read_uv(mesh, layer.name)
+            layers[layer.name] = uv if corner_order is None else uv[corner_order]
+            if layer.name not in uv_names:
+                uv_names.append(layer.name)
+        uv_parts.append((len(mesh.loops), layers))
+
+        # 属性层的域和类型以第一个包含该属性层的对象为准
+        attributes = read_attributes(mesh, uv_names)
+        for name, (domain, data_type, values) in attributes.items():
+            attribute_types.setdefault(name, (domain, data_type))
+            if domain == 'CORNER' and corner_order is not None:
+                attributes[name] = (domain, data_type, values[corner_order])
+        counts = {'POINT': len(co), 'EDGE': len(mesh.edges), 'CORNER': len(mesh.loops), 'FACE': len(mesh.polygons)}
+        attribute_parts.append((counts, attributes))
+        if color_names is None and USE_ATTRIBUTES and len(mesh.color_attributes):
+            color_names = (mesh.color_attributes.active_color_name, mesh.color_attributes.default_color_name)
+
+        vertex_offset += len(co)
+        edge_offset += len(mesh.edges)
+        loop_offset += len(mesh.loops)
+
+    merged = bpy.data.meshes.new(name)
+    merged.vertices.add(vertex_offset)
+    write_field(merged, 'position', np.concatenate(coords))
+    merged.edges.add(edge_offset)
+    write_field(merged, 'edge_verts', np.concatenate(edges))
+    merged.loops.add(loop_offset)
+    write_field(merged, 'corner_vert', np.concatenate(corner_verts))
+    write_polygons(merged, np.concatenate(loop_starts))
+    sharp = np.concatenate(sharp)
+    if sharp.any():
+        write_field(merged, 'sharp_face', sharp)
+
+    # 所有对象都没有材质时不创建材质槽
+    if any(material is not None for material in materials):
+        for material in materials:
+            merged.materials.append(material)
+        write_field(merged, 'material_index', np.concatenate(material_indices))
+
+    for uv_name in uv_names:
+        write_uv(merged, uv_name, np.concatenate([layers.get(uv_name, np.zeros((loop_count, 2), dtype=np.float32))
+                                                  for loop_count, layers in uv_parts]))
+
+    merged_attributes = {}
+    for name, (domain, data_type) in attribute_types.items():
+        _, width, dtype = ATTRIBUTE_TYPES[data_type]
+        parts = []
+        for counts, attributes in attribute_parts:
+            part = attributes.get(name)
+            if part is None or part[:2] != (domain, data_type):
+                parts.append(np.zeros((counts[domain], width), dtype=dtype))
+            else:
+                parts.append(part[2])
+        merged_attributes[name] = (domain, data_type, np.concatenate(parts))
+    write_attributes(merged, merged_attributes)
+    if color_names is not None:
+        merged.color_attributes.active_color_name, merged.color_attributes.default_color_name = color_names
+
+    # 计算面角对应的边，已有的边保持不变
+    merged.update(calc_edges=True)
+    if mirrored_normals:
+        normals = np.empty(loop_offset * 3, dtype=np.float32)
+        merged.corner_normals.foreach_get('vector', normals)
+        normals = normals.reshape(-1, 3)
+        for start, part in mirrored_normals:
+            normals[start:start + len(part)] = part
+        merged.normals_split_custom_set(normals)
+    if had_custom_normals and not merged.has_custom_normals:
+        # 旧版本Blender的自定义法线不在属性层中
+        logger.warning(f"{name}: 合并网格后不保留自定义法线")
+
+    # 新对象放在第一个对象所在的集合中，原对象和不再使用的网格数据一并删除
+    collection = objects[0].users_collection[0] if objects[0].users_collection else bpy.context.scene.collection
+    merged_object = bpy.data.objects.new(name, merged)
+    collection.objects.link(merged_object)
+    old_meshes = {obj.data for obj in objects}
+    bpy.data.batch_remove(objects)
+    bpy.data.batch_remove([mesh for mesh in old_meshes if mesh.users == 0])
+    # 删除原对象后再设置名称，避免与原对象重名时被自动加上后缀
+    merged_object.name = name
+    merged.name = name
+
+    merged_object.select_set(True)
+    bpy.context.view_layer.objects.active = merged_object
+    return merged_object
+
+def remove_unselected(obj):
+    """
+    删除网格对象中所有未选中的顶点以及与之相连的边和面(与bmesh.ops.delete的VERTS模式结果相同)，
+    替代逐个收集未选中的BMVert再调用bmesh.ops.delete
+
+    顶点的选择状态读入NumPy布尔数组，面的所有顶点都保留时面才保留，边的两个顶点都保留时边才保留，
+    顶点、边和面角的索引按保留的掩码重新编号后清空网格一次写回。坐标、材质索引、平滑标记、UV
+    以及其余的属性层(顶点色、缝合线、锐边、折痕、自定义法线等)按所在的域用同一掩码筛选后写回；
+    顶点组和形态键不保留，存在时输出警告。对象处于编辑模式时先切换到对象模式写回选择状态，完成后切换回编辑模式
+
+    参数:
+        obj: 网格对象，编辑模式下需要是活动对象
+
+    返回:
+        int: 删除的顶点数
+    """
+    edit_mode = obj.mode == 'EDIT'
+    if edit_mode:
+        bpy.ops.object.mode_set(mode='OBJECT')
+    try:
+        mesh = obj.data
+        keep = read_field(mesh, 'select_vert')
+        removed = int(len(keep) - np.count_nonzero(keep))
+        if removed == 0:
+            return 0
+
+        # 旧索引 -> 新索引
+        vert_map = np.cumsum(keep, dtype=np.int32) - 1
+        edges = read_field(mesh, 'edge_verts')
+        edge_keep = keep[edges[:, 0]] & keep[edges[:, 1]]
+        corner_verts = read_field(mesh, 'corner_vert')
+        loop_starts = read_loop_starts(mesh)
+        loop_totals = np.diff(np.append(loop_starts, len(corner_verts)))
+        if len(loop_starts):
+            poly_keep = np.logical_and.reduceat(keep[corner_verts], loop_starts)
+        else:
+            poly_keep = np.zeros(0, dtype=bool)
+        loop_keep = np.repeat(poly_keep, loop_totals)
+        kept_totals = loop_totals[poly_keep]
+
+        co = read_field(mesh, 'position')[keep]
+        edges = vert_map[edges[edge_keep]]
+        corner_verts = vert_map[corner_verts[loop_keep]]
+        material_indices = read_field(mesh, 'material_index')[poly_keep]
+        sharp = read_field(mesh, 'sharp_face')[poly_keep]
+        uv_names = [layer.name for layer in mesh.uv_layers]
+        uv_active = mesh.uv_layers.active_index
+        uvs = [read_uv(mesh, name)[loop_keep] for name in uv_names]
+        masks = {'POINT': keep, 'EDGE': edge_keep, 'CORNER': loop_keep, 'FACE': poly_keep}
+        attributes = {name: (domain, data_type, values[masks[domain]])
+                      for name, (domain, data_type, values) in read_attributes(mesh, uv_names).items()}
+        color_names = ((mesh.color_attributes.active_color_name, mesh.color_attributes.default_color_name)
+                       if USE_ATTRIBUTES else None)
+        had_custom_normals = mesh.has_custom_normals
+        warn_unsupported_data(obj, "删除未选中顶点")
+
+        # 清空几何数据(材质槽保留)后按保留的元素重新写入
+        mesh.clear_geometry()
+        mesh.vertices.add(len(co))
+        write_field(mesh, 'position', co)
+        mesh.edges.add(len(edges))
+        write_field(mesh, 'edge_verts', edges)
+        mesh.loops.add(len(corner_verts))
+        write_field(mesh, 'corner_vert', corner_verts)
+        write_polygons(mesh, (np.cumsum(kept_totals) - kept_totals).astype(np.int32))
+        if material_indices.any():
+            write_field(mesh, 'material_index', material_indices)
+        if sharp.any():
+            write_field(mesh, 'sharp_face', sharp)
+        for name, uv in zip(uv_names, uvs):
+            write_uv(mesh, name, uv)
+        if uv_names:
+            mesh.uv_layers.active_index = uv_active
+        write_attributes(mesh, attributes)
+        if color_names is not None:
+            mesh.color_attributes.active_color_name, mesh.color_attributes.default_color_name = color_names
+        # 保留的元素都处于选中状态
+        for field, count in (('select_vert', len(co)), ('select_edge', len(edges)), ('select_poly', len(kept_totals))):
+            write_field(mesh, field, np.ones(count, dtype=bool))
+        # 重新计算面角对应的边，已有的边保持不变
+        mesh.update(calc_edges=True)
+        if had_custom_normals and not mesh.has_custom_normals:
+            # 旧版本Blender的自定义法线不在属性层中
+            logger.warning(f"{obj.name}: 删除未选中顶点后不保留自定义法线")
+        return removed
+    finally:
+        if edit_mode:
+            bpy.ops.object.mode_set(mode='EDIT')
 
 class MESH_OT_merge_all(Operator):
     """合并场景中所有的网格对象"""
@@ -27,21 +450,12 @@ class MESH_OT_merge_all(Operator):
             self.report({'WARNING'}, "场景中没有网格物体可合并")
             return {'CANCELLED'}
         
-        # 确保所有对象都被选中
-        bpy.ops.object.select_all(action='DESELECT')
-        
-        # 选择要合并的对象
-        for obj in mesh_objects:
-            obj.select_set(True)
-        
-        # 设置活动对象
-        context.view_layer.objects.active = mesh_objects[0]
+        # 确保在对象模式下，编辑模式中的修改需要先写回网格数据
+        if context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
         
-        # 合并对象
-        bpy.ops.object.join()
-        
-        # 重命名合并后的对象
-        context.view_layer.objects.active.name = "Combined_Mesh"
+        # 通过网格数据批量合并
+        merge_meshes(mesh_objects, "Combined_Mesh")
         
         self.report({'INFO'}, "网格合并完成")
         return {'FINISHED'}
@@ -85,35 +499,9 @@ class MESH_OT_center_origin(Operator):
             self.report({'WARNING'}, "请先选择一个网格对象")
             return {'CANCELLED'}
 
-        obj = context.active_object
-        mesh_data = obj.data
-        
-        # 计算几何中心和最低点
-        vertex_sum = Vector((0, 0, 0))
-        min_z = float('inf')
-        
-        for vertex in mesh_data.vertices:
-            world_co = obj.matrix_world @ vertex.co
-            vertex_sum += Vector((world_co.x, world_co.y, 0))
-            min_z = min(min_z, world_co.z)
-        
-        vertex_count = len(mesh_data.vertices)
-        if vertex_count > 0:
-            geometric_center = vertex_sum / vertex_count
-            translation_vector = Vector((-geometric_center.x, -geometric_center.y, -min_z))
-        else:
+        if not center_origin(context.active_object):
             self.report({'WARNING'}, "网格没有顶点")
             return {'CANCELLED'}
-
-        # 应用移动到所有顶点
-        for vertex in mesh_data.vertices:
-            world_co = obj.matrix_world @ vertex.co
-            new_co = world_co + translation_vector
-            vertex.co = obj.matrix_world.inverted() @ new_co
-
-        # 更新网格数据
-        mesh_data.update()
-        obj.location = (0.0, 0.0, 0.0)
         
         self.report({'INFO'}, "网格已居中到原点")
         return {'FINISHED'}
@@ -135,24 +523,14 @@ class MESH_OT_remove_unselected(Operator):
             self.report({'WARNING'}, "请在编辑模式下使用此功能")
             return {'CANCELLED'}
         
-        # 创建bmesh对象
-        bm = bmesh.from_edit_mesh(obj.data)
-        bm.verts.ensure_lookup_table()
-        
-        # 收集未选中的顶点
-        verts_to_remove = [v for v in bm.verts if not v.select]
-        
-        if not verts_to_remove:
+        # 按选择状态的掩码批量删除
+        removed = remove_unselected(obj)
+
+        if not removed:
             self.report({'INFO'}, "没有找到未选中的顶点")
             return {'FINISHED'}
-        
-        # 删除未选中的顶点
-        bmesh.ops.delete(bm, geom=verts_to_remove, context='VERTS')
-        
-        # 更新网格
-        bmesh.update_edit_mesh(obj.data)
-        
-        self.report({'INFO'}, f"已删除 {len(verts_to_remove)} 个未选中的顶点")
+
+        self.report({'INFO'}, f"已删除 {removed} 个未选中的顶点")
         return {'FINISHED'}
 
 class VIEW3D_PT_mesh_tools(Panel):
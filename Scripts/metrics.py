@@ -0,0 +1,263 @@
+'''
+Author: Leili
+Date: 2026-10-19 11:50:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 11:50:00
+FilePath: /GoogleModelProcess/Scripts/metrics.py
+Description: 运行指标注册表(计数器、仪表、直方图)，以Prometheus文本格式通过HTTP /metrics 或文本文件导出
+'''
+import os
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Scripts.config_utils import get_setting
+from Scripts.log_utils import logD, logI, logW
+
+# 阶段耗时直方图的默认分桶(秒)
+DEFAULT_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1200, float('inf'))
+
+def _escape(value):
+    """ 转义标签值中的反斜杠、双引号和换行 """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Metric:
+    """ 指标基类，按标签值分别保存数据 """
+    type_name = "untyped"
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    """ 只增不减的计数器 """
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self.lock:
+            return self.values.get(self._key(labels), 0)
+
+class Gauge(Metric):
+    """ 可任意设置的仪表 """
+    type_name = "gauge"
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self.lock:
+            return self.values.get(self._key(labels), 0)
+
+class Histogram(Metric):
+    """ 直方图，记录观测值的分布、总和和次数 """
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        if self.buckets[-1] != float('inf'):
+            self.buckets += (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            counts, total, count = self.values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            counts = list(counts)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = (counts, total + value, count + 1)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        with self.lock:
+            for key, (counts, total, count) in sorted(self.values.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    labels = _format_labels(self.label_names, key, ("le", _format_value(bound)))
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                labels = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class MetricsRegistry:
+    """ 指标注册表 """
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _register(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, label_names=()):
+        return self._register(Counter(name, help_text, label_names))
+
+    def gauge(self, name, help_text, label_names=()):
+        return self._register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def render(self):
+        """ 以Prometheus文本格式输出所有指标 """
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """ 写入textfile collector文件，先写临时文件再替换，避免采集到写了一半的内容 """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+# 全局注册表和抓取流程使用的指标
+REGISTRY = MetricsRegistry()
+
+ADDRESSES_TOTAL = REGISTRY.counter(
+    "gmp_addresses_total", "已处理的地址数量", ("result",))
+ADDRESSES_PER_HOUR = REGISTRY.gauge(
+    "gmp_addresses_per_hour", "本次运行的每小时成功处理地址数")
+STAGE_DURATION = REGISTRY.histogram(
+    "gmp_stage_duration_seconds", "各阶段耗时(秒)", ("stage",))
+STAGE_TIMEOUTS = REGISTRY.counter(
+    "gmp_stage_timeouts_total", "看门狗判定超时的阶段次数", ("stage",))
+RETRIES_TOTAL = REGISTRY.counter(
+    "gmp_retries_total", "重试次数", ("stage",))
+RDC_BYTES_WRITTEN = REGISTRY.counter(
+    "gmp_rdc_bytes_written_total", "新抓取的RDC文件总字节数")
+QUEUE_DEPTH = REGISTRY.gauge(
+    "gmp_queue_depth", "待处理的队列长度", ("queue",))
+RUN_START_TIME = REGISTRY.gauge(
+    "gmp_run_start_time_seconds", "本次运行的开始时间(Unix时间戳)")
+
+def record_address_result(result):
+    """
+    记录一个地址的处理结果并更新吞吐量
+
+    参数:
+        result: str - 处理结果，如 success/failed/existing/timeout
+    """
+    ADDRESSES_TOTAL.inc(result=result)
+    start = RUN_START_TIME.get()
+    if start:
+        elapsed = max(time.time() - start, 1.0)
+        ADDRESSES_PER_HOUR.set(round(ADDRESSES_TOTAL.get(result="success") / elapsed * 3600, 2))
+    export_textfile()
+
+def on_stage(event, stage_name, address, elapsed):
+    """ 阶段变化监听器，记录阶段耗时 """
+    if event == 'exit':
+        STAGE_DURATION.observe(elapsed, stage=stage_name)
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """ 提供 /metrics 接口的HTTP请求处理类 """
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 不输出每次请求的访问日志
+        pass
+
+_server = None
+_textfile_path = None
+
+def start_metrics():
+    """
+    根据配置启动指标导出
+
+    配置项:
+        metrics_port: 本地HTTP端口，0表示不启动HTTP服务
+        metrics_textfile: textfile collector文件路径，为空表示不写文件
+    """
+    global _server, _textfile_path
+    RUN_START_TIME.set(time.time())
+    from Scripts.stage_watchdog import add_stage_listener
+    add_stage_listener(on_stage)
+
+    _textfile_path = get_setting('metrics_textfile', '') or None
+    port = int(get_setting('metrics_port', 0))
+    if port and _server is None:
+        try:
+            _server = ThreadingHTTPServer(('127.0.0.1', port), MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="MetricsServer", daemon=True).start()
+            logI(f"指标服务已启动: http://127.0.0.1:{port}/metrics")
+        except OSError as e:
+            logW(f"启动指标服务失败: {str(e)}")
+            _server = None
+    export_textfile()
+
+def export_textfile():
+    """ 配置了textfile路径时写入当前指标 """
+    if not _textfile_path:
+        return
+    try:
+        REGISTRY.write_textfile(_textfile_path)
+    except OSError as e:
+        logW(f"写入指标文件失败: {str(e)}")
+
+def stop_metrics():
+    """ 停止指标导出，并写入最终的指标文件 """
+    global _server
+    from Scripts.stage_watchdog import remove_stage_listener
+    remove_stage_listener(on_stage)
+    export_textfile()
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
+        logD("指标服务已停止")
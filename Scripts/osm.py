@@ -1,17 +1,61 @@
 import osmnx as ox
 import geopandas as gpd
-from shapely.geometry import Point, Polygon, box
+from shapely.geometry import Polygon, MultiPolygon, box
 import folium
-import math
 import googlemaps
 from datetime import datetime
 import numpy as np
-import json
 import os
+from itertools import islice
+import sys
 import time
 import logging
 from logging.handlers import RotatingFileHandler
 
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(current_dir)
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+from Scripts.osm_tiles import DEFAULT_TILE_ZOOM, OverpassSource, GeoJSONSource, download_footprints, point_bounds
+from Scripts.osm_pbf import PbfSource
+from Scripts.osm_cache import DEFAULT_TTL_DAYS, DEFAULT_MAX_MB, TileCache, CachedSource
+from Scripts.geocoder import OfflineGeocoder
+from Scripts.address_reader import DEFAULT_CHECKPOINT_EVERY, AddressReader
+from Scripts.osm_nearest import assign_nearest, find_nearest_building, project_building
+from Scripts.extrude import building_height, extrude_geometries, write_mesh
+from Scripts.osm_export import export_tiles
+from Scripts.osm_map import MAP_MODES, MapCollector
+from Scripts.osm_sink import ResultSink
+from Scripts.osm_concurrent import DEFAULT_GOOGLE_RATE, DEFAULT_OVERPASS_RATE, RateLimiter, run_ordered
+
+GOOGLE_BASE_URL = 'https://maps.googleapis.com'
+
+# Google和Overpass分别限速，所有工作线程共享
+google_limiter = RateLimiter(DEFAULT_GOOGLE_RATE)
+overpass_limiter = RateLimiter(DEFAULT_OVERPASS_RATE)
+
+# 离线地理编码器，为None时所有地址都通过Google地理编码
+offline_geocoder = None
+
+def configure_network(google_rate=DEFAULT_GOOGLE_RATE, overpass_rate=DEFAULT_OVERPASS_RATE,
+                      google_base_url=None, overpass_url=None):
+    """
+    配置网络请求的限速和服务地址
+    :param google_rate: Google地理编码限速(次/秒)，None表示不限速
+    :param overpass_rate: Overpass查询限速(次/秒)，None表示不限速
+    :param google_base_url: Google Maps API地址，用于指向本地测试服务
+    :param overpass_url: Overpass API地址，用于指向自建实例或本地测试服务
+    """
+    global google_limiter, overpass_limiter, GOOGLE_BASE_URL
+    google_limiter = RateLimiter(google_rate)
+    overpass_limiter = RateLimiter(overpass_rate)
+    if google_base_url:
+        GOOGLE_BASE_URL = google_base_url
+    if overpass_url:
+        ox.settings.overpass_url = overpass_url
+
 def download_osm_data_by_address(address, distance=1000, tags=None):
     """
     下载指定地址周边的OSM数据
@@ -36,28 +80,30 @@ def download_osm_data_by_address(address, distance=1000, tags=None):
     
     # 过滤出最近的建筑物
     if not gdf.empty:
-        # 创建中心点
-        center = Point(lon, lat)
-        
-        # 将数据转换为UTM投影坐标系
-        utm_zone = int(math.floor((lon + 180) / 6) + 1)
-        utm_crs = f'EPSG:326{utm_zone:02d}' if lat >= 0 else f'EPSG:327{utm_zone:02d}'
-        
-        # 转换坐标系
-        gdf_proj = gdf.to_crs(utm_crs)
-        center_proj = gpd.GeoSeries([center], crs=gdf.crs).to_crs(utm_crs)[0]
-        
-        # 在投影坐标系中计算距离
-        gdf_proj['distance'] = gdf_proj.geometry.distance(center_proj)
-        
-        # 获取最近的建筑物
-        nearest_building = gdf_proj.sort_values('distance').iloc[0]
-        
-        # 返回单个建筑物的GeoDataFrame，转回原始坐标系
-        return gpd.GeoDataFrame([nearest_building], geometry='geometry', crs=utm_crs).to_crs(gdf.crs)
+        building_data, _, _ = find_nearest_building(gdf, lon, lat)
+        return building_data
     
     return gdf
 
+def configure_geocoder(index_path=None):
+    """
+    加载离线地理编码索引(由 python Scripts/geocoder.py build 生成)，为None时不使用离线地理编码
+    """
+    global offline_geocoder
+    offline_geocoder = OfflineGeocoder(index_path) if index_path else None
+    return offline_geocoder
+
+def geocode_address(address, api_key):
+    """
+    获取地址的经纬度，优先查找离线地理编码索引，未命中时调用Google Maps API
+    :return: (纬度, 经度)元组
+    """
+    if offline_geocoder is not None:
+        location = offline_geocoder.lookup(address)
+        if location is not None:
+            return location
+    return get_coordinates_from_google(address, api_key)
+
 def get_coordinates_from_google(address, api_key):
     """
     使用Google Maps API获取地址的经纬度
@@ -66,11 +112,12 @@ def get_coordinates_from_google(address, api_key):
     :return: (纬度, 经度)元组
     """
     # 创建Google Maps客户端
-    gmaps = googlemaps.Client(key=api_key)
+    gmaps = googlemaps.Client(key=api_key, base_url=GOOGLE_BASE_URL)
     
     # 地理编码
     try:
-        geocode_result = gmaps.geocode(address)
+        with google_limiter:
+            geocode_result = gmaps.geocode(address)
         if geocode_result:
             location = geocode_result[0]['geometry']['location']
             return location['lat'], location['lng']
@@ -81,57 +128,19 @@ def get_coordinates_from_google(address, api_key):
 
 def create_building_obj(building_data, output_file):
     """
-    从建筑物轮廓创建OBJ文件
-    :param building_data: 包含建筑物数据的GeoDataFrame
-    :param output_file: 输出的OBJ文件路径
+    从建筑物轮廓创建OBJ文件（支持Polygon/MultiPolygon及内环，顶底面三角化）
+    :param building_data: 包含建筑物数据的GeoDataFrame行
+    :param output_file: 输出的网格文件路径（.obj/.ply/.glb）
     """
     # 获取建筑物高度（如果没有高度信息，使用默认值10米）
-    height = float(building_data.get('height', building_data.get('building:height', 10.0)))
+    height = building_height(building_data)
     
-    # 获取建筑物轮廓坐标
-    if isinstance(building_data.geometry, Polygon):
-        coords = list(building_data.geometry.exterior.coords)
-    else:
+    # 获取建筑物轮廓
+    if not isinstance(building_data.geometry, (Polygon, MultiPolygon)):
         raise ValueError("建筑物轮廓必须是多边形")
     
-    # 创建顶点列表
-    vertices = []
-    # 底面顶点
-    for x, y in coords[:-1]:  # 去掉最后一个重复点
-        vertices.append((x, y, 0))
-    # 顶面顶点
-    for x, y in coords[:-1]:
-        vertices.append((x, y, height))
-    
-    # 创建面列表
-    faces = []
-    n = len(coords) - 1  # 多边形顶点数
-    
-    # 底面
-    bottom = list(range(1, n+1))
-    faces.append(bottom)
-    
-    # 顶面
-    top = list(range(n+1, 2*n+1))
-    faces.append(top[::-1])  # 反向以确保法向朝上
-    
-    # 侧面
-    for i in range(n):
-        v1 = i + 1
-        v2 = (i + 1) % n + 1
-        v3 = v2 + n
-        v4 = v1 + n
-        faces.append([v1, v2, v3, v4])
-    
-    # 写入OBJ文件
-    with open(output_file, 'w') as f:
-        # 写入顶点
-        for x, y, z in vertices:
-            f.write(f'v {x} {y} {z}\n')
-        
-        # 写入面
-        for face in faces:
-            f.write('f ' + ' '.join(str(i) for i in face) + '\n')
+    vertices, faces, _ = extrude_geometries([building_data.geometry], [height])
+    write_mesh(output_file, vertices, faces)
 
 def setup_logger(timestamp):
     """
@@ -172,50 +181,199 @@ def setup_logger(timestamp):
     
     return logger, log_file
 
-def process_single_address(address, api_key, logger):
+def get_output_name(address):
+    """ 生成文件名（使用地址作为文件名） """
+    file_name = ''.join(c if c.isalnum() else '_' for c in address)
+    return file_name[:50]  # 限制文件名长度
+
+PROVIDERS = ('overpass', 'geojson', 'pbf')
+
+def get_source(provider=None, footprint_file=None, pbf_file=None, pbf_store=None):
+    """
+    创建建筑轮廓数据源
+    :param provider: overpass(在线查询)、geojson(本地GeoJSON文件)或pbf(本地.osm.pbf提取文件)，
+                     为None时有footprint_file则使用geojson，否则使用overpass
+    :param pbf_store: pbf解析后的GeoPackage路径，为None时保存在pbf同目录
+    """
+    provider = provider or ('geojson' if footprint_file else 'overpass')
+    if provider == 'overpass':
+        return OverpassSource()
+    if provider == 'geojson':
+        if not footprint_file:
+            raise ValueError("geojson数据源需要指定footprint_file")
+        return GeoJSONSource(footprint_file)
+    if provider == 'pbf':
+        if not pbf_file:
+            raise ValueError("pbf数据源需要指定pbf_file")
+        return PbfSource(pbf_file, pbf_store)
+    raise ValueError(f"不支持的数据源: {provider}，可选 {PROVIDERS}")
+
+class ExportOutputs:
+    """
+    建筑的导出目标
+    :param per_address_geojson: 是否为每个地址单独保存GeoJSON
+    :param per_address_map: 是否为每个地址单独生成HTML地图
+    :param map_collector: 汇总地图收集器，在运行结束时统一生成地图
+    :param result_sink: 批量结果写入器(GeoPackage/GeoParquet)
+    """
+
+    def __init__(self, per_address_geojson=True, per_address_map=True, map_collector=None, result_sink=None):
+        self.per_address_geojson = per_address_geojson
+        self.per_address_map = per_address_map
+        self.map_collector = map_collector
+        self.result_sink = result_sink
+        self.closed = False
+
+    def collect(self, address, building_data, center_point, distance=None):
+        """ 记录到汇总地图和批量结果文件 """
+        if self.map_collector is not None:
+            self.map_collector.add(address, building_data, center_point)
+        if self.result_sink is not None:
+            self.result_sink.add(address, building_data, distance)
+
+    def flush(self):
+        """ 写入缓存的批量结果(保存检查点之前调用) """
+        if self.result_sink is not None:
+            self.result_sink.flush()
+
+    def close(self):
+        """ 写入剩余的批量结果并关闭文件，可重复调用 """
+        if self.result_sink is not None and not self.closed:
+            self.result_sink.close()
+        self.closed = True
+
+def export_building(address, building_data, building_proj, center_point, distance=None, outputs=None):
+    """
+    保存单个建筑的GeoJSON、OBJ和HTML文件
+    :param building_data: 经纬度坐标系下的建筑GeoDataFrame
+    :param building_proj: 投影坐标系(米)下的建筑数据，用于生成OBJ
+    :param center_point: 地址坐标 (lat, lon)
+    :param distance: 地址与建筑的距离(米)
+    :param outputs: 导出目标(ExportOutputs)，为None时保持每个地址单独保存GeoJSON和HTML
+    """
+    outputs = outputs or ExportOutputs()
+    file_name = get_output_name(address)
+    
+    # 保存数据到对应目录
+    if outputs.per_address_geojson:
+        save_osm_data(building_data, os.path.join('osm/result/geojson', f'{file_name}.geojson'))
+    create_building_obj(building_proj, os.path.join('osm/result/obj', f'{file_name}.obj'))
+    outputs.collect(address, building_data, center_point, distance)
+    if outputs.per_address_map:
+        visualize_osm_data(building_data, center_point=center_point, 
+                         save_path=os.path.join('osm/result/html', f'{file_name}.html'))
+
+def process_addresses_batch(addresses, api_key, logger, source, tile_zoom=DEFAULT_TILE_ZOOM, max_distance=50,
+                            export_mode='per_address', tile_format='glb', workers=1, outputs=None, locations=None):
+    """
+    批量处理地址：先对所有地址进行地理编码，再按瓦片一次性下载建筑轮廓，
+    最后通过空间索引为每个地址查找最近的建筑
+    :param source: 建筑轮廓数据源(OverpassSource或GeoJSONSource)
+    :param tile_zoom: 瓦片缩放级别
+    :param max_distance: 地址与建筑的最大距离（米）
+    :param export_mode: per_address为每个地址单独导出文件，tiles为每个瓦片合并导出一个网格并生成索引
+    :param tile_format: tiles模式的网格格式(glb/obj)
+    :param workers: 地理编码的并发线程数
+    :param outputs: 导出目标(ExportOutputs)
+    :param locations: 与addresses一一对应的预先计算的 (纬度, 经度)，为None的地址进行地理编码
+    :return: 与addresses一一对应的 (是否成功, 信息) 列表
+    """
+    results = [None] * len(addresses)
+    outputs = outputs or ExportOutputs()
+    locations = locations or [None] * len(addresses)
+    
+    # 地理编码，已有经纬度的地址直接使用
+    def geocode(item):
+        address, location = item
+        if location is not None:
+            return location
+        try:
+            return geocode_address(address, api_key)
+        except Exception as e:
+            return e
+    
+    geocoded = []
+    for index, (address, _), location in run_ordered(geocode, zip(addresses, locations), workers):
+        if isinstance(location, Exception):
+            logger.error(f"处理地址 {address} 时发生错误: {str(location)}")
+            results[index] = (False, str(location))
+        else:
+            geocoded.append((index, location[0], location[1]))
+    logger.info(f"地理编码完成: {len(geocoded)}/{len(addresses)} 个地址")
+    
+    # 按瓦片下载建筑轮廓并查找最近的建筑
+    points = [(lon, lat) for _, lat, lon in geocoded]
+    footprints = download_footprints(points, source, tile_zoom)
+    logger.info(f"共下载 {len(footprints)} 个建筑轮廓")
+    matches = assign_nearest(footprints, [lon for lon, _ in points], [lat for _, lat in points], max_distance)
+    
+    tile_matches = []
+    for (index, lat, lon), label, distance in zip(geocoded, matches['footprint'], matches['distance']):
+        address = addresses[index]
+        if label is None:
+            logger.warning(f"地址 {address} 未找到目标建筑物")
+            results[index] = (False, "未找到目标建筑物")
+            continue
+        if export_mode == 'tiles':
+            tile_matches.append((index, label, distance))
+            outputs.collect(address, footprints.loc[[label]], (lat, lon), distance)
+            continue
+        try:
+            building_data = footprints.loc[[label]]
+            building_proj = project_building(building_data.iloc[0], lon, lat)
+            export_building(address, building_data, building_proj, (lat, lon), distance, outputs)
+            logger.info(f"地址 {address} 处理成功，距离 {distance:.1f} 米")
+            results[index] = (True, "处理成功")
+        except Exception as e:
+            logger.error(f"处理地址 {address} 时发生错误: {str(e)}", exc_info=True)
+            results[index] = (False, str(e))
+    
+    if tile_matches:
+        try:
+            export_tiles(footprints, [(addresses[index], label, distance) for index, label, distance in tile_matches],
+                         'osm/result/tiles', tile_zoom, tile_format)
+            for index, _, _ in tile_matches:
+                results[index] = (True, "处理成功")
+        except Exception as e:
+            logger.error(f"瓦片导出失败: {str(e)}", exc_info=True)
+            for index, _, _ in tile_matches:
+                results[index] = (False, str(e))
+    return results
+
+def process_single_address(address, api_key, logger, outputs=None, source=None, location=None):
     """
     处理单个地址
+    :param outputs: 导出目标(ExportOutputs)
+    :param source: 建筑轮廓数据源，为None时通过osmnx查询地址周边50米
+    :param location: 预先计算的 (纬度, 经度)，为None时进行地理编码
     """
     try:
         logger.info(f"开始处理地址: {address}")
         
-        # 使用Google Maps API获取精确坐标
-        lat, lon = get_coordinates_from_google(address, api_key)
+        # 获取坐标(输入中已有经纬度时跳过地理编码，离线地理编码未命中时使用Google Maps API)
+        if location is not None:
+            lat, lon = location
+        else:
+            lat, lon = geocode_address(address, api_key)
         center_point = (lat, lon)
         logger.info(f"获取到坐标: ({lon}, {lat})")
         
         # 下载建筑物数据
-        tags = {'building': True}
-        gdf = ox.features_from_point((lat, lon), tags=tags, dist=50)
+        if source is None:
+            tags = {'building': True}
+            with overpass_limiter:
+                gdf = ox.features_from_point((lat, lon), tags=tags, dist=50)
+        elif source.name == 'overpass':
+            with overpass_limiter:
+                gdf = source.fetch(point_bounds(lon, lat, 50))
+        else:
+            gdf = source.fetch(point_bounds(lon, lat, 50))
         
         if not gdf.empty:
-            # 创建中心点
-            center = Point(lon, lat)
-            
-            # 将数据转换为UTM投影坐标系
-            utm_zone = int(math.floor((lon + 180) / 6) + 1)
-            utm_crs = f'EPSG:326{utm_zone:02d}' if lat >= 0 else f'EPSG:327{utm_zone:02d}'
-            
-            # 转换坐标系
-            gdf_proj = gdf.to_crs(utm_crs)
-            center_proj = gpd.GeoSeries([center], crs=gdf.crs).to_crs(utm_crs)[0]
-            
-            # 在投影坐标系中计算距离
-            gdf_proj['distance'] = gdf_proj.geometry.distance(center_proj)
-            
             # 获取最近的建筑物
-            nearest_building = gdf_proj.sort_values('distance').iloc[0]
-            building_data = gpd.GeoDataFrame([nearest_building], geometry='geometry', crs=utm_crs).to_crs(gdf.crs)
-            
-            # 生成文件名（使用地址作为文件名）
-            file_name = ''.join(c if c.isalnum() else '_' for c in address)
-            file_name = file_name[:50]  # 限制文件名长度
+            building_data, nearest_building, distance = find_nearest_building(gdf, lon, lat)
             
-            # 保存数据到对应目录
-            save_osm_data(building_data, os.path.join('osm/result/geojson', f'{file_name}.geojson'))
-            create_building_obj(nearest_building, os.path.join('osm/result/obj', f'{file_name}.obj'))
-            visualize_osm_data(building_data, center_point=center_point, 
-                             save_path=os.path.join('osm/result/html', f'{file_name}.html'))
+            export_building(address, building_data, nearest_building, center_point, distance, outputs)
             
             logger.info(f"地址 {address} 处理成功")
             return True, "处理成功"
@@ -227,9 +385,46 @@ def process_single_address(address, api_key, logger):
         logger.error(f"处理地址 {address} 时发生错误: {str(e)}", exc_info=True)
         return False, str(e)
 
-def main(api_key, input_file, clear_cache=False):
+def main(api_key, input_file, clear_cache=False, batch=False, tile_zoom=DEFAULT_TILE_ZOOM, footprint_file=None,
+         export_mode='per_address', tile_format='glb', workers=1,
+         google_rate=DEFAULT_GOOGLE_RATE, overpass_rate=DEFAULT_OVERPASS_RATE, google_base_url=None, overpass_url=None,
+         map_mode='per_address', result_format='geojson', per_address_geojson=False,
+         provider=None, pbf_file=None, pbf_store=None,
+         cache_dir='osm/cache', cache_ttl_days=DEFAULT_TTL_DAYS, cache_max_mb=DEFAULT_MAX_MB,
+         geocoder_index=None, resume=True, checkpoint_every=DEFAULT_CHECKPOINT_EVERY, batch_chunk=10000):
     """
     主函数 - 批量处理版本
+    :param input_file: 地址输入文件，.jsonl/.csv/.txt逐行流式读取(可带lat/lng列，跳过地理编码)，
+                       .json为地址数组(原有格式)；处理进度保存在 <input_file>.checkpoint
+    :param clear_cache: 是否在开始前清空瓦片缓存(未使用瓦片缓存时在结束后清理osmnx缓存)
+    :param batch: 是否按瓦片批量下载建筑轮廓，而不是每个地址单独查询Overpass
+    :param tile_zoom: 批量模式的瓦片缩放级别
+    :param footprint_file: 批量模式使用的本地GeoJSON建筑轮廓文件，为None时查询Overpass
+    :param export_mode: 批量模式的导出方式，per_address为每个地址单独导出，
+                        tiles为按瓦片合并导出到osm/result/tiles(z/x/y.glb或.obj)并生成index.csv
+    :param tile_format: tiles模式的网格格式(glb/obj)
+    :param workers: 并发线程数，大于1时地理编码、Overpass查询和文件写入在线程池中并发执行，进度按输入顺序记录
+    :param google_rate: Google地理编码限速(次/秒)
+    :param overpass_rate: Overpass查询限速(次/秒)，使用公共服务器时不宜调高
+    :param google_base_url: Google Maps API地址(用于本地测试服务)
+    :param overpass_url: Overpass API地址(用于自建实例或本地测试服务)
+    :param map_mode: 地图输出方式，per_address为每个地址单独生成HTML，run为运行结束时生成一个汇总地图，
+                     tile为按瓦片(tile_zoom)各生成一个汇总地图，none为不生成地图
+    :param result_format: 匹配结果的保存格式，geojson为每个地址单独保存(原有行为)，
+                          gpkg/parquet为按批追加到osm/result/buildings_<时间戳>.gpkg或.parquet(包含地址、距离和标签列)
+    :param per_address_geojson: result_format为gpkg/parquet时是否仍为每个地址单独保存GeoJSON
+    :param provider: 建筑轮廓数据源，overpass/geojson/pbf，为None时按footprint_file选择(有则geojson，否则overpass)；
+                     只有provider和cache_dir都为None的逐地址模式才直接通过osmnx查询(原有行为)
+    :param pbf_file: pbf数据源使用的本地.osm.pbf提取文件，首次使用时解析为带空间索引的GeoPackage
+    :param pbf_store: pbf解析后的GeoPackage路径，为None时保存在pbf同目录
+    :param cache_dir: Overpass查询结果的瓦片缓存目录，默认osm/cache，即Overpass查询默认都经过瓦片缓存；
+                      为None时不使用瓦片缓存
+    :param cache_ttl_days: 缓存瓦片的有效期(天)
+    :param cache_max_mb: 缓存总大小上限(MB)，超出时按最久未使用淘汰
+    :param geocoder_index: 离线地理编码索引路径(由 python Scripts/geocoder.py build 生成)，未命中的地址回退到Google
+    :param resume: 是否从上次中断时保存的检查点继续，全部处理完成后检查点会被删除
+    :param checkpoint_every: 每处理多少个地址保存一次检查点
+    :param batch_chunk: 批量模式每次读取并处理的地址数，每批完成后保存检查点(tiles导出方式一次处理全部地址)
     """
     try:
         # 设置时间戳
@@ -245,51 +440,117 @@ def main(api_key, input_file, clear_cache=False):
         logger, log_file = setup_logger(timestamp)
         
         logger.info("开始执行程序")
+        configure_network(google_rate, overpass_rate, google_base_url, overpass_url)
+        if configure_geocoder(geocoder_index) is not None:
+            logger.info(f"已加载离线地理编码索引: {geocoder_index}，{len(offline_geocoder)} 个地址")
+        if map_mode not in MAP_MODES:
+            raise ValueError(f"不支持的地图输出方式: {map_mode}，可选 {MAP_MODES}")
+        if result_format not in ('geojson', 'gpkg', 'parquet'):
+            raise ValueError(f"不支持的结果格式: {result_format}")
+        outputs = ExportOutputs(
+            per_address_geojson=result_format == 'geojson' or per_address_geojson,
+            per_address_map=map_mode == 'per_address',
+            map_collector=MapCollector() if map_mode in ('run', 'tile') else None,
+            result_sink=ResultSink(f'osm/result/buildings_{timestamp}.{result_format}')
+            if result_format != 'geojson' else None)
         
         # 确保osm目录存在
         os.makedirs('osm', exist_ok=True)
         
-        # 读取输入的JSON文件
-        with open(input_file, 'r', encoding='utf-8') as f:
-            addresses = json.load(f)
-        
-        if not isinstance(addresses, list):
-            raise ValueError("JSON文件必须包含地址列表")
+        # 流式读取输入文件，从检查点继续
+        reader = AddressReader(input_file, resume=resume, checkpoint_every=checkpoint_every, on_save=outputs.flush)
         
         # 初始化统计数据
-        total_count = len(addresses)
+        total_count = reader.count()
         success_count = 0
         failed_count = 0
         
-        logger.info(f"开始批量处理，共有 {total_count} 个地址待处理")
+        logger.info(f"开始批量处理，共有 {total_count} 个地址待处理，并发线程数 {workers}")
+        if reader.start_index:
+            logger.info(f"从检查点继续，跳过已处理的 {reader.start_index} 个地址")
+        
+        # 建筑轮廓数据源，Overpass的查询按瓦片缓存
+        source = get_source(provider, footprint_file, pbf_file, pbf_store) if batch or provider or cache_dir else None
+        tile_cache = None
+        if source is not None and source.name == 'overpass' and cache_dir:
+            tile_cache = TileCache(cache_dir, ttl_days=cache_ttl_days, max_mb=cache_max_mb)
+            if clear_cache:
+                tile_cache.clear()
+            source = CachedSource(source, tile_cache, overpass_limiter)
+            # 由瓦片缓存代替osmnx按查询URL的缓存
+            ox.settings.use_cache = False
         
-        # 处理每个地址
-        for index, address in enumerate(addresses, 1):
-            logger.info(f"正在处理第 {index}/{total_count} 个地址")
+        if batch:
+            logger.info(f"批量模式，建筑轮廓数据源: {source.name}")
+            records = iter(reader)
+            chunk_size = None if export_mode == 'tiles' else batch_chunk
+            while True:
+                chunk = list(islice(records, chunk_size))
+                if not chunk:
+                    break
+                for success, message in process_addresses_batch([r.address for r in chunk], api_key, logger, source,
+                                                                tile_zoom, export_mode=export_mode,
+                                                                tile_format=tile_format, workers=workers,
+                                                                outputs=outputs,
+                                                                locations=[r.location for r in chunk]):
+                    if success:
+                        success_count += 1
+                    else:
+                        failed_count += 1
+                # 每批完成后保存检查点
+                reader.commit(chunk[-1])
+                reader.save()
+                logger.info(f"已完成第 {chunk[-1].index + 1}/{total_count} 个地址")
+        else:
+            # 处理每个地址，并发执行时按输入顺序记录进度
+            if source is not None:
+                logger.info(f"建筑轮廓数据源: {source.name}")
             
-            # 处理单个地址（移除了base_dir参数）
-            success, message = process_single_address(address, api_key, logger)
+            def process(record):
+                return process_single_address(record.address, api_key, logger, outputs, source, record.location)
             
-            # 更新统计数据
-            if success:
-                success_count += 1
-            else:
-                failed_count += 1
+            for _, record, (success, message) in run_ordered(process, reader, workers):
+                reader.commit(record)
+                logger.info(f"已完成第 {record.index + 1}/{total_count} 个地址: {'成功' if success else '失败'}")
+                
+                # 更新统计数据
+                if success:
+                    success_count += 1
+                else:
+                    failed_count += 1
+        
+        # 写入剩余的批量结果并生成汇总地图
+        outputs.close()
+        reader.finish()
+        if outputs.map_collector is not None:
+            outputs.map_collector.render('osm/result/html', f'map_{timestamp}', map_mode, tile_zoom)
         
         # 记录最终统计结果
         logger.info("处理完成！统计结果：")
+        processed_count = success_count + failed_count
         logger.info(f"总地址数: {total_count}")
+        logger.info(f"本次处理: {processed_count}")
         logger.info(f"成功处理: {success_count}")
         logger.info(f"处理失败: {failed_count}")
-        logger.info(f"成功率: {(success_count/total_count*100):.2f}%")
+        if reader.skipped:
+            logger.info(f"无法解析的输入: {reader.skipped}")
+        logger.info(f"成功率: {(success_count/processed_count*100 if processed_count else 0):.2f}%")
+        if offline_geocoder is not None:
+            logger.info(offline_geocoder.format_summary())
+        if tile_cache is not None:
+            stats = tile_cache.summary()
+            logger.info(f"瓦片缓存: 命中 {stats['hits']}，未命中 {stats['misses']} (其中过期 {stats['expired']})，"
+                        f"命中率 {stats['hit_rate'] * 100:.2f}%，淘汰 {stats['evicted']} 个，"
+                        f"当前共 {stats['tiles']} 个瓦片 {stats['size_mb']:.1f}MB")
+            tile_cache.close()
         
         # 计算并记录运行时间
         end_time = time.time()
         total_time = end_time - start_time
         logger.info(f"程序运行时间：{total_time:.1f}秒")
         
-        # 根据设置决定是否清理缓存
-        if clear_cache:
+        # 根据设置决定是否清理osmnx缓存
+        if clear_cache and tile_cache is None:
             ox.settings.cache_folder = ''
             if os.path.exists(os.path.expanduser('~/.cache/osmnx')):
                 import shutil
@@ -302,6 +563,14 @@ def main(api_key, input_file, clear_cache=False):
         if 'logger' in locals():
             logger.error(f"发生错误：{str(e)}", exc_info=True)
         print(f"发生错误：{str(e)}")
+    finally:
+        if 'outputs' in locals():
+            # 先写完批量结果文件(GeoParquet的文件尾在关闭时写入)，再保存检查点，
+            # 被中断(KeyboardInterrupt)时检查点中记录的地址在结果文件中也是完整可读的
+            outputs.close()
+        if 'reader' in locals():
+            # 出错或被中断时保存已处理的进度，下次运行从这里继续
+            reader.close()
 
 def save_osm_data(data, filename):
     """
@@ -0,0 +1,242 @@
+'''
+Author: Leili
+Date: 2026-10-19 21:10:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 12:10:00
+FilePath: /GoogleModelProcess/Scripts/osm_cache.py
+Description: 按瓦片缓存建筑轮廓：查询范围对齐到固定的slippy map瓦片，每个瓦片带下载时间和有效期，总大小超限时按最久未使用淘汰
+'''
+import os
+import time
+import shutil
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future
+
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from Scripts.osm_tiles import lonlat_to_tile, tile_bounds
+
+# 与osm.py共用日志记录器
+logger = logging.getLogger('BuildingProcessor')
+
+# 缓存瓦片的缩放级别，z17的瓦片边长约300m(赤道处)，单个地址的查询通常只涉及1~4个瓦片
+DEFAULT_CACHE_ZOOM = 17
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_MB = 2048
+
+INDEX_FILE = 'tiles.sqlite'
+
+def tiles_in_bounds(bounds, zoom):
+    """ 与范围相交的所有瓦片 [(x, y)] """
+    west, south, east, north = bounds
+    x0, y0 = lonlat_to_tile(west, north, zoom)
+    x1, y1 = lonlat_to_tile(east, south, zoom)
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+class TileCache:
+    """
+    建筑轮廓的瓦片缓存
+
+    每个瓦片保存为一个pickle文件(保留osmnx的(element, id)索引和全部标签列)，
+    下载时间、最后使用时间和文件大小记录在SQLite索引中
+    """
+
+    def __init__(self, cache_dir, zoom=DEFAULT_CACHE_ZOOM, ttl_days=DEFAULT_TTL_DAYS, max_mb=DEFAULT_MAX_MB):
+        self.cache_dir = cache_dir
+        self.zoom = zoom
+        self.ttl = ttl_days * 86400 if ttl_days else None
+        self.max_bytes = max_mb * 1024 * 1024 if max_mb else None
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, INDEX_FILE), check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS tiles (zoom INTEGER, x INTEGER, y INTEGER, fetched_at REAL, "
+                "last_used REAL, size INTEGER, PRIMARY KEY (zoom, x, y))")
+
+    def tile_path(self, x, y):
+        return os.path.join(self.cache_dir, str(self.zoom), str(x), f"{y}.pkl")
+
+    def get(self, x, y, count=True):
+        """ 读取瓦片，不存在或已过期时返回None，count为False时不计入命中统计 """
+        with self.lock:
+            row = self.conn.execute("SELECT fetched_at FROM tiles WHERE zoom = ? AND x = ? AND y = ?",
+                                    (self.zoom, x, y)).fetchone()
+            path = self.tile_path(x, y)
+            if row is None or not os.path.exists(path):
+                self.stats['misses'] += count
+                return None
+            if self.ttl is not None and time.time() - row[0] > self.ttl:
+                self.stats['expired'] += count
+                self.stats['misses'] += count
+                return None
+            self.stats['hits'] += count
+            with self.conn:
+                self.conn.execute("UPDATE tiles SET last_used = ? WHERE zoom = ? AND x = ? AND y = ?",
+                                  (time.time(), self.zoom, x, y))
+        try:
+            return pd.read_pickle(path)
+        except FileNotFoundError:
+            # 读取在锁外进行，期间瓦片可能已被其他线程的evict删除，按未命中处理
+            with self.lock:
+                self.stats['hits'] -= count
+                self.stats['misses'] += count
+            return None
+
+    def put(self, x, y, gdf):
+        """ 保存瓦片(空瓦片也保存，避免重复下载没有建筑的区域) """
+        path = self.tile_path(x, y)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        gdf.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?, ?, ?)",
+                              (self.zoom, x, y, now, now, os.path.getsize(path)))
+        self.evict()
+
+    def evict(self):
+        """ 总大小超过上限时，按最后使用时间从旧到新删除瓦片，直到低于上限的90% """
+        if self.max_bytes is None:
+            return
+        with self.lock, self.conn:
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM tiles").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            target = self.max_bytes * 0.9
+            for zoom, x, y, size in self.conn.execute(
+                    "SELECT zoom, x, y, size FROM tiles ORDER BY last_used").fetchall():
+                if total <= target:
+                    break
+                path = os.path.join(self.cache_dir, str(zoom), str(x), f"{y}.pkl")
+                if os.path.exists(path):
+                    os.remove(path)
+                self.conn.execute("DELETE FROM tiles WHERE zoom = ? AND x = ? AND y = ?", (zoom, x, y))
+                total -= size
+                self.stats['evicted'] += 1
+
+    def clear(self):
+        """ 删除所有缓存的瓦片 """
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM tiles")
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+        logger.info(f"瓦片缓存已清理: {self.cache_dir}")
+
+    def summary(self):
+        """ 本次运行的命中统计 """
+        with self.lock:
+            stats = dict(self.stats)
+            count, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tiles").fetchone()
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['tiles'] = count
+        stats['size_mb'] = size / 1024 / 1024
+        return stats
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class CachedSource:
+    """
+    带瓦片缓存的数据源包装
+
+    查询范围对齐到缓存瓦片，命中的瓦片直接读取；未命中的瓦片合并为一个外包矩形只请求一次上游数据源，
+    结果按瓦片拆分保存(跨越瓦片边界的建筑在每个相交的瓦片中都保存一份，读取时去重)。
+    正在下载的瓦片记录在 {瓦片: Future} 中，其他线程需要同一瓦片时等待该下载完成，
+    不同瓦片的下载互不阻塞
+    """
+
+    def __init__(self, source, cache, limiter=None):
+        self.source = source
+        self.cache = cache
+        self.limiter = limiter
+        self.name = f"{source.name}(cached)"
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def fetch(self, bounds):
+        tiles = tiles_in_bounds(bounds, self.cache.zoom)
+        frames = []
+        missing = []
+        for x, y in tiles:
+            gdf = self.cache.get(x, y)
+            if gdf is None:
+                missing.append((x, y))
+            elif not gdf.empty:
+                frames.append(gdf)
+        if missing:
+            frames.extend(self._fetch_missing(missing))
+
+        if not frames:
+            return gpd.GeoDataFrame(geometry=[], crs="EPSG:4326")
+        result = pd.concat(frames)
+        result = result[~result.index.duplicated(keep='first')]
+        west, south, east, north = bounds
+        return gpd.GeoDataFrame(result, geometry='geometry', crs=frames[0].crs).cx[west:east, south:north]
+
+    def _fetch_missing(self, missing):
+        """
+        下载未命中的瓦片并保存，返回非空的瓦片数据列表
+
+        其他线程正在下载的瓦片等待其结果；由本线程下载的瓦片先重新检查缓存
+        (其他线程可能在第一次检查之后刚刚完成下载)，剩余的瓦片合并为一次上游请求
+        """
+        owned = {}
+        waiting = []
+        with self._inflight_lock:
+            for tile in missing:
+                future = self._inflight.get(tile)
+                if future is None:
+                    owned[tile] = self._inflight[tile] = Future()
+                else:
+                    waiting.append(future)
+
+        frames = []
+        try:
+            tile_boxes = {}
+            for (x, y), future in owned.items():
+                gdf = self.cache.get(x, y, count=False)
+                if gdf is None:
+                    tile_boxes[(x, y)] = tile_bounds(x, y, self.cache.zoom)
+                else:
+                    future.set_result(gdf)
+            if tile_boxes:
+                union = (min(b[0] for b in tile_boxes.values()), min(b[1] for b in tile_boxes.values()),
+                         max(b[2] for b in tile_boxes.values()), max(b[3] for b in tile_boxes.values()))
+                if self.limiter is not None:
+                    with self.limiter:
+                        fetched = self.source.fetch(union)
+                else:
+                    fetched = self.source.fetch(union)
+                for (x, y), (west, south, east, north) in tile_boxes.items():
+                    part = fetched.iloc[fetched.sindex.query(shapely.box(west, south, east, north))] \
+                        if not fetched.empty else fetched
+                    self.cache.put(x, y, part)
+                    owned[(x, y)].set_result(part)
+        except BaseException as e:
+            # 下载失败时等待这些瓦片的线程收到同样的异常
+            for future in owned.values():
+                if not future.done():
+                    future.set_exception(e)
+            raise
+        finally:
+            # 瓦片已写入缓存(或下载失败)后才移除，之后的查询直接命中缓存或重新下载
+            with self._inflight_lock:
+                for tile in owned:
+                    del self._inflight[tile]
+
+        for future in list(owned.values()) + waiting:
+            gdf = future.result()
+            if not gdf.empty:
+                frames.append(gdf)
+        return frames
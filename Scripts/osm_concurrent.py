@@ -0,0 +1,93 @@
+'''
+Author: Leili
+Date: 2026-10-19 19:10:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 22:10:00
+FilePath: /GoogleModelProcess/Scripts/osm_concurrent.py
+Description: osm.py的并发处理工具：线程安全的限速器和按输入顺序返回结果的线程池
+'''
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Google地理编码的默认限速(次/秒)，低于googlemaps客户端默认的60次/秒
+DEFAULT_GOOGLE_RATE = 40.0
+
+# Overpass公共服务器的默认限速(次/秒)，公共实例每个IP只有少量并发槽位
+DEFAULT_OVERPASS_RATE = 1.0
+
+# run_ordered中每个线程最多排队的任务数
+PENDING_PER_WORKER = 4
+
+class RateLimiter:
+    """
+    线程安全的限速器，保证相邻两次请求的开始时间间隔不小于1/rate秒
+
+    rate为None或不大于0时不限速
+    """
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        """ 阻塞到允许发起下一次请求 """
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def __enter__(self):
+        self.wait()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+def run_ordered(func, items, workers=1):
+    """
+    使用线程池并发执行func(item)，按输入顺序逐个返回结果
+
+    workers不大于1时在当前线程中依次执行；
+    同时提交的任务数不超过workers的若干倍，items可以是按需读取的迭代器，不会被一次性读入内存；
+    func抛出的异常会在返回对应结果时重新抛出，调用方需要自行捕获
+
+    参数:
+        func: 处理单个输入的函数
+        items: iterable - 输入列表或迭代器
+        workers: int - 线程数
+
+    返回:
+        generator: 依次返回 (序号, 输入, 结果)
+    """
+    if workers <= 1:
+        for index, item in enumerate(items):
+            yield index, item, func(item)
+        return
+
+    pending = deque()
+    items = enumerate(items)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='osm') as executor:
+        try:
+            while True:
+                # 保持队列中有足够的任务，使线程池不会空闲
+                while len(pending) < workers * PENDING_PER_WORKER:
+                    next_item = next(items, None)
+                    if next_item is None:
+                        break
+                    index, item = next_item
+                    pending.append((index, item, executor.submit(func, item)))
+                if not pending:
+                    break
+                index, item, future = pending.popleft()
+                yield index, item, future.result()
+        finally:
+            # 提前退出时取消尚未开始的任务
+            for _, _, future in pending:
+                future.cancel()
@@ -0,0 +1,121 @@
+'''
+Author: Leili
+Date: 2026-10-19 18:40:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 18:40:00
+FilePath: /GoogleModelProcess/Scripts/osm_export.py
+Description: 按固定瓦片网格将建筑合并导出，每个瓦片一个网格文件(GLB带要素ID / OBJ按组)，并生成地址索引
+'''
+import os
+import csv
+import logging
+
+import numpy as np
+import shapely
+
+from Scripts.osm_tiles import DEFAULT_TILE_ZOOM, lonlat_to_tile, tile_bounds
+from Scripts.osm_nearest import utm_epsg, transform_geometries
+from Scripts.extrude import building_height, extrude_geometries, write_obj, write_glb
+
+# 与osm.py共用日志记录器
+logger = logging.getLogger('BuildingProcessor')
+
+TILE_FORMATS = ('glb', 'obj')
+INDEX_FILE = 'index.csv'
+INDEX_COLUMNS = ['address', 'tile', 'file', 'feature_id', 'osm_id', 'distance']
+
+def format_osm_id(label):
+    """ 建筑索引转为字符串，osmnx的索引为(element_type, osmid)元组 """
+    if isinstance(label, tuple):
+        return '/'.join(str(part) for part in label)
+    return str(label)
+
+def tile_path(x, y, zoom, fmt):
+    """ 瓦片文件的相对路径 z/x/y.fmt """
+    return os.path.join(str(zoom), str(x), f"{y}.{fmt}")
+
+def assign_tiles(geometries, zoom=DEFAULT_TILE_ZOOM):
+    """
+    按建筑轮廓的内部点为每个建筑分配唯一的瓦片，跨越瓦片边界的建筑只导出一次
+
+    返回:
+        list: 与geometries一一对应的瓦片坐标 [(x, y)]
+    """
+    points = shapely.point_on_surface(np.asarray(geometries))
+    return [lonlat_to_tile(lon, lat, zoom) for lon, lat in shapely.get_coordinates(points)]
+
+def write_tile(output_file, buildings, tile, zoom, fmt):
+    """
+    将一个瓦片内的建筑拉伸并合并写入单个网格文件
+
+    参数:
+        buildings: GeoDataFrame - WGS84坐标系下的建筑，行顺序即要素ID
+        tile: tuple - 瓦片坐标 (x, y)，按瓦片中心所在的UTM分带投影
+        fmt: str - glb或obj
+
+    返回:
+        int: 三角面数量
+    """
+    west, south, east, north = tile_bounds(tile[0], tile[1], zoom)
+    epsg = int(utm_epsg((west + east) / 2, (south + north) / 2))
+    geometries = transform_geometries(buildings.geometry.values, epsg)
+    heights = [building_height(row) for _, row in buildings.iterrows()]
+    vertices, faces, face_features = extrude_geometries(geometries, heights)
+
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    if fmt == 'glb':
+        # 每个顶点只属于一个建筑，由三角面的要素ID反推顶点的要素ID
+        feature_ids = np.zeros(len(vertices), dtype=np.float32)
+        feature_ids[faces.ravel()] = np.repeat(face_features, 3)
+        write_glb(output_file, vertices, faces, feature_ids=feature_ids)
+    else:
+        names = {i: f"feature_{i}_{format_osm_id(label)}".replace(' ', '_') for i, label in enumerate(buildings.index)}
+        write_obj(output_file, vertices, faces, face_groups=face_features, group_names=names)
+    return len(faces)
+
+def export_tiles(footprints, matches, output_dir, zoom=DEFAULT_TILE_ZOOM, fmt='glb'):
+    """
+    按瓦片导出所有匹配到的建筑，多个地址对应同一建筑时只导出一次
+
+    参数:
+        footprints: GeoDataFrame - WGS84坐标系下的建筑轮廓
+        matches: list - [(地址, 建筑索引, 距离)]
+        output_dir: str - 输出目录，瓦片文件按 z/x/y.fmt 存放，索引文件为 index.csv
+        zoom: int - 瓦片缩放级别
+        fmt: str - glb(EXT_mesh_features要素ID) 或 obj(每个建筑一个组)
+
+    返回:
+        str: 索引文件路径
+    """
+    if fmt not in TILE_FORMATS:
+        raise ValueError(f"不支持的瓦片格式: {fmt}，可选 {TILE_FORMATS}")
+
+    labels = list(dict.fromkeys(label for _, label, _ in matches))
+    buildings = footprints.loc[labels]
+    if buildings.crs is not None and buildings.crs.to_epsg() != 4326:
+        buildings = buildings.to_crs(4326)
+    tiles = assign_tiles(buildings.geometry.values, zoom) if labels else []
+
+    # 建筑索引 -> (瓦片, 瓦片内要素ID)
+    features = {}
+    members = {}
+    for label, tile in zip(labels, tiles):
+        features[label] = (tile, len(members.setdefault(tile, [])))
+        members[tile].append(label)
+
+    os.makedirs(output_dir, exist_ok=True)
+    for i, (tile, tile_labels) in enumerate(sorted(members.items()), 1):
+        output_file = os.path.join(output_dir, tile_path(tile[0], tile[1], zoom, fmt))
+        face_count = write_tile(output_file, buildings.loc[tile_labels], tile, zoom, fmt)
+        logger.info(f"瓦片 {i}/{len(members)} ({zoom}/{tile[0]}/{tile[1]}): {len(tile_labels)} 个建筑，{face_count} 个三角面")
+
+    index_file = os.path.join(output_dir, INDEX_FILE)
+    with open(index_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(INDEX_COLUMNS)
+        for address, label, distance in matches:
+            (x, y), feature_id = features[label]
+            writer.writerow([address, f"{zoom}/{x}/{y}", tile_path(x, y, zoom, fmt).replace(os.sep, '/'),
+                             feature_id, format_osm_id(label), f"{distance:.2f}"])
+    logger.info(f"共导出 {len(labels)} 个建筑到 {len(members)} 个瓦片，索引文件: {index_file}")
+    return index_file
@@ -0,0 +1,111 @@
+'''
+Author: Leili
+Date: 2026-10-19 19:40:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 19:40:00
+FilePath: /GoogleModelProcess/Scripts/osm_map.py
+Description: 汇总地图输出：收集所有匹配结果，在运行结束时为整个批次或每个瓦片生成一个带聚合标记的folium地图
+'''
+import os
+import logging
+import threading
+
+import geopandas as gpd
+
+from Scripts.osm_tiles import DEFAULT_TILE_ZOOM, lonlat_to_tile
+from Scripts.osm_export import format_osm_id
+
+# 与osm.py共用日志记录器
+logger = logging.getLogger('BuildingProcessor')
+
+# 地图输出方式：per_address为每个地址单独生成HTML(原有行为)，run为整个批次一个地图，tile为每个瓦片一个地图，none为不生成
+MAP_MODES = ('per_address', 'run', 'tile', 'none')
+
+class MapCollector:
+    """ 收集匹配到的建筑和地址坐标(线程安全)，在运行结束时统一生成地图 """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records = []
+
+    def add(self, address, building_data, center_point):
+        """
+        记录一个匹配结果
+        :param building_data: 经纬度坐标系下的建筑GeoDataFrame(单行)
+        :param center_point: 地址坐标 (lat, lon)
+        """
+        building = building_data.iloc[0]
+        record = {
+            'address': address,
+            'osm_id': format_osm_id(building_data.index[0]),
+            'lat': center_point[0],
+            'lon': center_point[1],
+            'geometry': building.geometry,
+        }
+        with self._lock:
+            self.records.append(record)
+
+    def __len__(self):
+        return len(self.records)
+
+    def render(self, output_dir, name, mode='run', zoom=DEFAULT_TILE_ZOOM):
+        """
+        生成汇总地图
+        :param output_dir: 输出目录
+        :param name: 文件名前缀，run模式为 <name>.html，tile模式为 <name>_<z>_<x>_<y>.html
+        :param mode: run或tile
+        :param zoom: tile模式的瓦片缩放级别
+        :return: 生成的HTML文件路径列表
+        """
+        if not self.records:
+            return []
+        os.makedirs(output_dir, exist_ok=True)
+        if mode == 'tile':
+            groups = {}
+            for record in self.records:
+                groups.setdefault(lonlat_to_tile(record['lon'], record['lat'], zoom), []).append(record)
+            paths = []
+            for (x, y), records in sorted(groups.items()):
+                path = os.path.join(output_dir, f"{name}_{zoom}_{x}_{y}.html")
+                build_map(records).save(path)
+                paths.append(path)
+        else:
+            path = os.path.join(output_dir, f"{name}.html")
+            build_map(self.records).save(path)
+            paths = [path]
+        logger.info(f"已生成 {len(paths)} 个汇总地图，包含 {len(self.records)} 个地址")
+        return paths
+
+def build_map(records):
+    """
+    在一个地图中绘制所有建筑轮廓(单个GeoJson图层，同一建筑只绘制一次)和地址标记(聚合图层)
+    :param records: MapCollector收集的记录列表
+    :return: folium.Map
+    """
+    import folium
+    from folium.plugins import MarkerCluster
+
+    buildings = {}
+    for record in records:
+        building = buildings.setdefault(record['osm_id'], {'osm_id': record['osm_id'], 'addresses': [],
+                                                           'geometry': record['geometry']})
+        building['addresses'].append(record['address'])
+    footprints = gpd.GeoDataFrame(
+        [{**building, 'addresses': '; '.join(building['addresses'])} for building in buildings.values()],
+        geometry='geometry', crs="EPSG:4326")
+
+    west, south, east, north = footprints.total_bounds
+    m = folium.Map(location=[(south + north) / 2, (west + east) / 2], zoom_start=15, prefer_canvas=True)
+    folium.GeoJson(
+        footprints,
+        name='建筑轮廓',
+        tooltip=folium.GeoJsonTooltip(fields=['addresses', 'osm_id'], aliases=['地址', 'OSM ID'])
+    ).add_to(m)
+
+    cluster = MarkerCluster(name='地址').add_to(m)
+    for record in records:
+        folium.Marker([record['lat'], record['lon']], popup=record['address']).add_to(cluster)
+
+    folium.LayerControl().add_to(m)
+    m.fit_bounds([[south, west], [north, east]])
+    return m
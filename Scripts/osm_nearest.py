@@ -0,0 +1,131 @@
+'''
+Author: Leili
+Date: 2026-10-19 17:00:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 17:00:00
+FilePath: /GoogleModelProcess/Scripts/osm_nearest.py
+Description: 批量为地址分配最近的建筑，按UTM分带分组投影(缓存每个分带的坐标转换器)，使用sjoin_nearest一次完成匹配
+'''
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from pyproj import Transformer
+
+WGS84 = 4326
+
+# 按外包矩形筛选候选建筑时，在最大距离之外额外扩展的比例
+BBOX_PADDING = 1.5
+
+def utm_epsg(lon, lat):
+    """
+    计算经纬度所在UTM分带的EPSG代码，支持numpy数组
+
+    北半球为326xx，南半球为327xx
+    """
+    zone = np.floor((np.asarray(lon, dtype=float) + 180) / 6).astype(int) % 60 + 1
+    return np.where(np.asarray(lat, dtype=float) >= 0, 32600 + zone, 32700 + zone)
+
+@lru_cache(maxsize=None)
+def get_transformer(epsg, inverse=False):
+    """ 获取WGS84与UTM分带之间的坐标转换器，每个分带只创建一次 """
+    if inverse:
+        return Transformer.from_crs(int(epsg), WGS84, always_xy=True)
+    return Transformer.from_crs(WGS84, int(epsg), always_xy=True)
+
+def transform_geometries(geometries, epsg, inverse=False):
+    """
+    使用缓存的转换器投影几何数组
+
+    参数:
+        geometries: 几何数组(GeoSeries或shapely几何数组)
+        epsg: int - UTM分带的EPSG代码
+        inverse: bool - 为True时从UTM转回WGS84
+
+    返回:
+        ndarray: 投影后的shapely几何数组
+    """
+    transformer = get_transformer(int(epsg), inverse)
+
+    def project(coords):
+        x, y = transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([x, y])
+
+    return shapely.transform(np.asarray(geometries), project)
+
+def project_building(building, lon, lat):
+    """ 将单个建筑(GeoDataFrame中的一行)投影到地址所在的UTM分带，返回投影后的Series """
+    epsg = int(utm_epsg(lon, lat))
+    projected = building.copy()
+    projected['geometry'] = transform_geometries([building.geometry], epsg)[0]
+    return projected
+
+def assign_nearest(footprints, lons, lats, max_distance=None):
+    """
+    为一批地址分配最近的建筑
+
+    地址按UTM分带分组，每组只投影外包矩形(扩展最大距离)范围内的候选建筑，
+    然后用sjoin_nearest一次完成整组匹配；多个建筑距离相同时取第一个
+
+    参数:
+        footprints: GeoDataFrame - WGS84坐标系下的建筑轮廓
+        lons, lats: 地址的经度和纬度数组
+        max_distance: float - 最大距离(米)，为None时不限制
+
+    返回:
+        DataFrame: 与地址一一对应，列footprint为建筑索引(未找到时为None)，列distance为距离(米)
+    """
+    lons = np.asarray(lons, dtype=float)
+    lats = np.asarray(lats, dtype=float)
+    labels = [None] * len(lons)
+    distances = np.full(len(lons), np.nan)
+    if footprints.empty or not len(lons):
+        return pd.DataFrame({'footprint': pd.Series(labels, dtype=object), 'distance': distances})
+    if footprints.crs is not None and footprints.crs.to_epsg() != WGS84:
+        footprints = footprints.to_crs(WGS84)
+
+    zones = utm_epsg(lons, lats)
+    for epsg in np.unique(zones):
+        members = np.flatnonzero(zones == epsg)
+        candidates = footprints
+        if max_distance is not None:
+            # 1度纬度约111km，经度方向按纬度余弦放大
+            lat_pad = max_distance / 111000.0 * BBOX_PADDING
+            lon_pad = lat_pad / max(np.cos(np.radians(np.abs(lats[members]).max())), 0.01)
+            candidates = footprints.cx[lons[members].min() - lon_pad:lons[members].max() + lon_pad,
+                                       lats[members].min() - lat_pad:lats[members].max() + lat_pad]
+        if candidates.empty:
+            continue
+
+        transformer = get_transformer(int(epsg))
+        x, y = transformer.transform(lons[members], lats[members])
+        points = gpd.GeoDataFrame({'point': members}, geometry=gpd.points_from_xy(x, y), crs=int(epsg))
+        buildings = gpd.GeoDataFrame(
+            {'position': np.arange(len(candidates))},
+            geometry=transform_geometries(candidates.geometry.values, epsg), crs=int(epsg))
+
+        joined = gpd.sjoin_nearest(points, buildings, how='inner', max_distance=max_distance,
+                                   distance_col='distance')
+        joined = joined[~joined.index.duplicated(keep='first')]
+        rows = joined['point'].to_numpy()
+        for row, label in zip(rows, candidates.index[joined['position'].to_numpy()]):
+            labels[row] = label
+        distances[rows] = joined['distance'].to_numpy()
+    return pd.DataFrame({'footprint': pd.Series(labels, dtype=object), 'distance': distances})
+
+def find_nearest_building(footprints, lon, lat, max_distance=None):
+    """
+    查找单个地址最近的建筑
+
+    返回:
+        tuple: (WGS84坐标系下的单行GeoDataFrame, 投影到UTM后的建筑Series, 距离)，未找到时返回 (None, None, None)
+    """
+    match = assign_nearest(footprints, [lon], [lat], max_distance).iloc[0]
+    if match['footprint'] is None:
+        return None, None, None
+    building_data = footprints.loc[[match['footprint']]]
+    if building_data.crs is not None and building_data.crs.to_epsg() != WGS84:
+        building_data = building_data.to_crs(WGS84)
+    return building_data, project_building(building_data.iloc[0], lon, lat), float(match['distance'])
@@ -0,0 +1,143 @@
+'''
+Author: Leili
+Date: 2026-10-19 20:40:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 20:40:00
+FilePath: /GoogleModelProcess/Scripts/osm_pbf.py
+Description: 基于本地.osm.pbf的离线建筑轮廓数据源：流式解析建筑面，写入带R-tree空间索引的GeoPackage，后续运行直接查询
+'''
+import os
+import time
+import logging
+import threading
+
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+# 与osm.py共用日志记录器
+logger = logging.getLogger('BuildingProcessor')
+
+STORE_LAYER = 'buildings'
+STORE_SUFFIX = '.buildings.gpkg'
+
+# 写入GeoPackage的批大小
+WRITE_BATCH_SIZE = 50000
+
+# 保存为列的标签，其余标签不保存
+STORE_TAGS = ['building', 'height', 'min_height', 'building:levels', 'name',
+              'addr:housenumber', 'addr:street', 'addr:city', 'addr:postcode']
+
+def default_store_path(pbf_path):
+    """ 默认的GeoPackage路径：与pbf同目录，如 california.osm.pbf -> california.buildings.gpkg """
+    base = os.path.basename(pbf_path)
+    for ext in ('.osm.pbf', '.pbf', '.osm'):
+        if base.endswith(ext):
+            base = base[:-len(ext)]
+            break
+    return os.path.join(os.path.dirname(os.path.abspath(pbf_path)), base + STORE_SUFFIX)
+
+def build_store(pbf_path, store_path, index_type='flex_mem'):
+    """
+    流式解析pbf中的建筑(闭合way和multipolygon relation)，按批写入GeoPackage
+
+    pyogrio写入GeoPackage时默认创建R-tree空间索引
+
+    参数:
+        pbf_path: str - .osm.pbf文件路径
+        store_path: str - 输出的GeoPackage路径
+        index_type: str - osmium的节点坐标索引类型，大范围的提取文件可使用dense_file_array等磁盘索引
+
+    返回:
+        int: 建筑数量
+    """
+    import osmium
+    from osmium.geom import WKBFactory
+
+    factory = WKBFactory()
+    tmp_path = os.path.splitext(store_path)[0] + '.tmp.gpkg'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    class BuildingHandler(osmium.SimpleHandler):
+        def __init__(self):
+            super().__init__()
+            self.rows = []
+            self.count = 0
+
+        def area(self, a):
+            if 'building' not in a.tags:
+                return
+            try:
+                wkb = factory.create_multipolygon(a)
+            except Exception:
+                # 几何不完整(提取范围边缘缺少节点)或无效
+                return
+            row = {'element': 'way' if a.from_way() else 'relation', 'id': a.orig_id(), 'wkb': wkb}
+            for key in STORE_TAGS:
+                row[key] = a.tags.get(key)
+            self.rows.append(row)
+            if len(self.rows) >= WRITE_BATCH_SIZE:
+                self.flush()
+
+        def flush(self):
+            if not self.rows:
+                return
+            frame = pd.DataFrame(self.rows)
+            geometry = shapely.from_wkb(frame.pop('wkb').to_numpy(), on_invalid='ignore')
+            batch = gpd.GeoDataFrame(frame, geometry=geometry, crs="EPSG:4326")
+            batch.to_file(tmp_path, layer=STORE_LAYER, driver='GPKG', mode='a' if self.count else 'w')
+            self.count += len(batch)
+            self.rows = []
+
+    start = time.time()
+    logger.info(f"开始解析 {pbf_path} 中的建筑")
+    handler = BuildingHandler()
+    handler.apply_file(pbf_path, locations=True, idx=index_type)
+    handler.flush()
+    if not handler.count:
+        # 没有建筑时也生成空图层，避免每次运行重复解析
+        gpd.GeoDataFrame({'element': [], 'id': []}, geometry=[], crs="EPSG:4326").to_file(
+            tmp_path, layer=STORE_LAYER, driver='GPKG')
+    os.replace(tmp_path, store_path)
+    logger.info(f"解析完成，共 {handler.count} 个建筑，耗时 {time.time() - start:.1f}秒，已保存到 {store_path}")
+    return handler.count
+
+class PbfSource:
+    """
+    本地.osm.pbf提取文件的建筑轮廓数据源
+
+    首次使用(或pbf比GeoPackage更新)时构建GeoPackage，之后按范围通过R-tree空间索引查询
+    """
+    name = "pbf"
+
+    def __init__(self, pbf_path, store_path=None, index_type='flex_mem'):
+        self.pbf_path = pbf_path
+        self.store_path = store_path or default_store_path(pbf_path)
+        self.index_type = index_type
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def ensure_store(self):
+        """ GeoPackage不存在或比pbf旧时重新构建，并发查询时只构建一次 """
+        with self._lock:
+            if not self._ready:
+                self._build_if_stale()
+                self._ready = True
+
+    def _build_if_stale(self):
+        if not os.path.exists(self.store_path) or \
+                (os.path.exists(self.pbf_path) and os.path.getmtime(self.pbf_path) > os.path.getmtime(self.store_path)):
+            if not os.path.exists(self.pbf_path):
+                raise FileNotFoundError(f"pbf文件不存在: {self.pbf_path}")
+            build_store(self.pbf_path, self.store_path, self.index_type)
+
+    def fetch(self, bounds):
+        """ 查询范围内的建筑轮廓，bounds为(west, south, east, north)，索引与osmnx一致为(element, id) """
+        if not self._ready:
+            self.ensure_store()
+        gdf = gpd.read_file(self.store_path, layer=STORE_LAYER, bbox=tuple(bounds))
+        if gdf.empty:
+            return gpd.GeoDataFrame(geometry=[], crs="EPSG:4326")
+        gdf = gdf.set_index(['element', 'id'])
+        return gdf[gdf.geometry.notna()]
@@ -0,0 +1,131 @@
+'''
+Author: Leili
+Date: 2026-10-19 20:10:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 20:10:00
+FilePath: /GoogleModelProcess/Scripts/osm_sink.py
+Description: 批量写入匹配结果：缓存匹配到的建筑，按批追加到每次运行一个的GeoPackage或GeoParquet文件
+'''
+import os
+import json
+import logging
+import threading
+
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from Scripts.osm_export import format_osm_id
+
+# 与osm.py共用日志记录器
+logger = logging.getLogger('BuildingProcessor')
+
+SINK_FORMATS = {'.gpkg': 'gpkg', '.parquet': 'parquet'}
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_LAYER = 'buildings'
+
+# 单独成列的常用标签，完整标签以JSON保存在tags列中
+TAG_COLUMNS = ['building', 'height', 'building:levels', 'name']
+COLUMNS = ['address', 'distance', 'osm_id'] + TAG_COLUMNS + ['tags']
+
+# 不属于标签的列(osmnx 1.x的way会带有节点列表)
+SKIP_COLUMNS = {'geometry', 'nodes', 'ways'}
+
+def building_tags(building):
+    """ 提取建筑的非空标签 {键: 字符串值} """
+    tags = {}
+    for key, value in building.items():
+        if key in SKIP_COLUMNS or isinstance(value, (list, tuple, dict)):
+            continue
+        if value is None or (isinstance(value, float) and pd.isna(value)):
+            continue
+        tags[key] = str(value)
+    return tags
+
+class ResultSink:
+    """
+    匹配结果的批量写入器(线程安全)
+
+    每缓存batch_size条结果写入一次，GeoPackage使用追加模式写入同一图层，
+    GeoParquet使用pyarrow的ParquetWriter每批写入一个row group
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE, layer=DEFAULT_LAYER):
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in SINK_FORMATS:
+            raise ValueError(f"不支持的结果文件格式: {ext}，可选 {list(SINK_FORMATS)}")
+        self.path = path
+        self.format = SINK_FORMATS[ext]
+        self.batch_size = batch_size
+        self.layer = layer
+        self.count = 0
+        self._rows = []
+        self._lock = threading.Lock()
+        self._writer = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def add(self, address, building_data, distance=None):
+        """
+        缓存一个匹配结果，达到批大小时写入文件
+        :param building_data: 经纬度坐标系下的建筑GeoDataFrame(单行)
+        :param distance: 地址与建筑的距离(米)
+        """
+        building = building_data.iloc[0]
+        tags = building_tags(building)
+        row = {
+            'address': address,
+            'distance': float(distance) if distance is not None else None,
+            'osm_id': format_osm_id(building_data.index[0]),
+        }
+        for key in TAG_COLUMNS:
+            row[key] = tags.get(key)
+        row['tags'] = json.dumps(tags, ensure_ascii=False)
+        row['geometry'] = building.geometry
+        with self._lock:
+            self._rows.append(row)
+            if len(self._rows) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        # 先取出缓存，写入失败时不会在关闭时重复写入同一批
+        rows, self._rows = self._rows, []
+        frame = pd.DataFrame(rows, columns=COLUMNS + ['geometry'])
+        frame['distance'] = frame['distance'].astype(float)
+        batch = gpd.GeoDataFrame(frame, geometry='geometry', crs="EPSG:4326")
+        if self.format == 'gpkg':
+            batch.to_file(self.path, layer=self.layer, driver='GPKG', mode='a' if self.count else 'w')
+        else:
+            self._write_parquet(batch)
+        self.count += len(batch)
+
+    def _write_parquet(self, batch):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if self._writer is None:
+            fields = [pa.field(name, pa.float64() if name == 'distance' else pa.string()) for name in COLUMNS]
+            # GeoParquet元数据，未声明crs时默认为OGC:CRS84(经纬度)
+            geo = {'version': '1.0.0', 'primary_column': 'geometry',
+                   'columns': {'geometry': {'encoding': 'WKB', 'geometry_types': []}}}
+            schema = pa.schema(fields + [pa.field('geometry', pa.binary())],
+                               metadata={b'geo': json.dumps(geo).encode('utf-8')})
+            self._writer = pq.ParquetWriter(self.path, schema)
+        columns = {name: batch[name].tolist() for name in COLUMNS}
+        columns['geometry'] = shapely.to_wkb(batch.geometry.values)
+        self._writer.write_table(pa.table(columns, schema=self._writer.schema))
+
+    def close(self):
+        """ 写入剩余的结果并关闭文件 """
+        with self._lock:
+            self._flush()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        logger.info(f"共写入 {self.count} 个匹配结果到 {self.path}")
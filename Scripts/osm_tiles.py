@@ -0,0 +1,129 @@
+'''
+Author: Leili
+Date: 2026-10-19 16:40:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 05:52:34
+FilePath: /GoogleModelProcess/Scripts/osm_tiles.py
+Description: 按瓦片批量下载建筑轮廓
+'''
+import math
+import logging
+
+import geopandas as gpd
+import pandas as pd
+
+# 与osm.py共用日志记录器
+logger = logging.getLogger('BuildingProcessor')
+
+# 默认瓦片缩放级别，z15的瓦片边长约1.2km(赤道处)，洛杉矶纬度处约1km
+DEFAULT_TILE_ZOOM = 15
+
+# 下载瓦片时向外扩展的范围(度)，约50m，避免瓦片边缘地址的最近建筑落在相邻瓦片中
+TILE_MARGIN_DEG = 0.0005
+
+BUILDING_TAGS = {'building': True}
+
+def lonlat_to_tile(lon, lat, zoom=DEFAULT_TILE_ZOOM):
+    """ 经纬度转换为slippy map瓦片坐标 (x, y) """
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def tile_bounds(x, y, zoom=DEFAULT_TILE_ZOOM):
+    """ 瓦片的经纬度范围 (west, south, east, north) """
+    n = 2 ** zoom
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return west, south, east, north
+
+def point_bounds(lon, lat, dist):
+    """ 以地址为中心、边长约2*dist米的经纬度范围 (west, south, east, north) """
+    lat_pad = dist / 111320.0
+    lon_pad = lat_pad / max(math.cos(math.radians(lat)), 0.01)
+    return lon - lon_pad, lat - lat_pad, lon + lon_pad, lat + lat_pad
+
+def tiles_for_points(points, zoom=DEFAULT_TILE_ZOOM):
+    """
+    计算覆盖所有地址的瓦片
+
+    所有地址的外包矩形按固定瓦片网格切分，只保留包含地址的瓦片，
+    地址稀疏分布在大范围内时不会下载中间的空白区域
+
+    参数:
+        points: list - [(经度, 纬度)]
+        zoom: int - 瓦片缩放级别
+
+    返回:
+        list: 排序后的瓦片坐标 [(x, y)]
+    """
+    return sorted({lonlat_to_tile(lon, lat, zoom) for lon, lat in points})
+
+class OverpassSource:
+    """ 通过osmnx在线查询Overpass的建筑轮廓数据源 """
+    name = "overpass"
+
+    def __init__(self, tags=None):
+        self.tags = tags or BUILDING_TAGS
+
+    def fetch(self, bounds):
+        """ 下载范围内的建筑轮廓，bounds为(west, south, east, north) """
+        import osmnx as ox
+        west, south, east, north = bounds
+        try:
+            try:
+                # osmnx 2.x
+                return ox.features_from_bbox(bbox=(west, south, east, north), tags=self.tags)
+            except TypeError:
+                # osmnx 1.x
+                return ox.features_from_bbox(north, south, east, west, tags=self.tags)
+        except ox._errors.InsufficientResponseError:
+            return gpd.GeoDataFrame(geometry=[], crs="EPSG:4326")
+
+class GeoJSONSource:
+    """ 本地GeoJSON文件中的建筑轮廓数据源，用于离线调试和在不访问Overpass的情况下验证批量流程 """
+    name = "geojson"
+
+    def __init__(self, path):
+        self.path = path
+        self.data = None
+
+    def fetch(self, bounds):
+        if self.data is None:
+            self.data = gpd.read_file(self.path).to_crs("EPSG:4326")
+        west, south, east, north = bounds
+        return self.data.cx[west:east, south:north]
+
+def download_footprints(points, source, zoom=DEFAULT_TILE_ZOOM):
+    """
+    按瓦片批量下载所有地址周边的建筑轮廓，每个瓦片只请求一次
+
+    参数:
+        points: list - [(经度, 纬度)]
+        source: 数据源，需要实现fetch(bounds)
+        zoom: int - 瓦片缩放级别
+
+    返回:
+        GeoDataFrame: 去重后的建筑轮廓(只保留面状要素)
+    """
+    tiles = tiles_for_points(points, zoom)
+    logger.info(f"{len(points)} 个地址分布在 {len(tiles)} 个瓦片中 (z{zoom})，开始下载建筑轮廓")
+    frames = []
+    for i, (x, y) in enumerate(tiles, 1):
+        west, south, east, north = tile_bounds(x, y, zoom)
+        bounds = (west - TILE_MARGIN_DEG, south - TILE_MARGIN_DEG, east + TILE_MARGIN_DEG, north + TILE_MARGIN_DEG)
+        gdf = source.fetch(bounds)
+        logger.info(f"瓦片 {i}/{len(tiles)} ({zoom}/{x}/{y}): {len(gdf)} 个要素")
+        if not gdf.empty:
+            frames.append(gdf)
+    if not frames:
+        return gpd.GeoDataFrame(geometry=[], crs="EPSG:4326")
+
+    footprints = pd.concat(frames)
+    # 相邻瓦片的扩展范围有重叠，同一建筑只保留一份
+    footprints = footprints[~footprints.index.duplicated(keep='first')]
+    footprints = footprints[footprints.geometry.geom_type.isin(['Polygon', 'MultiPolygon'])]
+    return gpd.GeoDataFrame(footprints, geometry='geometry', crs=frames[0].crs)
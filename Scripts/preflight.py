@@ -0,0 +1,97 @@
+'''
+Author: Leili
+Date: 2026-10-19 16:00:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 16:00:00
+FilePath: /GoogleModelProcess/Scripts/preflight.py
+Description: 运行前检查(工具路径、Chrome版本、Blender版本、RenderDoc导入插件)，整个运行期间只执行一次并缓存结果
+'''
+import os
+import re
+import subprocess
+from functools import lru_cache
+
+from Scripts.config_utils import get_path, get_setting
+from Scripts.log_utils import logD, logI, logW, logE
+
+# 支持的Chrome最高主版本号
+MAX_CHROME_MAJOR = 135
+
+# Blender中检查RenderDoc导入插件是否可用的脚本
+ADDON_PROBE_EXPR = "import bpy; print('GMP_ADDON', 'google_maps' in dir(bpy.ops.import_rdc))"
+
+def get_chrome_version(chrome_path):
+    """ 读取Chrome可执行文件的版本号，失败时返回空字符串 """
+    if not os.path.exists(chrome_path):
+        return ""
+    try:
+        from win32com.client import Dispatch
+        parser = Dispatch("Scripting.FileSystemObject")
+        return parser.GetFileVersion(chrome_path)
+    except Exception as e:
+        logW(f"获取Chrome版本失败: {str(e)}")
+        return ""
+
+def probe_blender(blender_path, timeout=60):
+    """
+    以无界面模式启动一次Blender，读取版本号并检查RenderDoc导入插件是否可用
+
+    返回:
+        tuple: (版本号, 插件是否可用)，无法启动时返回("", None)
+    """
+    if not os.path.exists(blender_path):
+        return "", None
+    try:
+        output = subprocess.run(
+            [blender_path, '-b', '--python-expr', ADDON_PROBE_EXPR],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout, check=False,
+        ).stdout.decode('utf-8', 'replace')
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logW(f"启动Blender检查失败: {str(e)}")
+        return "", None
+    version = re.search(r"Blender (\d+\.\d+(?:\.\d+)?)", output)
+    addon = re.search(r"GMP_ADDON (True|False)", output)
+    return (version.group(1) if version else "",
+            addon.group(1) == "True" if addon else None)
+
+@lru_cache(maxsize=None)
+def run_preflight():
+    """
+    执行运行前检查，结果在整个运行期间缓存，需要重新检查时调用 run_preflight.cache_clear()
+
+    配置项:
+        preflight_blender_probe: 是否启动Blender检查版本和插件，默认开启
+
+    返回:
+        dict: 检查结果
+    """
+    paths = {name: get_path(f'{name}_path') for name in ('chrome', 'renderdoc', 'blender')}
+    result = {
+        'paths': {name: {'path': path, 'exists': os.path.exists(path)} for name, path in paths.items()},
+        'chrome_version': get_chrome_version(paths['chrome']),
+        'blender_version': "",
+        'addon_available': None,
+    }
+    if int(get_setting('preflight_blender_probe', 1)):
+        result['blender_version'], result['addon_available'] = probe_blender(paths['blender'])
+
+    chrome_version = result['chrome_version']
+    if not chrome_version:
+        result['chrome_ok'] = False
+        result['chrome_error'] = "无法获取Chrome版本"
+    elif int(chrome_version.split(".")[0]) > MAX_CHROME_MAJOR:
+        result['chrome_ok'] = False
+        result['chrome_error'] = f"Chrome版本过高: {chrome_version}，请使用低于{MAX_CHROME_MAJOR + 1}.0.0.0的版本。"
+    else:
+        result['chrome_ok'] = True
+        result['chrome_error'] = ""
+
+    for name, info in result['paths'].items():
+        if not info['exists']:
+            logW(f"未找到{name}: {info['path']}")
+    logI(f"运行前检查: Chrome {chrome_version or '未知'}, Blender {result['blender_version'] or '未知'}, "
+         f"RenderDoc导入插件: {'可用' if result['addon_available'] else '不可用' if result['addon_available'] is False else '未知'}")
+    if result['addon_available'] is False:
+        logE("Blender中未启用RenderDoc导入插件(import_rdc.google_maps)")
+    logD(f"运行前检查结果: {result}")
+    return result
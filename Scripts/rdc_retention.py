@@ -0,0 +1,263 @@
+'''
+Author: Leili
+Date: 2026-10-19 14:10:00
+LastEditors: Leili
+LastEditTime: 2026-10-19 14:10:00
+FilePath: /GoogleModelProcess/Scripts/rdc_retention.py
+Description: rdc_dir容量管理，按LRU淘汰已有结果的RDC文件，并可在后台线程中将RDC压缩归档(zstd)
+'''
+import os
+import time
+import queue
+import threading
+
+from Scripts.config_utils import get_path, get_setting
+from Scripts.log_utils import logD, logI, logW, logE
+from Scripts.rdc_validate import remove_rdc
+
+ARCHIVE_SUFFIX = ".zst"
+
+class RdcRetentionManager:
+    """
+    RDC文件保留管理器
+
+    功能:
+        1. rdc_dir总大小超过预算时，按最近使用时间淘汰已经生成.blend结果的RDC文件
+        2. 可选地在后台线程中将已完成的RDC文件压缩(zstd)移动到归档目录
+        3. 需要使用已归档的RDC文件时自动解压还原
+    """
+
+    def __init__(self, rdc_dir, result_dir, budget_bytes=0, archive_dir=None, compression_level=3):
+        """
+        参数:
+            rdc_dir: str - RDC文件目录
+            result_dir: str - 结果目录，其中及其子目录下的.blend文件视为已完成
+            budget_bytes: int - rdc_dir的容量预算(字节)，0表示不限制
+            archive_dir: str - 归档目录，为None时不压缩归档
+            compression_level: int - zstd压缩级别
+        """
+        self.rdc_dir = rdc_dir
+        self.result_dir = result_dir
+        self.budget_bytes = budget_bytes
+        self.archive_dir = archive_dir
+        self.compression_level = compression_level
+        self.queue = queue.Queue()
+        self.worker = None
+        self.lock = threading.Lock()
+        # 正在归档的文件，淘汰时跳过
+        self.archiving = set()
+        self.evicted_bytes = 0
+        self.archived_count = 0
+
+        if self.archive_dir:
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                logE("请安装zstandard以启用RDC压缩归档: pip install zstandard")
+                self.archive_dir = None
+        if self.archive_dir:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            self.worker = threading.Thread(target=self._archive_worker, name="RdcArchiver", daemon=True)
+            self.worker.start()
+
+    def finished_names(self):
+        """ 获取已经生成.blend结果的文件名集合(不含扩展名) """
+        names = set()
+        if not os.path.isdir(self.result_dir):
+            return names
+        pending = [self.result_dir]
+        while pending:
+            directory = pending.pop()
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        # 结果目录下只有一层区域目录
+                        if directory == self.result_dir:
+                            pending.append(entry.path)
+                    elif entry.name.lower().endswith('.blend'):
+                        names.add(os.path.normcase(entry.name[:-len('.blend')]))
+        return names
+
+    def _rdc_entries(self):
+        """ 获取rdc_dir中的RDC文件列表: [(路径, 大小, 最近使用时间)] """
+        entries = []
+        if not os.path.isdir(self.rdc_dir):
+            return entries
+        with os.scandir(self.rdc_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.lower().endswith('.rdc'):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_size, max(stat.st_atime, stat.st_mtime)))
+        return entries
+
+    @staticmethod
+    def mark_used(rdc_path):
+        """ 记录RDC文件被使用，更新访问时间(不依赖文件系统是否开启atime) """
+        try:
+            os.utime(rdc_path, (time.time(), os.path.getmtime(rdc_path)))
+        except OSError:
+            pass
+
+    def enforce_budget(self):
+        """
+        rdc_dir超过容量预算时，从最久未使用的已完成RDC开始淘汰
+
+        返回:
+            int: 本次淘汰的字节数
+        """
+        if not self.budget_bytes:
+            return 0
+        entries = self._rdc_entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.budget_bytes:
+            return 0
+
+        finished = self.finished_names()
+        evicted = 0
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.budget_bytes:
+                break
+            name = os.path.normcase(os.path.splitext(os.path.basename(path))[0])
+            with self.lock:
+                if name not in finished or path in self.archiving:
+                    continue
+            if self.archive_dir and not os.path.exists(self.archive_path(path)):
+                # 开启归档时先同步归档，避免丢失唯一的副本
+                if not self._archive(path):
+                    continue
+            remove_rdc(path)
+            total -= size
+            evicted += size
+            logD(f"已淘汰RDC文件: {path} ({size / 1024 / 1024:.1f} MB)")
+
+        self.evicted_bytes += evicted
+        if total > self.budget_bytes:
+            logW(f"rdc_dir仍超出容量预算: {total / 1024 ** 3:.2f} GB > {self.budget_bytes / 1024 ** 3:.2f} GB，"
+                 f"剩余的RDC文件尚未生成结果")
+        elif evicted:
+            logI(f"rdc_dir容量管理: 淘汰 {evicted / 1024 ** 2:.0f} MB, 当前 {total / 1024 ** 2:.0f} MB")
+        return evicted
+
+    def archive_path(self, rdc_path):
+        """ 获取RDC文件对应的归档文件路径 """
+        return os.path.join(self.archive_dir, os.path.basename(rdc_path) + ARCHIVE_SUFFIX)
+
+    def schedule_archive(self, rdc_path):
+        """ 将已完成的RDC文件加入后台归档队列，未开启归档时不做处理 """
+        if not self.archive_dir or not os.path.exists(rdc_path):
+            return
+        with self.lock:
+            self.archiving.add(rdc_path)
+        self.queue.put(rdc_path)
+
+    def _archive(self, rdc_path):
+        """ 压缩RDC文件到归档目录，先写临时文件再重命名 """
+        import zstandard
+
+        target = self.archive_path(rdc_path)
+        tmp_path = target + ".tmp"
+        try:
+            compressor = zstandard.ZstdCompressor(level=self.compression_level, threads=-1)
+            with open(rdc_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                compressor.copy_stream(src, dst)
+            os.replace(tmp_path, target)
+            return True
+        except (OSError, zstandard.ZstdError) as e:
+            logW(f"压缩RDC文件失败: {rdc_path}, {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def _archive_worker(self):
+        while True:
+            rdc_path = self.queue.get()
+            try:
+                if rdc_path is None:
+                    return
+                if os.path.exists(rdc_path) and self._archive(rdc_path):
+                    original_size = os.path.getsize(rdc_path)
+                    remove_rdc(rdc_path)
+                    self.archived_count += 1
+                    logD(f"已归档RDC文件: {rdc_path} ({original_size / 1024 / 1024:.1f} MB -> "
+                         f"{os.path.getsize(self.archive_path(rdc_path)) / 1024 / 1024:.1f} MB)")
+            except Exception as e:
+                logW(f"归档RDC文件时发生错误: {str(e)}")
+            finally:
+                with self.lock:
+                    self.archiving.discard(rdc_path)
+                self.queue.task_done()
+
+    def ensure_rdc(self, rdc_path):
+        """
+        确保RDC文件在rdc_dir中可用，若只存在归档文件则解压还原
+
+        返回:
+            bool: RDC文件是否可用
+        """
+        if os.path.exists(rdc_path):
+            self.mark_used(rdc_path)
+            return True
+        if not self.archive_dir:
+            return False
+        archive = self.archive_path(rdc_path)
+        if not os.path.exists(archive):
+            return False
+
+        import zstandard
+
+        tmp_path = rdc_path + ".restore.tmp"
+        try:
+            with open(archive, 'rb') as src, open(tmp_path, 'wb') as dst:
+                zstandard.ZstdDecompressor().copy_stream(src, dst)
+            os.replace(tmp_path, rdc_path)
+            logI(f"已从归档还原RDC文件: {rdc_path}")
+            return True
+        except (OSError, zstandard.ZstdError) as e:
+            logW(f"还原RDC文件失败: {archive}, {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def stop(self):
+        """ 等待归档队列处理完毕并停止后台线程 """
+        if self.worker is not None:
+            self.queue.put(None)
+            self.worker.join()
+            self.worker = None
+        logD(f"rdc_dir容量管理结束: 共淘汰 {self.evicted_bytes / 1024 ** 2:.0f} MB, 归档 {self.archived_count} 个文件")
+
+# 当前使用的管理器
+_manager = None
+
+def get_retention_manager():
+    """
+    根据配置获取RDC保留管理器
+
+    配置项:
+        rdc_dir_budget_gb: rdc_dir容量预算(GB)，0表示不限制
+        rdc_archive_enabled: 是否压缩归档已完成的RDC文件
+        rdc_archive_dir: 归档目录，默认为rdc_dir同级的"<rdc_dir>_archive"
+                         (不能放在rdc_dir下，clear_processes会删除rdc_dir的子目录)
+        rdc_archive_level: zstd压缩级别
+    """
+    global _manager
+    if _manager is None:
+        rdc_dir = get_path('rdc_dir')
+        archive_dir = None
+        if int(get_setting('rdc_archive_enabled', 0)):
+            archive_dir = get_setting('rdc_archive_dir', '') or os.path.normpath(rdc_dir) + "_archive"
+        _manager = RdcRetentionManager(
+            rdc_dir,
+            get_path('result_dir'),
+            budget_bytes=int(float(get_setting('rdc_dir_budget_gb', 0)) * 1024 ** 3),
+            archive_dir=archive_dir,
+            compression_level=int(get_setting('rdc_archive_level', 3)),
+        )
+    return _manager
+
+def stop_retention_manager():
+    """ 停止RDC保留管理器 """
+    global _manager
+    if _manager is not None:
+        _manager.stop()
+        _manager = None
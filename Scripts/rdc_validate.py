@@ -0,0 +1,265 @@
+'''
+Author: Leili
+Date: 2026-10-19 13:30:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 13:10:00
+FilePath: /GoogleModelProcess/Scripts/rdc_validate.py
+Description: RDC文件深度校验，通过内存映射读取文件头和段表，计算校验和并写入旁路文件(sidecar)
+'''
+import os
+import json
+import mmap
+import time
+import shutil
+import struct
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from Scripts.log_utils import logD, logI, logW
+
+# 文件头: uint64 magic, uint32 version, uint32 headerLength, char progVersion[16]
+FILE_HEADER = struct.Struct('<QII16s')
+MAGIC_HEADER = struct.unpack('<I', b'RDOC')[0]
+
+# 段头: byte isASCII, byte zero[3], uint32 sectionType, uint64 compressedLength,
+#       uint64 uncompressedLength, uint64 sectionVersion, uint32 sectionFlags, uint32 nameLength
+SECTION_HEADER = struct.Struct('<B3sIQQQII')
+
+SECTION_TYPES = {
+    0: 'Unknown',
+    1: 'FrameCapture',
+    2: 'ResolveDatabase',
+    3: 'Bookmarks',
+    4: 'Notes',
+    5: 'ResourceRenames',
+    6: 'AMDRGPProfile',
+    7: 'ExtendedThumbnail',
+    8: 'EmbeddedLogfile',
+    9: 'EditedShaders',
+    10: 'D3D12Core',
+    11: 'D3D12SDKLayers',
+}
+FRAME_CAPTURE = 1
+
+# 段标志
+FLAG_LZ4 = 0x2
+FLAG_ZSTD = 0x4
+
+# 估算draw call数量时每个draw call在帧数据中平均占用的字节数(经验值)
+DEFAULT_BYTES_PER_DRAWCALL = 2048
+
+# 计算校验和时每次读取的块大小
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+SIDECAR_SUFFIX = ".json"
+
+# 运行前扫描发现的无效RDC文件默认移动到rdc_dir同级的"<rdc_dir>_quarantine"目录，由人工确认后再删除
+# (不能放在rdc_dir下，clear_processes会删除rdc_dir的子目录)
+QUARANTINE_SUFFIX = "_quarantine"
+
+class RdcFormatError(Exception):
+    """ RDC文件格式错误 """
+
+def sidecar_path(rdc_path):
+    """ 获取RDC文件对应的旁路文件路径 """
+    return rdc_path + SIDECAR_SUFFIX
+
+def parse_rdc(buffer, file_size):
+    """
+    解析RDC文件头和段表
+
+    参数:
+        buffer: 支持切片的只读缓冲区(mmap)
+        file_size: int - 文件大小
+
+    返回:
+        dict: 文件版本和段列表
+
+    ASCII段的段头为文本格式，无法按二进制段头得到长度，遇到时记录该段并停止解析后面的段(不视为错误)；
+    只有文件被截断、文件头无效或缺少FrameCapture段时视为无效
+
+    异常:
+        RdcFormatError: 文件头无效、段表越界(文件被截断)或缺少FrameCapture段时抛出
+    """
+    if file_size < FILE_HEADER.size:
+        raise RdcFormatError(f"文件过小，无法读取文件头 ({file_size} 字节)")
+    magic, version, header_length, prog_version = FILE_HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC_HEADER:
+        raise RdcFormatError(f"文件头标识无效: 0x{magic:016x}")
+    if header_length < FILE_HEADER.size or header_length > file_size:
+        raise RdcFormatError(f"文件头长度无效: {header_length}")
+
+    sections = []
+    offset = header_length
+    while offset < file_size:
+        # 段头第一个字节(isASCII)不为0时为ASCII段
+        if buffer[offset] != 0:
+            sections.append({
+                'type': 'ASCII',
+                'name': '',
+                'offset': offset,
+                'compressed_bytes': file_size - offset,
+                'uncompressed_bytes': file_size - offset,
+                'version': 0,
+                'compression': 'none',
+            })
+            break
+        if offset + SECTION_HEADER.size > file_size:
+            raise RdcFormatError(f"段头在偏移 {offset} 处被截断")
+        _, _, section_type, compressed, uncompressed, section_version, flags, name_length = \
+            SECTION_HEADER.unpack_from(buffer, offset)
+        name_start = offset + SECTION_HEADER.size
+        data_start = name_start + name_length
+        data_end = data_start + compressed
+        if data_end > file_size:
+            raise RdcFormatError(
+                f"段 {SECTION_TYPES.get(section_type, section_type)} 数据越界: 需要 {data_end} 字节, 文件只有 {file_size} 字节")
+        name = bytes(buffer[name_start:data_start]).split(b'\0', 1)[0].decode('utf-8', 'replace')
+        sections.append({
+            'type': SECTION_TYPES.get(section_type, str(section_type)),
+            'name': name,
+            'offset': offset,
+            'compressed_bytes': compressed,
+            'uncompressed_bytes': uncompressed,
+            'version': section_version,
+            'compression': 'lz4' if flags & FLAG_LZ4 else 'zstd' if flags & FLAG_ZSTD else 'none',
+        })
+        offset = data_end
+
+    if not any(section['type'] == SECTION_TYPES[FRAME_CAPTURE] for section in sections):
+        raise RdcFormatError("缺少FrameCapture段")
+
+    return {
+        'version': version,
+        'program_version': prog_version.split(b'\0', 1)[0].decode('ascii', 'replace'),
+        'sections': sections,
+    }
+
+def validate_rdc(rdc_path, use_sidecar=True, bytes_per_drawcall=DEFAULT_BYTES_PER_DRAWCALL):
+    """
+    深度校验RDC文件，不会修改或删除RDC文件
+
+    通过内存映射读取文件头和段表，流式计算SHA-256校验和，
+    将文件大小、段数量和估算的draw call数量写入旁路文件；
+    旁路文件中的大小和修改时间与当前文件一致时直接复用之前的结果
+
+    参数:
+        rdc_path: str - RDC文件路径
+        use_sidecar: bool - 是否读取和写入旁路文件
+        bytes_per_drawcall: int - 估算draw call数量时使用的平均字节数
+
+    返回:
+        dict: 校验结果，valid字段表示文件是否有效，error字段为失败原因
+    """
+    try:
+        stat = os.stat(rdc_path)
+    except OSError as e:
+        return {'path': rdc_path, 'valid': False, 'error': f"无法读取文件: {str(e)}"}
+
+    sidecar = sidecar_path(rdc_path)
+    if use_sidecar and os.path.exists(sidecar):
+        try:
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('size') == stat.st_size and cached.get('mtime') == stat.st_mtime:
+                return cached
+        except (OSError, ValueError):
+            pass
+
+    result = {
+        'path': rdc_path,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'valid': False,
+        'error': "",
+    }
+    try:
+        if stat.st_size == 0:
+            raise RdcFormatError("文件为空")
+        with open(rdc_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            info = parse_rdc(mm, stat.st_size)
+            digest = hashlib.sha256()
+            for start in range(0, stat.st_size, HASH_CHUNK_SIZE):
+                digest.update(mm[start:start + HASH_CHUNK_SIZE])
+
+        frame_bytes = sum(section['uncompressed_bytes'] for section in info['sections']
+                          if section['type'] == SECTION_TYPES[FRAME_CAPTURE])
+        result.update(info)
+        result.update({
+            'valid': True,
+            'sha256': digest.hexdigest(),
+            'section_count': len(info['sections']),
+            'frame_capture_bytes': frame_bytes,
+            'estimated_draw_calls': frame_bytes // max(int(bytes_per_drawcall), 1),
+        })
+    except (RdcFormatError, OSError, ValueError) as e:
+        result['error'] = str(e)
+
+    if use_sidecar:
+        try:
+            with open(sidecar, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logW(f"写入RDC旁路文件失败: {sidecar}, {str(e)}")
+    return result
+
+def scan_rdc_dir(rdc_dir, workers=4, bytes_per_drawcall=DEFAULT_BYTES_PER_DRAWCALL):
+    """
+    并行校验目录下的所有RDC文件
+
+    参数:
+        rdc_dir: str - RDC文件目录
+        workers: int - 并行线程数
+        bytes_per_drawcall: int - 估算draw call数量时使用的平均字节数
+
+    返回:
+        list: 每个RDC文件的校验结果
+    """
+    if not os.path.isdir(rdc_dir):
+        return []
+    with os.scandir(rdc_dir) as it:
+        rdc_paths = [entry.path for entry in it
+                     if entry.is_file() and entry.name.lower().endswith('.rdc')]
+    if not rdc_paths:
+        return []
+
+    logD(f"开始并行校验 {len(rdc_paths)} 个RDC文件, 线程数: {workers}")
+    with ThreadPoolExecutor(max_workers=max(int(workers), 1)) as executor:
+        results = list(executor.map(
+            lambda path: validate_rdc(path, bytes_per_drawcall=bytes_per_drawcall), rdc_paths))
+
+    invalid = [result for result in results if not result['valid']]
+    logI(f"RDC校验完成: 共 {len(results)} 个, 有效 {len(results) - len(invalid)} 个, 无效 {len(invalid)} 个")
+    return results
+
+def remove_rdc(rdc_path):
+    """ 删除RDC文件及其旁路文件 """
+    for path in (rdc_path, sidecar_path(rdc_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+def quarantine_rdc(rdc_path, quarantine_dir=None):
+    """
+    将RDC文件及其旁路文件移动到隔离目录，不删除文件
+
+    参数:
+        rdc_path: str - RDC文件路径
+        quarantine_dir: str - 隔离目录，默认为RDC文件所在目录同级的"<目录>_quarantine"
+
+    返回:
+        str: 移动后的RDC文件路径
+    """
+    if quarantine_dir is None:
+        quarantine_dir = os.path.normpath(os.path.dirname(os.path.abspath(rdc_path))) + QUARANTINE_SUFFIX
+    os.makedirs(quarantine_dir, exist_ok=True)
+    target = os.path.join(quarantine_dir, os.path.basename(rdc_path))
+    if os.path.exists(target):
+        # 同名文件已被隔离过时加上时间后缀，不覆盖之前的文件
+        stem, ext = os.path.splitext(target)
+        target = f"{stem}_{time.strftime('%Y%m%d%H%M%S')}{ext}"
+    shutil.move(rdc_path, target)
+    sidecar = sidecar_path(rdc_path)
+    if os.path.exists(sidecar):
+        shutil.move(sidecar, sidecar_path(target))
+    return target
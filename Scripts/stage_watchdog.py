@@ -0,0 +1,311 @@
+'''
+Author: Leili
+Date: 2026-10-19 10:40:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 13:50:00
+FilePath: /GoogleModelProcess/Scripts/stage_watchdog.py
+Description: 阶段看门狗，为每个抓取阶段设置截止时间，监控Chrome/RenderDoc/Blender进程，超时后清理并跳过当前地址
+'''
+import time
+import threading
+from contextlib import contextmanager
+
+from Scripts.config_utils import get_setting
+from Scripts.log_utils import logD, logW, logE
+
+# 各阶段的默认截止时间(秒)
+DEFAULT_STAGE_DEADLINES = {
+    'geocode': 30,
+    'capture': 180,
+    'blender_import': 360,
+    'match_template': 120,
+    'blender_save': 360,
+}
+
+# 各阶段需要监控的进程，格式与kill_processes一致: {进程名: 是否部分匹配}
+STAGE_PROCESSES = {
+    'capture': {'chrome.exe': False, 'renderdoc': True},
+    'blender_import': {'Blender': True},
+    'match_template': {'Blender': True},
+    'blender_save': {'Blender': True},
+}
+
+class StageTimeout(Exception):
+    """ 阶段执行超时 """
+
+    def __init__(self, stage, address, reason):
+        self.stage = stage
+        self.address = address
+        self.reason = reason
+        super().__init__(f"阶段 '{stage}' 超时 ({reason}), 地址: {address}")
+
+class StageWatchdog(threading.Thread):
+    """
+    阶段看门狗线程
+
+    主线程通过stage()标记当前正在执行的阶段，看门狗线程定期检查:
+        1. 阶段是否超过截止时间
+        2. 阶段相关进程是否已经退出
+        3. 阶段相关进程是否长时间没有CPU活动(例如卡在模态对话框上)
+    任一条件成立时终止相关进程并记录超时，主线程在阶段结束或调用check()时抛出StageTimeout
+    """
+
+    def __init__(self, deadlines=None, idle_timeout=120, cpu_threshold=1.0,
+                 exit_grace=15, poll_interval=2):
+        """
+        参数:
+            deadlines: dict - 各阶段的截止时间(秒)，未指定的阶段使用DEFAULT_STAGE_DEADLINES
+            idle_timeout: float - 进程CPU占用持续低于cpu_threshold的最长时间(秒)，0表示不检查
+            cpu_threshold: float - 判定进程空闲的CPU占用阈值(%)
+            exit_grace: float - 进程退出后等待阶段正常结束的时间(秒)
+            poll_interval: float - 检查间隔(秒)
+        """
+        super().__init__(name="StageWatchdog", daemon=True)
+        self.deadlines = dict(DEFAULT_STAGE_DEADLINES)
+        self.deadlines.update(deadlines or {})
+        self.idle_timeout = idle_timeout
+        self.cpu_threshold = cpu_threshold
+        self.exit_grace = exit_grace
+        self.poll_interval = poll_interval
+
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.timeouts = []
+
+        # 当前阶段状态
+        self.stage_name = None
+        self.address = None
+        self.stage_start = 0.0
+        self.expired_reason = None
+        self.last_active = 0.0
+        self.seen_pids = set()
+        self.gone_since = None
+        self.procs = {}
+
+    @contextmanager
+    def stage(self, stage_name, address=None):
+        """ 标记一个阶段的开始和结束，阶段超时后在退出时抛出StageTimeout """
+        with self.lock:
+            self.stage_name = stage_name
+            self.address = address
+            self.stage_start = time.time()
+            self.last_active = self.stage_start
+            self.expired_reason = None
+            self.seen_pids = set()
+            self.gone_since = None
+            self.procs = {}
+        try:
+            yield self
+        finally:
+            with self.lock:
+                reason = self.expired_reason
+                self.stage_name = None
+                self.expired_reason = None
+        if reason:
+            raise StageTimeout(stage_name, address, reason)
+
+    def check(self):
+        """ 在主线程的等待循环中调用，当前阶段已超时则立即抛出StageTimeout """
+        with self.lock:
+            reason = self.expired_reason
+            stage_name, address = self.stage_name, self.address
+        if reason:
+            raise StageTimeout(stage_name, address, reason)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        while not self.stop_event.wait(self.poll_interval):
+            try:
+                self._poll()
+            except Exception as e:
+                logW(f"看门狗检查时发生错误: {str(e)}")
+
+    def _stage_processes(self, process_names):
+        """ 获取阶段相关的进程，复用Process对象以便计算CPU占用 """
+        import psutil
+
+        alive = {}
+        for proc in psutil.process_iter(['pid', 'name']):
+            name = (proc.info.get('name') or '').lower()
+            for proc_name, partial_match in process_names.items():
+                if (partial_match and proc_name.lower() in name) or \
+                   (not partial_match and name == proc_name.lower()):
+                    alive[proc.pid] = self.procs.get(proc.pid, proc)
+                    break
+        self.procs = alive
+        return alive
+
+    def _poll(self):
+        with self.lock:
+            stage_name = self.stage_name
+            if stage_name is None or self.expired_reason:
+                return
+            elapsed = time.time() - self.stage_start
+        now = time.time()
+        reason = None
+
+        deadline = self.deadlines.get(stage_name)
+        if deadline and elapsed > deadline:
+            reason = f"超过截止时间 {deadline}秒"
+
+        process_names = STAGE_PROCESSES.get(stage_name)
+        if reason is None and process_names:
+            procs = self._stage_processes(process_names)
+            if procs:
+                self.seen_pids.update(procs)
+                self.gone_since = None
+                busy = False
+                for proc in procs.values():
+                    try:
+                        if proc.cpu_percent(None) > self.cpu_threshold:
+                            busy = True
+                    except Exception:
+                        continue
+                if busy:
+                    self.last_active = now
+                elif self.idle_timeout and now - self.last_active > self.idle_timeout:
+                    reason = f"进程无CPU活动超过 {self.idle_timeout}秒"
+            elif self.seen_pids:
+                # 进程曾经出现过但已经全部退出
+                if self.gone_since is None:
+                    self.gone_since = now
+                elif now - self.gone_since > self.exit_grace:
+                    reason = "相关进程已退出"
+
+        if reason:
+            self._expire(stage_name, elapsed, reason, process_names)
+
+    def _expire(self, stage_name, elapsed, reason, process_names):
+        """ 记录超时并终止阶段相关进程 """
+        with self.lock:
+            if self.stage_name != stage_name:
+                return
+            self.expired_reason = reason
+            address = self.address
+            self.timeouts.append({
+                'address': address,
+                'stage': stage_name,
+                'elapsed': round(elapsed, 1),
+                'reason': reason,
+                'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            })
+        logE(f"看门狗: 阶段 '{stage_name}' {reason}, 已运行 {elapsed:.0f}秒, 地址: {address}")
+        if process_names:
+            kill_processes(process_names)
+
+def kill_processes(process_names, timeout=5):
+    """
+    结束指定名称的进程及其子进程，先terminate，超时仍未退出的进程再kill；
+    看门狗处理超时阶段和capture_google_model.clear_processes清理进程都使用该函数
+
+    参数:
+        process_names: dict - {进程名: 是否部分匹配}，例如 {'chrome.exe': False, 'renderdoc': True}
+        timeout: float - terminate后等待进程退出的时间(秒)，超时后kill
+    """
+    import psutil
+
+    targets = []
+    for proc in psutil.process_iter(['pid', 'name']):
+        name = (proc.info.get('name') or '').lower()
+        for proc_name, partial_match in process_names.items():
+            if (partial_match and proc_name.lower() in name) or \
+               (not partial_match and name == proc_name.lower()):
+                try:
+                    targets.extend(proc.children(recursive=True))
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+                targets.append(proc)
+                break
+
+    for proc in targets:
+        try:
+            proc.terminate()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    _, still_alive = psutil.wait_procs(targets, timeout=timeout)
+    for proc in still_alive:
+        try:
+            proc.kill()
+            logD(f"已强制结束进程: {proc.pid}")
+        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+            logW(f"无法结束进程 {proc.pid}: {str(e)}")
+
+# 当前运行的看门狗
+_watchdog = None
+
+# 阶段变化监听器，回调参数为 (事件, 阶段名, 地址, 已运行秒数)，事件为'enter'或'exit'
+_stage_listeners = []
+
+def add_stage_listener(listener):
+    """ 注册阶段变化监听器 """
+    if listener not in _stage_listeners:
+        _stage_listeners.append(listener)
+
+def remove_stage_listener(listener):
+    """ 移除阶段变化监听器 """
+    if listener in _stage_listeners:
+        _stage_listeners.remove(listener)
+
+def _notify_stage(event, stage_name, address, elapsed):
+    for listener in list(_stage_listeners):
+        try:
+            listener(event, stage_name, address, elapsed)
+        except Exception as e:
+            logW(f"阶段监听器执行出错: {str(e)}")
+
+def start_watchdog():
+    """ 根据配置启动看门狗，配置watchdog_enabled=0时不启动 """
+    global _watchdog
+    if _watchdog is not None:
+        return _watchdog
+    if not int(get_setting('watchdog_enabled', 1)):
+        return None
+
+    deadlines = {}
+    for stage_name, default in DEFAULT_STAGE_DEADLINES.items():
+        deadlines[stage_name] = float(get_setting(f'stage_deadline_{stage_name}', default))
+    _watchdog = StageWatchdog(
+        deadlines=deadlines,
+        idle_timeout=float(get_setting('watchdog_idle_timeout', 120)),
+        cpu_threshold=float(get_setting('watchdog_cpu_threshold', 1.0)),
+    )
+    _watchdog.start()
+    logD(f"看门狗已启动, 阶段截止时间: {deadlines}")
+    return _watchdog
+
+def stop_watchdog():
+    """
+    停止看门狗
+
+    返回:
+        list: 运行期间记录的超时列表
+    """
+    global _watchdog
+    if _watchdog is None:
+        return []
+    _watchdog.stop()
+    _watchdog.join(timeout=5)
+    timeouts = _watchdog.timeouts
+    _watchdog = None
+    return timeouts
+
+@contextmanager
+def stage(stage_name, address=None):
+    """ 标记当前执行阶段并通知监听器，看门狗未启动时不做超时监控 """
+    start = time.time()
+    _notify_stage('enter', stage_name, address, 0.0)
+    try:
+        if _watchdog is None:
+            yield None
+        else:
+            with _watchdog.stage(stage_name, address) as watchdog:
+                yield watchdog
+    finally:
+        _notify_stage('exit', stage_name, address, time.time() - start)
+
+def check_stage():
+    """ 当前阶段已超时则抛出StageTimeout，供等待循环调用 """
+    if _watchdog is not None:
+        _watchdog.check()
@@ -0,0 +1,237 @@
+'''
+Author: Leili
+Date: 2026-10-19 11:20:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 13:50:00
+FilePath: /GoogleModelProcess/Scripts/telemetry.py
+Description: 资源采样器，定期记录流程启动的Chrome/RenderDoc/Blender进程的资源占用
+'''
+import os
+import csv
+import time
+import threading
+
+from Scripts.config_utils import get_path, get_setting
+from Scripts.log_utils import logD, logI, logW
+from Scripts.utils import get_filename
+
+# 需要采样的进程分组，格式与kill_processes一致: {分组名: {进程名: 是否部分匹配}}
+PROCESS_GROUPS = {
+    'chrome': {'chrome.exe': False},
+    'renderdoc': {'renderdoc': True},
+    'blender': {'blender': True},
+}
+
+CSV_FIELDS = ['time', 'address', 'stage', 'group', 'procs', 'gpu_procs',
+              'cpu_percent', 'rss_mb', 'write_mb', 'handles']
+
+class ResourceSampler(threading.Thread):
+    """
+    资源采样线程
+
+    按固定间隔对每个进程分组采样CPU占用、内存(RSS)、GPU进程数、磁盘写入量和句柄数，
+    每个样本都带有当前地址和阶段，逐行写入CSV时间序列文件，同时统计每个阶段的内存峰值
+    """
+
+    def __init__(self, output_path, interval=5.0):
+        """
+        参数:
+            output_path: str - 时间序列文件路径(CSV)
+            interval: float - 采样间隔(秒)
+        """
+        super().__init__(name="ResourceSampler", daemon=True)
+        self.output_path = output_path
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.address = ""
+        self.stage = ""
+        self.procs = {}
+        # {阶段: 所有分组合计RSS峰值(MB)}
+        self.stage_peaks = {}
+        # {(地址, 阶段): {分组: RSS峰值(MB)}}
+        self.address_peaks = {}
+        self.sample_count = 0
+
+    def on_stage(self, event, stage_name, address, elapsed):
+        """ 阶段变化监听器，用于给样本打上地址和阶段标签 """
+        with self.lock:
+            if event == 'enter':
+                self.stage = stage_name
+                self.address = address or ""
+            else:
+                self.stage = ""
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        os.makedirs(os.path.dirname(self.output_path) or ".", exist_ok=True)
+        with open(self.output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_FIELDS)
+            while not self.stop_event.is_set():
+                try:
+                    rows = self.sample()
+                    if rows:
+                        writer.writerows(rows)
+                        f.flush()
+                except Exception as e:
+                    logW(f"资源采样时发生错误: {str(e)}")
+                self.stop_event.wait(self.interval)
+
+    def _group_processes(self):
+        """ 按分组收集进程，复用Process对象以便计算CPU占用 """
+        import psutil
+
+        groups = {name: [] for name in PROCESS_GROUPS}
+        alive = {}
+        for proc in psutil.process_iter(['pid', 'name']):
+            name = (proc.info.get('name') or '').lower()
+            for group, process_names in PROCESS_GROUPS.items():
+                matched = any(
+                    (partial and proc_name.lower() in name) or (not partial and name == proc_name.lower())
+                    for proc_name, partial in process_names.items()
+                )
+                if matched:
+                    proc = self.procs.get(proc.pid, proc)
+                    alive[proc.pid] = proc
+                    groups[group].append(proc)
+                    break
+        self.procs = alive
+        return groups
+
+    def sample(self):
+        """
+        采样一次
+
+        返回:
+            list: CSV行列表，没有任何相关进程时返回空列表
+        """
+        import psutil
+
+        with self.lock:
+            address, stage = self.address, self.stage
+        now = time.strftime('%Y-%m-%d %H:%M:%S')
+
+        rows = []
+        stage_total = 0.0
+        group_rss = {}
+        for group, procs in self._group_processes().items():
+            if not procs:
+                continue
+            cpu = rss = write = 0.0
+            handles = gpu_procs = 0
+            for proc in procs:
+                try:
+                    with proc.oneshot():
+                        cpu += proc.cpu_percent(None)
+                        rss += proc.memory_info().rss
+                        try:
+                            write += proc.io_counters().write_bytes
+                        except (AttributeError, psutil.AccessDenied):
+                            pass
+                        if hasattr(proc, 'num_handles'):
+                            handles += proc.num_handles()
+                        else:
+                            handles += proc.num_fds()
+                        if group == 'chrome' and '--type=gpu-process' in ' '.join(proc.cmdline()):
+                            gpu_procs += 1
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            rss_mb = rss / 1024 / 1024
+            group_rss[group] = rss_mb
+            stage_total += rss_mb
+            rows.append([now, address, stage, group, len(procs), gpu_procs,
+                         round(cpu, 1), round(rss_mb, 1), round(write / 1024 / 1024, 1), handles])
+
+        if rows:
+            with self.lock:
+                self.sample_count += 1
+                stage_key = stage or "idle"
+                self.stage_peaks[stage_key] = max(self.stage_peaks.get(stage_key, 0.0), stage_total)
+                peaks = self.address_peaks.setdefault((address, stage_key), {})
+                for group, rss_mb in group_rss.items():
+                    peaks[group] = max(peaks.get(group, 0.0), rss_mb)
+        return rows
+
+    def write_peaks(self, peaks_path):
+        """
+        写入每个地址每个阶段的内存峰值，并附上RDC文件大小，便于估算Blender导入所需内存
+
+        参数:
+            peaks_path: str - 峰值文件路径(CSV)
+        """
+        rdc_dir = get_path('rdc_dir')
+        rdc_sizes = {}
+        with open(peaks_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['address', 'stage', 'rdc_mb'] + [f'{group}_peak_rss_mb' for group in PROCESS_GROUPS])
+            for (address, stage), peaks in sorted(self.address_peaks.items()):
+                if address and address not in rdc_sizes:
+                    rdc_path = os.path.join(rdc_dir, f"{get_filename(address)}.rdc")
+                    rdc_sizes[address] = round(os.path.getsize(rdc_path) / 1024 / 1024, 1) \
+                        if os.path.exists(rdc_path) else ""
+                writer.writerow([address, stage, rdc_sizes.get(address, "")] +
+                                [round(peaks.get(group, 0.0), 1) for group in PROCESS_GROUPS])
+
+# 当前运行的采样器
+_sampler = None
+
+def start_sampler(output_dir):
+    """
+    根据配置启动资源采样器，配置telemetry_enabled=0时不启动
+
+    参数:
+        output_dir: str - 时间序列文件保存目录
+    """
+    global _sampler
+    if _sampler is not None:
+        return _sampler
+    if not int(get_setting('telemetry_enabled', 1)):
+        return None
+
+    from Scripts.stage_watchdog import add_stage_listener
+
+    output_path = os.path.join(output_dir, f"telemetry_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+    _sampler = ResourceSampler(output_path, interval=float(get_setting('telemetry_interval', 5)))
+    add_stage_listener(_sampler.on_stage)
+    _sampler.start()
+    logD(f"资源采样器已启动, 采样间隔: {_sampler.interval}秒, 输出文件: {output_path}")
+    return _sampler
+
+def stop_sampler():
+    """
+    停止资源采样器，写入峰值文件并输出每个阶段的内存峰值
+
+    返回:
+        dict: 采样结果摘要，采样器未启动时返回空字典
+    """
+    global _sampler
+    if _sampler is None:
+        return {}
+
+    from Scripts.stage_watchdog import remove_stage_listener
+
+    sampler = _sampler
+    _sampler = None
+    remove_stage_listener(sampler.on_stage)
+    sampler.stop()
+    sampler.join(timeout=sampler.interval + 5)
+
+    peaks_path = os.path.splitext(sampler.output_path)[0] + "_peaks.csv"
+    try:
+        sampler.write_peaks(peaks_path)
+    except Exception as e:
+        logW(f"写入内存峰值文件失败: {str(e)}")
+
+    if sampler.stage_peaks:
+        logI("各阶段内存峰值:")
+        for stage_name, peak in sorted(sampler.stage_peaks.items()):
+            logI(f"  {stage_name}: {peak:.0f} MB")
+    return {
+        'samples': sampler.sample_count,
+        'timeseries': sampler.output_path,
+        'peaks': peaks_path,
+        'stage_peak_rss_mb': {k: round(v, 1) for k, v in sampler.stage_peaks.items()},
+    }
@@ -2,7 +2,7 @@
 Author: Leili
 Date: 2025-05-06
 LastEditors: Leili
-LastEditTime: 2025-06-11 10:23:48
+LastEditTime: 2026-10-20 10:30:00
 FilePath: /GoogleModelProcess/Scripts/utils.py
 Description: 通用函数
 '''
@@ -49,4 +49,37 @@ def get_filename(address):
     """
     # 从配置文件获取地址
     filename = remove_chinese_chars(address.replace(' ', '_').replace(",", "")).replace("|", "").replace(".", "").replace("/", "_").replace("\\", "_")
-    return filename
\ No newline at end of file
+    return filename
+
+# 地址中常见词的统一缩写，用于识别同一地址的不同写法
+ADDRESS_ABBREVIATIONS = {
+    'street': 'st', 'avenue': 'ave', 'av': 'ave', 'road': 'rd', 'boulevard': 'blvd',
+    'drive': 'dr', 'lane': 'ln', 'court': 'ct', 'place': 'pl', 'parkway': 'pkwy',
+    'highway': 'hwy', 'terrace': 'ter', 'circle': 'cir', 'square': 'sq',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+    'suite': 'ste', 'apartment': 'apt', 'california': 'ca',
+}
+
+def normalize_address(address):
+    """
+    将地址规范化为统一的比较键
+    
+    功能:
+        1. 转为小写并去除标点符号
+        2. 合并多余空白
+        3. 将常见的街道类型和方位词统一为缩写
+    
+    参数:
+        address: str - 原始地址字符串
+    
+    返回:
+        str: 规范化后的地址，同一地址的不同写法会得到相同的结果
+    
+    示例:
+        >>> normalize_address("110 North La Brea Avenue, Inglewood, CA 90301")
+        '110 n la brea ave inglewood ca 90301'
+    """
+    import re
+    tokens = re.sub(r"[^\w\s]", " ", address.lower()).split()
+    return " ".join(ADDRESS_ABBREVIATIONS.get(token, token) for token in tokens)
@@ -0,0 +1,38 @@
+'''
+Author: Leili
+Date: 2026-10-20 10:00:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 11:00:00
+FilePath: /GoogleModelProcess/tests/conftest.py
+Description: pytest公共配置，将项目根目录和测试数据目录加入Python路径
+'''
+import os
+import sys
+
+import pytest
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(project_dir, "tests", "fixtures")
+for path in (project_dir, FIXTURE_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+@pytest.fixture
+def fixture_path():
+    """ 返回测试数据文件的路径 """
+    return lambda name: os.path.join(FIXTURE_DIR, name)
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    """ 在临时目录中生成最小的配置文件，并通过GOOGLE_MODEL_PROCESS_CONFIG使用它 """
+    config_path = tmp_path / "config.ini"
+    config_path.write_text(
+        "[Paths]\n"
+        f"rdc_dir = {tmp_path / 'rdc'}\n"
+        f"result_dir = {tmp_path / 'results'}\n"
+        f"district_file = {tmp_path / 'district.txt'}\n\n"
+        "[Settings]\nrdc_file_min_size = 1\naddress = \n\n"
+        f"[Logging]\nlog_dir = {tmp_path / 'logs'}\n",
+        encoding='utf-8')
+    monkeypatch.setenv('GOOGLE_MODEL_PROCESS_CONFIG', str(config_path))
+    return str(config_path)
@@ -0,0 +1,69 @@
+'''
+Author: Leili
+Date: 2026-10-20 11:00:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 11:00:00
+FilePath: /GoogleModelProcess/tests/fixtures/make_osm_fixture.py
+Description: 生成测试用的小型.osm.pbf提取文件(需要pyosmium)
+
+用法:
+    python tests/fixtures/make_osm_fixture.py    # 重新生成 tests/fixtures/buildings.osm.pbf
+'''
+import os
+
+# 提取文件中的内容(经纬度在洛杉矶附近):
+#   way 100      - 建筑，约20m见方，带高度和地址标签
+#   relation 300 - multipolygon建筑，外环约60m见方，中间有约20m见方的内环(庭院)
+#   way 103      - 非建筑(公园)，不应出现在结果中
+#   way 104      - 额外的建筑，只在extra=True时写入，用于测试提取文件更新后重新构建
+BUILDING_WAY = 100
+MULTIPOLYGON = 300
+PARK_WAY = 103
+EXTRA_WAY = 104
+
+def square(lon, lat, size):
+    """ 以(lon, lat)为西南角、边长size度的闭合环 """
+    return [(lon, lat), (lon + size, lat), (lon + size, lat + size), (lon, lat + size)]
+
+def write_buildings_pbf(path, extra=False):
+    """ 写入测试用的提取文件，已存在时覆盖 """
+    import osmium
+    from osmium.osm.mutable import Node, Way, Relation
+
+    if os.path.exists(path):
+        os.remove(path)
+    rings = {
+        BUILDING_WAY: (square(-118.3000, 34.0000, 0.0002),
+                       {'building': 'yes', 'height': '12', 'addr:housenumber': '1', 'addr:street': 'Test St'}),
+        101: (square(-118.2990, 34.0000, 0.0006), {}),
+        102: (square(-118.2988, 34.0002, 0.0002), {}),
+        PARK_WAY: (square(-118.2970, 34.0000, 0.0004), {'leisure': 'park'}),
+    }
+    if extra:
+        rings[EXTRA_WAY] = (square(-118.2960, 34.0000, 0.0002), {'building': 'house'})
+
+    nodes, ways = [], []
+    for way_id, (ring, tags) in sorted(rings.items()):
+        refs = []
+        for i, (lon, lat) in enumerate(ring):
+            node_id = way_id * 10 + i
+            nodes.append(Node(id=node_id, location=(lon, lat), version=1))
+            refs.append(node_id)
+        ways.append(Way(id=way_id, nodes=refs + refs[:1], tags=tags, version=1))
+    relation = Relation(id=MULTIPOLYGON, members=[('w', 101, 'outer'), ('w', 102, 'inner')],
+                        tags={'type': 'multipolygon', 'building': 'yes'}, version=1)
+
+    writer = osmium.SimpleWriter(path)
+    try:
+        for node in nodes:
+            writer.add_node(node)
+        for way in ways:
+            writer.add_way(way)
+        writer.add_relation(relation)
+    finally:
+        writer.close()
+    return path
+
+if __name__ == "__main__":
+    output = write_buildings_pbf(os.path.join(os.path.dirname(os.path.abspath(__file__)), "buildings.osm.pbf"))
+    print(f"已生成: {output} ({os.path.getsize(output)} 字节)")
@@ -0,0 +1,49 @@
+'''
+Author: Leili
+Date: 2026-10-20 12:00:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 12:00:00
+FilePath: /GoogleModelProcess/tests/test_automation.py
+Description: 自动化驱动接口和模拟驱动的窗口焦点模拟测试
+'''
+import pytest
+
+from Scripts.automation import AutomationDriver, SimulatedDriver
+
+# 模拟驱动的日志和合成文件使用临时目录中的配置
+pytestmark = pytest.mark.usefixtures("config_file")
+
+def test_missing_step_fails_at_instantiation():
+    class IncompleteDriver(AutomationDriver):
+        def check_chrome_version(self):
+            return True
+
+    with pytest.raises(TypeError):
+        IncompleteDriver()
+    SimulatedDriver()
+
+def test_windows_and_focus():
+    driver = SimulatedDriver(seed=0)
+    # Chrome未启动时无法注入
+    assert not driver.launch_renderdoc_and_inject()
+    driver.launch_chrome_google_map(34.0, -118.3)
+    assert driver.active_window == "Google Chrome"
+    assert driver.launch_renderdoc_and_inject()
+    assert driver.active_window == "Google Chrome Gpu"
+    assert driver.activate_window("RenderDoc") and driver.active_window == "RenderDoc"
+
+    # Blender未打开时无法匹配模板
+    assert not driver.match_template("template.png")
+    assert driver.open_blender() and driver.active_window == "Blender"
+    assert driver.match_template("template.png")
+
+    driver.clear_processes()
+    assert driver.windows == set() and driver.active_window is None
+    assert not driver.activate_window("Blender")
+
+def test_focus_loss():
+    driver = SimulatedDriver(failure_rates={'activate_window': 1.0}, seed=0)
+    assert driver.open_blender()
+    assert not driver.match_template("template.png")
+    assert driver.failures == {'activate_window': 1}
+    assert 'match_template' not in driver.calls
@@ -0,0 +1,47 @@
+'''
+Author: Leili
+Date: 2026-10-20 11:40:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 11:40:00
+FilePath: /GoogleModelProcess/tests/test_extrude.py
+Description: 建筑轮廓拉伸的测试
+'''
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import Polygon, MultiPolygon, LineString, box
+
+from Scripts.extrude import extrude_geometries
+
+def volume(vertices, faces):
+    """ 闭合三角网格的有向体积，法向朝外时为正 """
+    a, b, c = vertices[faces[:, 0]], vertices[faces[:, 1]], vertices[faces[:, 2]]
+    return np.einsum('ij,ij->i', a, np.cross(b, c)).sum() / 6.0
+
+def test_box():
+    vertices, faces, features = extrude_geometries([box(0, 0, 2, 3)], [10.0])
+    assert len(vertices) == 8
+    # 侧面8个 + 顶面和底面各2个
+    assert len(faces) == 12
+    assert np.all(features == 0)
+    assert volume(vertices, faces) == pytest.approx(60.0)
+
+def test_hole_and_multipolygon():
+    courtyard = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [[(4, 4), (6, 4), (6, 6), (4, 6)]])
+    multi = MultiPolygon([box(20, 0, 21, 1), box(30, 0, 32, 1)])
+    vertices, faces, features = extrude_geometries([courtyard, multi], [5.0, 2.0])
+    assert set(features.tolist()) == {0, 1}
+    assert volume(vertices, faces[features == 0]) == pytest.approx(480.0)
+    assert volume(vertices, faces[features == 1]) == pytest.approx(6.0)
+
+def test_empty_and_non_polygon_geometries_are_skipped():
+    geometries = [Polygon(), box(0, 0, 1, 1), LineString([(0, 0), (1, 1)]), shapely.from_wkt("MULTIPOLYGON EMPTY"),
+                  None, box(5, 5, 6, 6)]
+    vertices, faces, features = extrude_geometries(geometries, [3.0] * len(geometries))
+    assert sorted(set(features.tolist())) == [1, 5]
+    assert len(faces) == 24
+    assert volume(vertices, faces) == pytest.approx(6.0)
+
+def test_only_empty():
+    vertices, faces, features = extrude_geometries([Polygon()], [3.0])
+    assert vertices.shape == (0, 3) and faces.shape == (0, 3) and len(features) == 0
@@ -0,0 +1,55 @@
+'''
+Author: Leili
+Date: 2026-10-20 10:00:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 10:00:00
+FilePath: /GoogleModelProcess/tests/test_geocoder.py
+Description: 离线地理编码的查找测试，索引直接写入SQLite，不依赖osmium
+'''
+import sqlite3
+
+import pytest
+
+from Scripts.geocoder import OfflineGeocoder, address_key
+from Scripts.utils import normalize_address
+
+def make_index(path, rows):
+    """ rows: [(门牌号, 街道, 城市, 邮编, 纬度, 经度)] """
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE addresses (key TEXT, city TEXT, postcode TEXT, lat REAL, lon REAL)")
+    conn.executemany("INSERT INTO addresses VALUES (?, ?, ?, ?, ?)",
+                     [(address_key(number, street), normalize_address(city), postcode, lat, lon)
+                      for number, street, city, postcode, lat, lon in rows])
+    conn.commit()
+    conn.close()
+    return str(path)
+
+@pytest.fixture
+def geocoder(tmp_path):
+    return OfflineGeocoder(make_index(tmp_path / "index.sqlite", [
+        ("100", "Main Street", "Springfield", "62701", 39.80, -89.64),
+        ("110", "North La Brea Avenue", "Inglewood", "90301", 33.96, -118.35),
+        ("5", "Oak Street", "Portland", "97201", 45.52, -122.68),
+        ("5", "Oak Street", "Portland", "04101", 43.66, -70.26),
+    ]))
+
+def test_match_by_city_or_postcode(geocoder):
+    assert geocoder.lookup("100 Main St, Springfield, IL 62701") == (39.80, -89.64)
+    assert geocoder.lookup("110 N La Brea Ave, Inglewood, CA") == (33.96, -118.35)
+    assert geocoder.lookup("5 Oak St 04101") == (43.66, -70.26)
+
+def test_other_city_is_a_miss(geocoder):
+    # 同名街道在索引中只有其他城市的地址时不能返回其坐标
+    assert geocoder.resolve("100 Main St, Boston, MA 02108") == (None, False)
+    assert geocoder.lookup("100 Main St, Boston, MA 02108") is None
+    assert geocoder.summary()['hits'] == 0
+
+def test_street_only(geocoder):
+    # 没有城市/邮编时使用所有候选
+    assert geocoder.lookup("100 Main Street") == (39.80, -89.64)
+    # 候选相距过远时无法确定
+    assert geocoder.resolve("5 Oak St") == (None, True)
+
+def test_unknown_address(geocoder):
+    assert geocoder.resolve("7 Elm St, Springfield") == (None, False)
+    assert geocoder.resolve("Main St") == (None, False)
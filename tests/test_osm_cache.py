@@ -0,0 +1,119 @@
+'''
+Author: Leili
+Date: 2026-10-20 12:10:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 12:10:00
+FilePath: /GoogleModelProcess/tests/test_osm_cache.py
+Description: 瓦片缓存的测试：同一瓦片的并发下载只请求一次上游，不同瓦片互不阻塞，读取时瓦片被淘汰按未命中处理
+'''
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from Scripts import osm_cache
+from Scripts.osm_cache import TileCache, CachedSource
+from Scripts.osm_tiles import GeoJSONSource, lonlat_to_tile
+
+# 与test_osm_tiles相同的两个相邻z15瓦片中的地址
+ZOOM = 15
+WEST_POINT = (-118.3020, 34.0005)
+EAST_POINT = (-118.2990, 34.0005)
+TIMEOUT = 10
+
+def point_bounds(point, margin=0.0002):
+    lng, lat = point
+    return (lng - margin, lat - margin, lng + margin, lat + margin)
+
+class BlockingSource:
+    """ 请求被gate放行前一直阻塞，记录每次请求的范围 """
+    name = "blocking"
+
+    def __init__(self, source):
+        self.source = source
+        self.calls = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    def fetch(self, bounds):
+        self.calls.append(bounds)
+        self.started.set()
+        assert self.gate.wait(TIMEOUT)
+        return self.source.fetch(bounds)
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = TileCache(str(tmp_path / "tiles"), zoom=ZOOM)
+    yield cache
+    cache.close()
+
+@pytest.fixture
+def geojson(fixture_path):
+    return GeoJSONSource(fixture_path("buildings.geojson"))
+
+def run_in_thread(func, *args):
+    """ 在后台线程中执行func，返回(线程, 结果列表) """
+    results = []
+    thread = threading.Thread(target=lambda: results.append(func(*args)), daemon=True)
+    thread.start()
+    return thread, results
+
+def test_same_tile_fetched_once(cache, geojson):
+    upstream = BlockingSource(geojson)
+    source = CachedSource(upstream, cache)
+    first, first_results = run_in_thread(source.fetch, point_bounds(EAST_POINT))
+    assert upstream.started.wait(TIMEOUT)
+    second, second_results = run_in_thread(source.fetch, point_bounds(EAST_POINT, margin=0.0001))
+    upstream.gate.set()
+    first.join(TIMEOUT)
+    second.join(TIMEOUT)
+    # 第二个线程等待第一个线程的下载结果，没有再次请求上游
+    assert len(upstream.calls) == 1
+    assert sorted(first_results[0]['name']) == sorted(second_results[0]['name']) == ['east']
+
+def test_other_tiles_not_blocked(cache, geojson):
+    blocked = BlockingSource(geojson)
+    source = CachedSource(blocked, cache)
+    thread, results = run_in_thread(source.fetch, point_bounds(EAST_POINT))
+    assert blocked.started.wait(TIMEOUT)
+    # 东侧瓦片的下载还没有完成时，西侧瓦片可以直接下载
+    other = BlockingSource(geojson)
+    other.gate.set()
+    source.source = other
+    west = source.fetch(point_bounds(WEST_POINT))
+    assert thread.is_alive()
+    assert sorted(west['name']) == ['west']
+    blocked.gate.set()
+    thread.join(TIMEOUT)
+    assert sorted(results[0]['name']) == ['east']
+    assert len(blocked.calls) == len(other.calls) == 1
+
+def test_failed_fetch_is_retried(cache, geojson):
+    class FailingSource:
+        name = "failing"
+
+        def fetch(self, bounds):
+            raise ConnectionError("overpass unavailable")
+
+    source = CachedSource(FailingSource(), cache)
+    with pytest.raises(ConnectionError):
+        source.fetch(point_bounds(EAST_POINT))
+    # 失败的瓦片不会一直留在下载中
+    source.source = geojson
+    assert sorted(source.fetch(point_bounds(EAST_POINT))['name']) == ['east']
+
+def test_evicted_during_read_is_miss(cache, geojson, monkeypatch):
+    x, y = lonlat_to_tile(*EAST_POINT, ZOOM)
+    cache.put(x, y, geojson.fetch(point_bounds(EAST_POINT)))
+    read_pickle = pd.read_pickle
+
+    def evict_then_read(path, *args, **kwargs):
+        # 模拟在索引检查之后、读取之前其他线程淘汰了该瓦片
+        os.remove(path)
+        return read_pickle(path, *args, **kwargs)
+
+    monkeypatch.setattr(osm_cache.pd, "read_pickle", evict_then_read)
+    assert cache.get(x, y) is None
+    stats = cache.summary()
+    assert (stats['hits'], stats['misses']) == (0, 1)
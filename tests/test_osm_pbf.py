@@ -0,0 +1,69 @@
+'''
+Author: Leili
+Date: 2026-10-20 11:00:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 11:00:00
+FilePath: /GoogleModelProcess/tests/test_osm_pbf.py
+Description: 离线建筑轮廓数据源(osm_pbf)的测试，使用tests/fixtures/buildings.osm.pbf
+'''
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip("osmium")
+
+from Scripts.osm_pbf import PbfSource, build_store, default_store_path
+from make_osm_fixture import write_buildings_pbf, BUILDING_WAY, MULTIPOLYGON, PARK_WAY, EXTRA_WAY
+
+# 覆盖提取文件中所有要素的范围 (west, south, east, north)
+BOUNDS = (-118.301, 33.999, -118.295, 34.001)
+
+@pytest.fixture
+def pbf(tmp_path, fixture_path):
+    """ 复制到临时目录，GeoPackage生成在提取文件旁边 """
+    path = str(tmp_path / "buildings.osm.pbf")
+    shutil.copy(fixture_path("buildings.osm.pbf"), path)
+    return path
+
+def test_build_store(pbf, tmp_path):
+    store_path = str(tmp_path / "out.gpkg")
+    assert build_store(pbf, store_path) == 2
+    assert os.path.exists(store_path)
+
+def test_fetch(pbf):
+    gdf = PbfSource(pbf).fetch(BOUNDS)
+    assert sorted(gdf.index) == [('relation', MULTIPOLYGON), ('way', BUILDING_WAY)]
+    assert ('way', PARK_WAY) not in gdf.index
+    assert os.path.exists(default_store_path(pbf))
+
+    way = gdf.loc[('way', BUILDING_WAY)]
+    assert way['building'] == 'yes' and way['height'] == '12' and way['addr:street'] == 'Test St'
+
+    # multipolygon的内环保留为洞
+    polygon = gdf.loc[('relation', MULTIPOLYGON)].geometry.geoms[0]
+    assert len(polygon.interiors) == 1
+    assert polygon.area < polygon.envelope.area
+
+def test_fetch_bbox(pbf):
+    source = PbfSource(pbf)
+    assert source.fetch((-120.0, 30.0, -119.9, 30.1)).empty
+    # 只覆盖第一个建筑的范围
+    gdf = source.fetch((-118.3001, 33.9999, -118.2997, 34.0003))
+    assert list(gdf.index) == [('way', BUILDING_WAY)]
+
+def test_rebuild_when_pbf_changes(pbf):
+    PbfSource(pbf).fetch(BOUNDS)
+    store_path = default_store_path(pbf)
+    store_mtime = os.path.getmtime(store_path)
+
+    # 提取文件没有更新时不重新构建
+    PbfSource(pbf).fetch(BOUNDS)
+    assert os.path.getmtime(store_path) == store_mtime
+
+    # 提取文件比GeoPackage新时重新构建
+    write_buildings_pbf(pbf, extra=True)
+    os.utime(pbf, (store_mtime + 10, store_mtime + 10))
+    gdf = PbfSource(pbf).fetch(BOUNDS)
+    assert ('way', EXTRA_WAY) in gdf.index
+    assert len(gdf) == 3
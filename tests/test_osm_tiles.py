@@ -0,0 +1,65 @@
+'''
+Author: Leili
+Date: 2026-10-20 11:20:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 11:20:00
+FilePath: /GoogleModelProcess/tests/test_osm_tiles.py
+Description: 按瓦片下载建筑轮廓的测试，使用本地GeoJSON数据源tests/fixtures/buildings.geojson
+'''
+import pytest
+
+from Scripts.osm_tiles import GeoJSONSource, download_footprints, tiles_for_points, tile_bounds
+
+# 两个地址分别位于相邻的两个z15瓦片中(瓦片边界在经度-118.30078附近)，
+# 测试数据中的"shared"建筑跨越两个瓦片的边界，"west"和"east"各自只在一个瓦片中
+WEST_POINT = (-118.3020, 34.0005)
+EAST_POINT = (-118.2990, 34.0005)
+
+class CountingSource:
+    """ 记录每次fetch返回的要素名称 """
+
+    def __init__(self, source):
+        self.source = source
+        self.calls = []
+
+    def fetch(self, bounds):
+        gdf = self.source.fetch(bounds)
+        self.calls.append(sorted(gdf['name']))
+        return gdf
+
+@pytest.fixture
+def source(fixture_path):
+    return CountingSource(GeoJSONSource(fixture_path("buildings.geojson")))
+
+def test_points_in_adjacent_tiles():
+    tiles = tiles_for_points([WEST_POINT, EAST_POINT])
+    assert len(tiles) == 2
+    (x0, y0), (x1, y1) = tiles
+    assert (x1, y1) == (x0 + 1, y0)
+    assert tile_bounds(x0, y0)[2] == pytest.approx(tile_bounds(x1, y1)[0])
+
+def test_overlapping_margins_are_deduplicated(source):
+    footprints = download_footprints([WEST_POINT, EAST_POINT], source)
+    # 每个瓦片只请求一次，跨边界的建筑在两个瓦片中都被返回
+    assert len(source.calls) == 2
+    assert all('shared' in names for names in source.calls)
+    assert sorted(footprints['name']) == ['east', 'shared', 'west']
+    assert not footprints.index.duplicated().any()
+
+def test_only_polygons_are_kept(source):
+    footprints = download_footprints([EAST_POINT], source)
+    assert len(source.calls) == 1
+    # 数据源返回了道路(LineString)和消防栓(Point)，结果中只保留面状要素
+    assert {'road', 'hydrant'} <= set(source.calls[0])
+    assert set(footprints.geometry.geom_type) == {'Polygon', 'MultiPolygon'}
+    assert sorted(footprints['name']) == ['east', 'shared']
+    assert footprints.crs.to_epsg() == 4326
+
+def test_same_tile_requested_once(source):
+    download_footprints([EAST_POINT, (EAST_POINT[0] + 0.001, EAST_POINT[1])], source)
+    assert len(source.calls) == 1
+
+def test_no_features(source):
+    footprints = download_footprints([(0.0, 0.0)], source)
+    assert footprints.empty
+    assert footprints.crs.to_epsg() == 4326
@@ -0,0 +1,58 @@
+'''
+Author: Leili
+Date: 2026-10-20 10:20:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 13:10:00
+FilePath: /GoogleModelProcess/tests/test_rdc_validate.py
+Description: RDC文件校验和隔离的测试，使用合成的RDC文件
+'''
+import os
+
+from Scripts.rdc_validate import (validate_rdc, quarantine_rdc, sidecar_path, FILE_HEADER, SECTION_HEADER,
+                                  MAGIC_HEADER, FRAME_CAPTURE, QUARANTINE_SUFFIX)
+
+def section(section_type, data, name=b"", is_ascii=0):
+    return SECTION_HEADER.pack(is_ascii, b"\0\0\0", section_type, len(data), len(data), 1, 0, len(name)) + name + data
+
+def write_rdc(path, *sections, magic=MAGIC_HEADER):
+    with open(path, 'wb') as f:
+        f.write(FILE_HEADER.pack(magic, 0x102, FILE_HEADER.size, b"v1.30"))
+        for data in sections:
+            f.write(data)
+    return str(path)
+
+def test_valid(tmp_path):
+    result = validate_rdc(write_rdc(tmp_path / "a.rdc", section(FRAME_CAPTURE, b"x" * 4096)), use_sidecar=False)
+    assert result['valid'], result['error']
+    assert result['section_count'] == 1
+
+def test_ascii_section_is_skipped(tmp_path):
+    ascii_section = b"A\n4\n12\n1\nnotes\nhello world!\n"
+    path = write_rdc(tmp_path / "a.rdc", section(FRAME_CAPTURE, b"x" * 4096), ascii_section)
+    result = validate_rdc(path, use_sidecar=False)
+    assert result['valid'], result['error']
+    assert [s['type'] for s in result['sections']] == ['FrameCapture', 'ASCII']
+
+def test_invalid(tmp_path):
+    truncated = write_rdc(tmp_path / "truncated.rdc", section(FRAME_CAPTURE, b"x" * 4096))
+    with open(truncated, 'r+b') as f:
+        f.truncate(os.path.getsize(truncated) - 100)
+    bad_magic = write_rdc(tmp_path / "magic.rdc", section(FRAME_CAPTURE, b"x"), magic=0)
+    no_frame = write_rdc(tmp_path / "noframe.rdc", section(4, b"notes"))
+    for path in (truncated, bad_magic, no_frame):
+        assert not validate_rdc(path, use_sidecar=False)['valid'], path
+
+def test_quarantine(tmp_path):
+    rdc_dir = tmp_path / "rdc"
+    rdc_dir.mkdir()
+    path = write_rdc(rdc_dir / "a.rdc", section(4, b"notes"))
+    validate_rdc(path)
+    target = quarantine_rdc(path)
+    # 隔离目录在rdc_dir之外，清理rdc_dir的子目录时不会被删除
+    assert target == str(tmp_path / f"rdc{QUARANTINE_SUFFIX}" / "a.rdc")
+    assert os.path.exists(target) and os.path.exists(sidecar_path(target))
+    assert not os.path.exists(path) and not os.path.exists(sidecar_path(path))
+    # 再次隔离同名文件时不覆盖
+    path = write_rdc(rdc_dir / "a.rdc", section(4, b"notes"))
+    second = quarantine_rdc(path)
+    assert second != target and os.path.exists(target) and os.path.exists(second)
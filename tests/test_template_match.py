@@ -0,0 +1,59 @@
+'''
+Author: Leili
+Date: 2026-10-20 13:00:00
+LastEditors: Leili
+LastEditTime: 2026-10-20 13:00:00
+FilePath: /GoogleModelProcess/tests/test_template_match.py
+Description: 批量模板匹配的测试：在一张合成截图中同时匹配两个模板
+'''
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from Scripts.capture_google_model import match_templates_in_image
+
+# 模板在截图中的位置 (x0, y0, x1, y1)
+TEMPLATE_BOXES = {
+    'north_west': (80, 60, 280, 240),
+    'south_east': (480, 320, 700, 520),
+}
+TOLERANCE = 4
+
+pytestmark = pytest.mark.usefixtures("config_file")
+
+@pytest.fixture
+def screenshot():
+    """ 随机矩形和圆组成的800x600灰度图，纹理丰富，SIFT特征点足够多 """
+    rng = np.random.default_rng(0)
+    image = np.full((600, 800), 128, dtype=np.uint8)
+    for _ in range(300):
+        x, y = rng.integers(0, 800), rng.integers(0, 600)
+        color = int(rng.integers(0, 256))
+        if rng.random() < 0.5:
+            w, h = rng.integers(5, 40, 2)
+            cv2.rectangle(image, (int(x), int(y)), (int(x + w), int(y + h)), color, -1)
+        else:
+            cv2.circle(image, (int(x), int(y)), int(rng.integers(3, 20)), color, -1)
+    return image
+
+def test_two_templates_in_one_pass(screenshot):
+    templates = {name: screenshot[y0:y1, x0:x1].copy() for name, (x0, y0, x1, y1) in TEMPLATE_BOXES.items()}
+    results = match_templates_in_image(screenshot, templates, min_match_count=10)
+    assert set(results) == set(TEMPLATE_BOXES)
+    for name, (x0, y0, x1, y1) in TEMPLATE_BOXES.items():
+        homography, bbox = results[name]
+        # 模板是截图的裁剪，单应性矩阵应接近平移(x0, y0)
+        homography = homography / homography[2, 2]
+        assert np.allclose(homography[:2, :2], np.identity(2), atol=0.02)
+        assert np.allclose(homography[:2, 2], (x0, y0), atol=TOLERANCE)
+        assert np.allclose(homography[2, :2], 0, atol=1e-4)
+        assert np.allclose(bbox, (x0, y0, x1 - 1, y1 - 1), atol=TOLERANCE)
+
+def test_missing_template_is_none(screenshot):
+    unrelated = np.random.default_rng(1).integers(0, 256, (120, 120), dtype=np.uint8)
+    (x0, y0, x1, y1) = TEMPLATE_BOXES['north_west']
+    results = match_templates_in_image(screenshot, {'found': screenshot[y0:y1, x0:x1].copy(), 'unrelated': unrelated},
+                                       min_match_count=10)
+    assert results['found'] is not None
+    assert results['unrelated'] is None